@@ -0,0 +1,127 @@
+import gc
+import time
+import queue
+import logging
+from threading import Thread
+from typing import Dict, List, Optional
+
+
+# Upper bounds (ms) of the stall histogram buckets; anything above the last lands in the overflow bucket
+STALL_BUCKETS_MS = [5, 10, 20, 50, 100, 250, 500, 1000]
+
+
+class AudioLoopMonitor:
+    """Records frame-read lateness, input overflows and loop stalls of the wake-word loop"""
+
+    def __init__(self, sample_rate: int, frame_length: int, report_interval: float = 60.0,
+                 buffer_frames: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.frame_seconds = frame_length / sample_rate
+        self.frame_length = frame_length
+        # Frames the input stream can hold before PortAudio drops audio; taken from its latency if not given
+        self.buffer_frames = buffer_frames
+        self.report_interval = report_interval
+        self.frames_read = 0
+        self.overflows = 0
+        self.late_frames = 0
+        self.max_lateness = 0.0
+        self.stall_counts: List[int] = [0] * (len(STALL_BUCKETS_MS) + 1)
+        self._last_read_end: Optional[float] = None
+        self._last_report = time.monotonic()
+
+    def read_frame(self, stream) -> bytes:
+        """Read one frame, counting overflows without giving up the audio that was buffered"""
+        start = time.monotonic()
+        # With exception_on_overflow=True PyAudio would discard the buffer on overflow, so
+        # instead an overflow is counted when the backlog has filled the stream's buffer
+        if self._backlog_full(stream):
+            self.overflows += 1
+        pcm = stream.read(self.frame_length, exception_on_overflow=False)
+        end = time.monotonic()
+
+        if self._last_read_end is not None:
+            # Time spent outside stream.read beyond one frame means the loop fell behind the device
+            lateness = (start - self._last_read_end) - self.frame_seconds
+            if lateness > 0:
+                self.late_frames += 1
+                self.max_lateness = max(self.max_lateness, lateness)
+                self._record_stall(lateness)
+        self._last_read_end = end
+        self.frames_read += 1
+        return pcm
+
+    def _backlog_full(self, stream) -> bool:
+        try:
+            available = stream.get_read_available()
+            if self.buffer_frames is None:
+                self.buffer_frames = max(self.frame_length, int(stream.get_input_latency() * self.sample_rate))
+        except (IOError, OSError, AttributeError):
+            return False
+        return available >= self.buffer_frames
+
+    def pause(self):
+        """Call before leaving the audio path on purpose (e.g. handling a command) so the gap isn't a stall"""
+        self._last_read_end = None
+
+    def _record_stall(self, seconds: float):
+        ms = seconds * 1000
+        for i, bound in enumerate(STALL_BUCKETS_MS):
+            if ms <= bound:
+                self.stall_counts[i] += 1
+                return
+        self.stall_counts[-1] += 1
+
+    def stall_histogram(self) -> Dict[str, int]:
+        """Stall counts keyed by bucket label, e.g. '<=20ms'"""
+        labels = [f"<={bound}ms" for bound in STALL_BUCKETS_MS] + [f">{STALL_BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, self.stall_counts))
+
+    def summary(self) -> str:
+        histogram = ", ".join(f"{label}: {count}" for label, count in self.stall_histogram().items() if count)
+        return (f"Audio loop: {self.frames_read} frames, {self.overflows} overflows, "
+                f"{self.late_frames} late (max {self.max_lateness * 1000:.1f}ms); "
+                f"stalls [{histogram or 'none'}]")
+
+    def report_due(self) -> bool:
+        """True once per report interval"""
+        now = time.monotonic()
+        if now - self._last_report < self.report_interval:
+            return False
+        self._last_report = now
+        return True
+
+
+class BackgroundCalls:
+    """Runs blocking side work (Redis metrics, logging) on a worker thread instead of the audio path"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._queue: queue.Queue = queue.Queue()
+        if enabled:
+            Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, fn, *args, **kwargs):
+        if not self.enabled:
+            fn(*args, **kwargs)
+            return
+        self._queue.put((fn, args, kwargs))
+
+    def _worker(self):
+        while True:
+            fn, args, kwargs = self._queue.get()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logging.error(f"Background call {getattr(fn, '__name__', fn)} failed: {e}")
+
+
+def enable_gc_isolation(gen0_threshold: int = 50000, gen1_threshold: int = 20, gen2_threshold: int = 100):
+    """Freeze long-lived objects (models, tokenizers, tool modules) and make collections rarer
+
+    Call once after model load. Frozen objects are moved to a permanent generation, so later
+    collections no longer traverse the torch/transformers object graph while the audio loop runs.
+    """
+    gc.collect()
+    gc.freeze()
+    gc.set_threshold(gen0_threshold, gen1_threshold, gen2_threshold)
+    print(f"GC isolation enabled: {gc.get_freeze_count()} objects frozen, thresholds {gc.get_threshold()}")
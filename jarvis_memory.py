@@ -249,14 +249,17 @@ class JarvisMemory:
         return stats
     
     # CACHE MANAGEMENT 
+    def _cache_key(self, endpoint: str, params: Dict) -> str:
+        """Create cache key from endpoint and parameters"""
+        return f"cache:{endpoint}:{hashlib.md5(str(sorted(params.items())).encode()).hexdigest()}"
+    
     def cache_api_response(self, endpoint: str, params: Dict, response: Any, 
                           expiry_minutes: int = 30):
         """Cache API responses to reduce external calls"""
         if not self.redis_client:
             return
             
-        # Create cache key from endpoint and parameters
-        cache_key = f"cache:{endpoint}:{hashlib.md5(str(sorted(params.items())).encode()).hexdigest()}"
+        cache_key = self._cache_key(endpoint, params)
         
         cache_data = {
             "response": response,
@@ -272,16 +275,36 @@ class JarvisMemory:
     
     def get_cached_response(self, endpoint: str, params: Dict) -> Optional[Any]:
         """Get cached API response"""
+        entry = self.get_cached_entry(endpoint, params)
+        return entry["response"] if entry else None
+    
+    def get_cached_entry(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Get cached API response together with the time it was stored"""
         if not self.redis_client:
             return None
             
-        cache_key = f"cache:{endpoint}:{hashlib.md5(str(sorted(params.items())).encode()).hexdigest()}"
-        cached = self.redis_client.get(cache_key)
+        cached = self.redis_client.get(self._cache_key(endpoint, params))
         
         if cached:
-            return json.loads(cached)["response"]
+            return json.loads(cached)
         return None
     
+    # DEVICE CALIBRATION 
+    def set_calibration(self, name: str, value: Any):
+        """Store a device calibration value (no expiry, shared across sessions)"""
+        if not self.redis_client:
+            return
+            
+        self.redis_client.hset("calibration", name, json.dumps(value))
+    
+    def get_calibration(self, name: str) -> Any:
+        """Get a stored device calibration value"""
+        if not self.redis_client:
+            return None
+            
+        value = self.redis_client.hget("calibration", name)
+        return json.loads(value) if value else None
+    
     # CLEANUP METHODS 
     def cleanup_old_data(self, days_to_keep: int = 30):
         """Clean up old data"""
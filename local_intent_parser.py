@@ -4,6 +4,7 @@ from typing import Dict, Any, Optional, Tuple
 import joblib
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from tools.app_catalog import app_catalog
 
 class LocalIntentParser:
     def __init__(self, model_path: str = "./intent_model/"):
@@ -93,27 +94,11 @@ class LocalIntentParser:
     # ================================
 
     def _parse_open_application(self, text: str) -> Dict[str, Any]:
-        app_patterns = {
-            'chrome': ['chrome', 'google chrome', 'browser'],
-            'notepad': ['notepad', 'text editor'],
-            'calculator': ['calculator', 'calc'],
-            'spotify': ['spotify', 'music'],
-            'discord': ['discord'],
-            'slack': ['slack'],
-            'photoshop': ['photoshop', 'ps'],
-            'excel': ['excel', 'spreadsheet'],
-            'word': ['word', 'microsoft word'],
-            'powerpoint': ['powerpoint', 'ppt'],
-            'vscode': ['vscode', 'visual studio code', 'code'],
-            'terminal': ['terminal', 'cmd', 'command prompt'],
-            'outlook': ['outlook', 'email client'],
-            'edge': ['edge', 'microsoft edge'],
-            'steam': ['steam', 'steam client', 'team'],  # Add 'team' as common misrecognition
-        }
+        # Same catalog lookup open_application uses, so misheard names resolve without the LLM
+        entry = app_catalog.resolve_in_text(text)
+        if entry:
+            return {'function_name': 'open_application', 'parameters': {'app_name': entry.name}}
         text_lower = text.lower()
-        for app_name, patterns in app_patterns.items():
-            if any(pattern in text_lower for pattern in patterns):
-                return {'function_name': 'open_application', 'parameters': {'app_name': app_name}}
         patterns = [r'open (.+)', r'launch (.+)', r'start (.+)', r'run (.+)']
         for pattern in patterns:
             match = re.search(pattern, text_lower)
@@ -122,6 +107,9 @@ class LocalIntentParser:
         return {'function_name': 'open_application', 'parameters': {'app_name': 'unknown'}}
 
     def _parse_close_application(self, text: str) -> Dict[str, Any]:
+        entry = app_catalog.resolve_in_text(text)
+        if entry:
+            return {'function_name': 'close_application', 'parameters': {'application_name': entry.name}}
         patterns = [r'close (.+)', r'quit (.+)', r'exit (.+)', r'shut down (.+)', r'stop (.+)']
         for pattern in patterns:
             match = re.search(pattern, text.lower())
@@ -177,6 +165,15 @@ class LocalIntentParser:
         return {'function_name': 'take_screenshot', 'parameters': {}}
 
     def _parse_read_screen(self, text: str) -> Dict[str, Any]:
+        # "what was on my screen a minute ago" / "30 seconds ago"
+        match = re.search(r'(\d+|an?|one|a few) (second|minute)s? ago', text.lower())
+        if match:
+            amount = {'a': 1, 'an': 1, 'one': 1, 'a few': 3}.get(match.group(1)) or int(match.group(1))
+            seconds = amount * 60 if match.group(2) == 'minute' else amount
+            return {'function_name': 'read_screen', 'parameters': {'seconds_ago': seconds}}
+        # "look again" / "check my screen again" should not get the cached description back
+        if re.search(r'\b(again|refresh|re-?read)\b', text.lower()):
+            return {'function_name': 'read_screen', 'parameters': {'refresh': True}}
         return {'function_name': 'read_screen', 'parameters': {}}
 
     def _parse_adjust_volume(self, text: str) -> Dict[str, Any]:
@@ -209,10 +206,11 @@ class LocalIntentParser:
         return {'function_name': 'send_email', 'parameters': parameters}
 
     def _parse_open_file(self, text: str) -> Dict[str, Any]:
-        for pattern in [r'open (.+)', r'open file (.+)', r'load (.+)', r'load file (.+)']:
+        # Most specific pattern first; open_file resolves spoken descriptions ("my resume") through the file index
+        for pattern in [r'open (?:the |my )?file (.+)', r'load (?:the |my )?file (.+)', r'open (.+)', r'load (.+)']:
             match = re.search(pattern, text.lower())
             if match:
-                return {'function_name': 'open_file', 'parameters': {'file_path': match.group(1).strip()}}
+                return {'function_name': 'open_file', 'parameters': {'file_path': match.group(1).strip(" .?!")}}
         return {'function_name': 'open_file', 'parameters': {'file_path': 'unknown'}}
 
     def _parse_scroll_mouse(self, text: str) -> Dict[str, Any]:
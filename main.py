@@ -1,15 +1,11 @@
 from dotenv import load_dotenv
 import asyncio
-import struct
 import pvporcupine
 import pyaudio
 import os
-import speech_recognition as sr
 import json
-from threading import Thread, Lock
-import queue
 
-from livekit import agents
+from livekit import agents, rtc
 from livekit.agents import AgentSession, Agent, RoomInputOptions
 from livekit.plugins import noise_cancellation
 from livekit.plugins import google
@@ -27,11 +23,16 @@ from local_intent_parser import LocalIntentParser
 from tools.web_utils import get_weather, search_web, get_current_time, get_current_date, get_current_datetime
 from tools.os_commands import (
     send_email, 
+    get_email_status,
     open_application, 
     close_application, 
     find_app_paths, 
     open_file,
-    run_command
+    run_command,
+    start_background_job,
+    get_job_status,
+    get_job_output,
+    cancel_job
 )
 from tools.mouse_key import (
     move_cursor,
@@ -53,6 +54,24 @@ from tools.interview import (
 )
 from tools.screen import take_screenshot, get_screen_size, read_screen
 from tools.audio_control import adjust_volume
+from tts_player import TTSPlayer, TTS_SAMPLE_RATE, TTS_SAMPLE_WIDTH, TTS_CHUNK_BYTES
+from tts_cache import TTSPhraseCache
+from audio_monitor import AudioLoopMonitor, BackgroundCalls, enable_gc_isolation
+from voice_pipeline import STTHandler, LocalFunctionParser, wake_word_fired, capture_command
+from tools.executor import tool_executor
+from tools.cache import configure_tool_cache, cache_stats
+from tools.single_flight import coalesce_stats
+from tools.rate_limit import configure_rate_limits, rate_limit_stats
+from tools.outbox import configure_email_outbox, start_email_outbox
+from tools.jobs import configure_jobs, get_job_manager
+from tools.shell_pool import shell_pool
+from tools.process_index import process_index
+from tools.app_index import app_index
+from tools.file_index import file_index
+from tools.vision import vision_stats
+from tools.screen_cache import screen_cache
+from tools.screen_history import screen_history, SCREEN_HISTORY_ENABLED
+from tools.deadline import Deadline, deadline_scope, remaining_timeout, BUDGET_EXHAUSTED_REPLY
 
 # Load .env variables
 load_dotenv()
@@ -66,6 +85,13 @@ memory = JarvisMemory(
     redis_db=int(os.getenv("REDIS_DB", 0))
 )
 
+# Idempotent tools (weather, search, screen size) read through the Redis cache
+configure_tool_cache(memory)
+# External API rate limits are shared with other Jarvis processes through Redis
+configure_rate_limits(memory)
+# Emails are queued in Redis and delivered by a background sender (started from the entrypoint)
+configure_email_outbox(memory, os.getenv("GMAIL_USER"))
+
 # Initialize Local Intent Parser
 try:
     intent_parser = LocalIntentParser(model_path="./intent_model/")
@@ -74,159 +100,43 @@ except Exception as e:
     print(f"Error loading local intent parser: {e}")
     intent_parser = None
 
-# Speech-to-Text Handler
-class STTHandler:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.audio_queue = queue.Queue()
-        self.is_listening = False
-        self.lock = Lock()
-        
-        # Adjust for ambient noise
-        print("Calibrating microphone for ambient noise...")
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source)
-        print("Microphone calibrated.")
-    
-    def start_listening(self):
-        if self.is_listening:
-            print("Already listening. Ignoring start request.")
-            return
-        self.is_listening = True
-        listen_thread = Thread(target=self._listen_loop, daemon=True)
-        listen_thread.start()
-
-    def stop_listening(self):
-        if not self.is_listening:
-            print("Not listening. Nothing to stop.")
-            return
-        self.is_listening = False
-    
-    def _listen_loop(self):
-        """Continuous listening loop"""
-        while self.is_listening:
-            try:
-                with self.microphone as source:
-                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=2)
-                    self.audio_queue.put(audio)
-            except sr.WaitTimeoutError:
-                continue
-            except Exception as e:
-                print(f"Error in listening loop: {e}")
-
-    async def get_transcription(self):
-        """Get transcription from audio queue"""
-        try:
-            if not self.audio_queue.empty():
-                audio = self.audio_queue.get_nowait()
-                # Use Google Speech Recognition (free tier) with timeout
-                text = await asyncio.wait_for(
-                    asyncio.get_event_loop().run_in_executor(
-                        None, self.recognizer.recognize_google, audio
-                    ),
-                    timeout=2.0  # 2 second timeout for faster response
-                )
-                return text.lower()
-        except sr.UnknownValueError:
-            return None
-        except sr.RequestError as e:
-            print(f"Speech recognition error: {e}")
-            return None
-        except queue.Empty:
-            return None
-        except asyncio.TimeoutError:
-            print("Speech recognition timed out")
-            return None
-        return None
-
-# Local Function Parser with Memory
-class LocalFunctionParser:
-    def __init__(self, intent_parser: LocalIntentParser, memory_system: JarvisMemory):
-        self.intent_parser = intent_parser
-        self.memory = memory_system
-        self.available_functions = {
-            "get_weather": get_weather,
-            "search_web": search_web,
-            "send_email": send_email,
-            "open_application": open_application,
-            "close_application": close_application,
-            "find_application": find_app_paths,
-            "open_file": open_file,
-            "run_command": run_command,
-            "move_cursor": move_cursor,
-            "click_mouse": click_mouse,
-            "scroll_mouse": scroll_mouse,
-            "type_text": type_text,
-            "press_key": press_key,
-            "adjust_volume": adjust_volume,
-            "take_screenshot": take_screenshot,
-            "get_cursor_position": get_cursor_position,
-            "get_screen_size": get_screen_size,
-            "get_current_time": get_current_time,
-            "get_current_date": get_current_date,
-            "get_current_datetime": get_current_datetime,
-            "read_screen": read_screen,
-            "start_interview_session": start_interview_session,
-            "get_next_question": get_next_question,
-            "submit_answer": submit_answer,
-            "set_resume_path": set_resume_path,
-            "tell_about_yourself": tell_about_yourself,
-            "setup_interview": setup_interview,
-            "evaluate_interview": evaluate_interview,
-            "check_code_solution": check_code_solution
-        }
-    
-    async def try_parse_tool(self, text: str) -> bool:
-        """Try to parse as a tool call - returns True if successful, False if should fall back to LLM"""
-        if not self.intent_parser:
-            return False
-        
-        try:
-            function_call = self.intent_parser.parse_and_extract_function(text)
-            
-            if function_call and function_call.get("function_name"):
-                await self._execute_function(function_call, None, None, text)
-                return True
-            else:
-                return False  # No tool detected, use LLM
-                
-        except Exception as e:
-            print(f"Error in local parsing: {e}")
-            return False  # Fall back to LLM on error
-    
-    async def _execute_function(self, function_call: dict, session, room_id: str, original_command: str):
-        """Execute the parsed function and store in memory"""
-        function_name = function_call.get("function_name")
-        parameters = function_call.get("parameters", {})
-        confidence = function_call.get("confidence", 0.0)
-        
-        if function_name in self.available_functions:
-            try:
-                # Create a mock context for the function
-                class MockContext:
-                    pass
-                
-                mock_context = MockContext()
-                
-                print(f"Executing {function_name} with parameters: {parameters} (confidence: {confidence:.3f})")
-                
-                # Execute the function with mock context
-                result = await self.available_functions[function_name](mock_context, **parameters)
-                
-                print(f"Function {function_name} executed successfully: {result}")
-                
-                # Only log usage metrics (no conversation storage)
-                self.memory.increment_usage_metric(f"function_{function_name}")
-                
-                print(f"Function executed successfully: {result}")
-                
-            except Exception as e:
-                error_msg = f"Error executing {function_name}: {str(e)}"
-                print(f"{error_msg}")
-        else:
-            print(f"Unknown function: {function_name}")
-
+# Tools the local intent parser can route to, by intent name
+TOOL_FUNCTIONS = {
+    "get_weather": get_weather,
+    "search_web": search_web,
+    "send_email": send_email,
+    "get_email_status": get_email_status,
+    "open_application": open_application,
+    "close_application": close_application,
+    "find_application": find_app_paths,
+    "open_file": open_file,
+    "run_command": run_command,
+    "start_background_job": start_background_job,
+    "get_job_status": get_job_status,
+    "get_job_output": get_job_output,
+    "cancel_job": cancel_job,
+    "move_cursor": move_cursor,
+    "click_mouse": click_mouse,
+    "scroll_mouse": scroll_mouse,
+    "type_text": type_text,
+    "press_key": press_key,
+    "adjust_volume": adjust_volume,
+    "take_screenshot": take_screenshot,
+    "get_cursor_position": get_cursor_position,
+    "get_screen_size": get_screen_size,
+    "get_current_time": get_current_time,
+    "get_current_date": get_current_date,
+    "get_current_datetime": get_current_datetime,
+    "read_screen": read_screen,
+    "start_interview_session": start_interview_session,
+    "get_next_question": get_next_question,
+    "submit_answer": submit_answer,
+    "set_resume_path": set_resume_path,
+    "tell_about_yourself": tell_about_yourself,
+    "setup_interview": setup_interview,
+    "evaluate_interview": evaluate_interview,
+    "check_code_solution": check_code_solution
+}
 
 # Hybrid Smart Routing 
 
@@ -249,11 +159,16 @@ class JarvisAgent(Agent):
                 get_weather,
                 search_web,
                 send_email,
+                get_email_status,
                 open_application,
                 close_application,
                 find_app_paths,
                 open_file,
                 run_command,
+                start_background_job,
+                get_job_status,
+                get_job_output,
+                cancel_job,
                 move_cursor,
                 click_mouse,
                 scroll_mouse,
@@ -280,58 +195,54 @@ class JarvisAgent(Agent):
 
 
 # OpenAI Text-to-Speech Handler (DISABLED for now - using LiveKit)
+# One player for the process so the output device stays open between utterances; it still speaks
+# background job announcements, and synthesizes the stock replies below into the phrase cache
+tts_player = TTSPlayer(model="tts-1-hd", voice="onyx", cache=TTSPhraseCache())  # onyx = deep male voice (Jarvis-like)
+
+NO_SPEECH_REPLY = "I'm listening, but didn't hear anything. Please try again."
+# Lines the agent speaks word for word; served from the phrase cache instead of asking the model to say them
+STOCK_REPLIES = [NO_SPEECH_REPLY, BUDGET_EXHAUSTED_REPLY]
+
+async def prewarm_tts_cache():
+    """Synthesize stock replies that aren't on disk yet; after the first run this costs nothing"""
+    try:
+        await tts_player.warm_cache(STOCK_REPLIES)
+        print(f"TTS phrase cache ready ({len(STOCK_REPLIES)} phrases)")
+    except Exception as e:
+        print(f"TTS cache warm-up skipped: {e}")
+
+async def pcm_frames(pcm: bytes):
+    """Cached 24 kHz PCM as LiveKit audio frames of 100 ms"""
+    for start in range(0, len(pcm), TTS_CHUNK_BYTES):
+        chunk = pcm[start:start + TTS_CHUNK_BYTES]
+        yield rtc.AudioFrame(data=chunk, sample_rate=TTS_SAMPLE_RATE, num_channels=1,
+                             samples_per_channel=len(chunk) // TTS_SAMPLE_WIDTH)
+
+async def say_stock_reply(session, text: str):
+    """Play a stock reply from the phrase cache through the session, or have the model say it on a miss"""
+    pcm = tts_player.cached(text)
+    if pcm is None:
+        await session.generate_reply(instructions=text)
+    else:
+        await session.say(text, audio=pcm_frames(pcm))
+
 async def play_openai_tts(text: str, voice: str = "onyx"):
     """Play text using OpenAI's TTS with Jarvis-like voice"""
     try:
-        import pygame
-        import tempfile
-        
-        # Generate speech using OpenAI TTS (async to avoid blocking)
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: openai_client.audio.speech.create(
-                model="tts-1-hd",  # or "tts-1-hd" for higher quality
-                voice="onyx",    # onyx = deep male voice (Jarvis-like)
-                input=text,
-                speed=1.0
-            )
-        )
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_file:
-            tmp_file.write(response.content)
-            tmp_filename = tmp_file.name
-        
-        # Play the audio (async to avoid blocking)
-        await loop.run_in_executor(None, _play_audio_sync, tmp_filename)
-        
-        # Cleanup
-        await loop.run_in_executor(None, os.unlink, tmp_filename)
-        
-        print(f"Played TTS: {text[:50]}...")
+        # Streams the synthesized audio and starts playing on the first chunk
+        await tts_player.speak(text, voice=voice)
+        print(f"Played TTS: {text[:50]}... (first audio after {tts_player.last_time_to_first_audio or 0:.2f}s)")
         
     except ImportError:
-        print("Warning: pygame not installed. Install with: pip install pygame")
+        print("Warning: openai not installed. Install with: pip install openai")
         print(f"Text only: {text}")
     except Exception as e:
         print(f"TTS error: {e}")
         print(f"Text only: {text}")
 
-def _play_audio_sync(filename):
-    """Synchronous audio playback in thread"""
-    try:
-        import pygame
-        pygame.mixer.init()
-        pygame.mixer.music.load(filename)
-        pygame.mixer.music.play()
-        
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
-        
-        pygame.mixer.quit()
-    except Exception as e:
-        print(f"Audio playback error: {e}")
+
+# Background jobs keep their state in Redis and speak their result when they finish
+configure_jobs(memory, announce=play_openai_tts)
 
 
 # OpenAI + Gemini Voice Handler (DISABLED for now - using hybrid routing)
@@ -356,7 +267,8 @@ async def handle_openai_with_voice(transcription: str, session, room_id: str = N
                 *context
             ],
             temperature=0.7,
-            max_tokens=150
+            max_tokens=150,
+            timeout=remaining_timeout(10.0)
         )
         
         ai_response = response.choices[0].message.content
@@ -409,7 +321,8 @@ async def handle_openai_backup(transcription: str, session, room_id: str = None)
                 *context
             ],
             temperature=0.7,
-            max_tokens=150
+            max_tokens=150,
+            timeout=remaining_timeout(10.0)
         )
         
         ai_response = response.choices[0].message.content
@@ -478,6 +391,30 @@ async def handle_memory_commands(transcription: str, session, room_id: str = Non
             print(f"Memory status: {status}")
         return True
     
+    # Tool executor queue metrics
+    elif any(phrase in text for phrase in [
+        "tool status",
+        "tool queue status"
+    ]):
+        stats = {
+            "executor": tool_executor.stats(),
+            "cache": cache_stats(),
+            "coalesced": coalesce_stats(),
+            "rate_limits": rate_limit_stats(),
+            "app_index": app_index.stats(),
+            "file_index": file_index.stats(),
+            "background_jobs": get_job_manager().running(),
+            "shell_pool": shell_pool.stats(),
+            "vision": vision_stats(),
+            "screen_cache": screen_cache.stats(),
+            "screen_history": screen_history.stats()
+        }
+        if session:
+            await session.generate_reply(instructions=f"Tool status: {stats}")
+        else:
+            print(f"Tool status: {stats}")
+        return True
+    
     # Set preference
     elif text.startswith("set preference") or text.startswith("i prefer"):
         # Simple preference setting 
@@ -530,6 +467,18 @@ async def handle_memory_commands(transcription: str, session, room_id: str = Non
     
     return False
 
+# Seconds a fallback reply may keep speaking after the utterance budget runs out
+REPLY_PLAYOUT_ALLOWANCE = 30.0
+
+async def reply_within_budget(session, instructions: str, deadline: Deadline):
+    """LLM fallback reply; interrupted if it hasn't finished by the deadline plus time to speak it"""
+    handle = session.generate_reply(instructions=instructions)
+    try:
+        await asyncio.wait_for(asyncio.shield(handle.wait_for_playout()), deadline.remaining() + REPLY_PLAYOUT_ALLOWANCE)
+    except asyncio.TimeoutError:
+        print("LLM reply overran the utterance budget, interrupting it")
+        handle.interrupt()
+
 # Enhanced Wake Word Detection with Local Intent Parser
 async def listen_for_wake_word_and_respond(session, room_id: str = None, stt_handler=None, function_parser=None):
     access_key = os.environ["PORCUPINE_ACCESS_KEY"]
@@ -546,58 +495,55 @@ async def listen_for_wake_word_and_respond(session, room_id: str = None, stt_han
     
     # Use provided instances or create new ones (fallback for backwards compatibility)
     if stt_handler is None:
-        stt_handler = STTHandler()
+        stt_handler = STTHandler(memory)
     if function_parser is None:
-        function_parser = LocalFunctionParser(intent_parser, memory)
+        function_parser = LocalFunctionParser(intent_parser, memory, TOOL_FUNCTIONS, say_stock_reply)
     
     print("Wake word listener running with LOCAL intent classification.")
     print("Local model accuracy: 98.5% with 100% test performance")
     print(f"Memory system status: {memory.get_memory_status()}")
     
+    # Frame timing instrumentation, and optional isolation of the audio path from GC and blocking I/O
+    monitor = AudioLoopMonitor(porcupine.sample_rate, porcupine.frame_length)
+    isolation = os.getenv("JARVIS_AUDIO_ISOLATION", "0") == "1"
+    if isolation:
+        enable_gc_isolation()
+    background = BackgroundCalls(enabled=isolation)
+    
     try:
         while True:
-            pcm = stream.read(porcupine.frame_length, exception_on_overflow=False)
-            pcm = struct.unpack_from("h" * porcupine.frame_length, pcm)
-            result = porcupine.process(pcm)
+            detected = wake_word_fired(porcupine, monitor.read_frame(stream))
             
-            if result >= 0:
+            if monitor.report_due():
+                background.submit(print, monitor.summary())
+            
+            if detected:
+                monitor.pause()
                 print("Wake word 'Jarvis' detected! Starting speech recognition...")
                 
                 # Increment wake word metric
-                memory.increment_usage_metric("wake_word_triggered")
-                
-                # Start listening for speech
-                stt_handler.start_listening()
+                background.submit(memory.increment_usage_metric, "wake_word_triggered")
                 
-                # Wait for speech input (with timeout)
-                speech_detected = False
-                timeout_counter = 0
-                max_timeout = 10  # 1 second timeout for faster response
-                
-                while not speech_detected and timeout_counter < max_timeout:
-                    transcription = await stt_handler.get_transcription()
+                # Every stage below draws on one budget that starts now
+                with deadline_scope() as deadline:
+                    # Listen for the command (about one second, less if the budget runs out)
+                    transcription = await capture_command(stt_handler, deadline)
                     if transcription:
                         print(f"Transcribed: '{transcription}'")
                         
                         # Try local parser first, then fallback to LiveKit
                         tool_handled = await function_parser.try_parse_tool(transcription)
                         if not tool_handled:
-                            await session.generate_reply(instructions=transcription)
-                        speech_detected = True
-                        break  # Exit immediately after processing
-                    
-                    await asyncio.sleep(0.1)
-                    timeout_counter += 1
-                
-                # Stop listening after processing
-                stt_handler.stop_listening()
-                
-                if not speech_detected:
-                    print("No speech detected within timeout")
-                    if session:
-                        await session.generate_reply(instructions="I'm listening, but didn't hear anything. Please try again.")
+                            if deadline.expired():
+                                await say_stock_reply(session, BUDGET_EXHAUSTED_REPLY)
+                            else:
+                                await reply_within_budget(session, transcription, deadline)
                     else:
-                        print("No speech detected within timeout period")
+                        print("No speech detected within timeout")
+                        if session:
+                            await say_stock_reply(session, NO_SPEECH_REPLY)
+                        else:
+                            print("No speech detected within timeout period")
                 
                 # Brief pause before listening for next wake word
                 await asyncio.sleep(0.5)
@@ -608,15 +554,33 @@ async def listen_for_wake_word_and_respond(session, room_id: str = None, stt_han
         print(f"Error in wake word listener: {e}")
     finally:
         # Cleanup
+        print(monitor.summary())
         stream.stop_stream()
         stream.close()
         pa.terminate()
         porcupine.delete()
         stt_handler.stop_listening()
 
+def start_background_services():
+    """Threads this process needs, started here rather than at import so worker and job processes don't each run a set"""
+    # Queued emails are delivered by one sender per agent process
+    start_email_outbox()
+    # Running processes are tracked in the background so open/close checks are lookups
+    process_index.start()
+    # Installed applications are indexed once and then kept current incrementally
+    app_index.start()
+    # Personal files for open_file descriptions like "my resume"
+    file_index.start()
+    # Optional low-resolution screen history for "what was on my screen a minute ago"
+    if SCREEN_HISTORY_ENABLED:
+        screen_history.start()
+
+
 # Main Agent Session Handler
 async def entrypoint(ctx: agents.JobContext):
     """Main entry point for the agent"""
+    start_background_services()
+
     # Create LiveKit session (like your working code)
     session = AgentSession()
 
@@ -634,6 +598,10 @@ async def entrypoint(ctx: agents.JobContext):
     # Initial greeting
     await session.generate_reply(instructions=SESSION_INSTRUCTION)
     
+    # Stock replies are synthesized once and kept on disk when OpenAI TTS is configured
+    if os.getenv("OPENAI_API_KEY"):
+        asyncio.create_task(prewarm_tts_cache())
+    
     print("LiveKit agent ready with Redis memory and local parser for wake word system")
 
 
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Offline Replay Harness
+Feeds recorded WAV files through the wake -> capture -> STT -> classify -> dispatch
+stages of the voice pipeline and reports per-stage latency percentiles and throughput.
+
+Recordings must be 16 kHz, mono, 16-bit PCM (what Porcupine consumes). The fake STT
+backend reads the expected transcript from a sidecar file with the same name and a
+.txt extension, e.g. recordings/weather_london.wav + recordings/weather_london.txt.
+
+Usage:
+    python replay_harness.py recordings/ --repeat 5
+    python replay_harness.py recordings/ --wake porcupine --stt google
+"""
+
+import os
+import sys
+import glob
+import time
+import wave
+import array
+import asyncio
+import argparse
+from typing import Dict, List, Any
+
+import speech_recognition as sr
+
+from tools.deadline import deadline_scope
+from voice_pipeline import STTHandler, LocalFunctionParser, wake_word_fired, capture_command
+
+STAGES = ["wake", "capture", "stt", "classify", "dispatch"]
+
+
+# ================================
+# Wake word backends
+# ================================
+
+class EnergyWakeWord:
+    """Fake wake word engine: fires once the frame energy stays above a threshold"""
+
+    def __init__(self, sample_rate: int = 16000, frame_length: int = 512,
+                 threshold: float = 500.0, trigger_frames: int = 3):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.threshold = threshold
+        self.trigger_frames = trigger_frames
+        self._loud_frames = 0
+
+    def process(self, pcm) -> int:
+        if frame_rms(pcm) >= self.threshold:
+            self._loud_frames += 1
+        else:
+            self._loud_frames = 0
+        return 0 if self._loud_frames >= self.trigger_frames else -1
+
+    def reset(self):
+        self._loud_frames = 0
+
+    def delete(self):
+        pass
+
+
+class PorcupineWakeWord:
+    """Real Porcupine engine fed from the recording instead of the microphone"""
+
+    def __init__(self, keyword: str = "jarvis"):
+        import pvporcupine
+        self._porcupine = pvporcupine.create(access_key=os.environ["PORCUPINE_ACCESS_KEY"], keywords=[keyword])
+        self.sample_rate = self._porcupine.sample_rate
+        self.frame_length = self._porcupine.frame_length
+
+    def process(self, pcm) -> int:
+        return self._porcupine.process(pcm)
+
+    def reset(self):
+        pass
+
+    def delete(self):
+        self._porcupine.delete()
+
+
+# ================================
+# Audio source
+# ================================
+
+class ReplaySource(sr.AudioSource):
+    """Stands in for sr.Microphone: STTHandler listens to the rest of the recording
+
+    Once the recording runs out it reads like a quiet room, so speech_recognition
+    sees the end of the phrase and then times out waiting for the next one.
+    """
+
+    CHUNK = 1024
+
+    def __init__(self, pcm: bytes, sample_rate: int):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self._pcm = pcm
+        self._position = 0
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    def read(self, size: int) -> bytes:
+        size *= self.SAMPLE_WIDTH
+        chunk = self._pcm[self._position:self._position + size]
+        self._position += len(chunk)
+        if len(chunk) < size:
+            time.sleep(0.001)  # Don't spin the listening thread once the recording is over
+            chunk += bytes(size - len(chunk))
+        return chunk
+
+
+# ================================
+# Speech-to-text backends
+# ================================
+
+class SidecarTranscriptSTT:
+    """Fake STT: returns the transcript stored next to the recording"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def for_recording(self, path: str):
+        """The transcribe callable STTHandler uses in place of Google STT for this recording"""
+        def transcribe(audio: sr.AudioData) -> str:
+            if self.latency:
+                time.sleep(self.latency)  # Runs on STTHandler's executor thread, like the real request
+            transcript_path = os.path.splitext(path)[0] + ".txt"
+            if not os.path.exists(transcript_path):
+                raise sr.UnknownValueError()
+            with open(transcript_path, "r", encoding="utf-8") as f:
+                text = f.read().strip()
+            if not text:
+                raise sr.UnknownValueError()
+            return text
+        return transcribe
+
+
+class GoogleSTT:
+    """The live Google recognizer; STTHandler uses it when no transcribe callable is given"""
+
+    def for_recording(self, path: str):
+        return None
+
+
+# ================================
+# Tool sink
+# ================================
+
+class RecordingToolSink:
+    """Tool table for LocalFunctionParser that records what would have run instead of running it"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: List[Dict[str, Any]] = []
+        self.transcript = ""
+
+    def __contains__(self, function_name: str) -> bool:
+        return True
+
+    def __getitem__(self, function_name: str):
+        async def record(context, **parameters):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            self.calls.append({"transcript": self.transcript, "function_name": function_name, "parameters": parameters})
+            return "recorded"
+        return record
+
+    def record_fallback(self, transcript: str):
+        self.calls.append({"transcript": transcript, "function_name": "llm_fallback", "parameters": {}})
+
+
+class TimedClassifier:
+    """Wraps the intent parser to time classification separately from dispatch"""
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.last_seconds = 0.0
+
+    def parse_and_extract_function(self, text: str):
+        start = time.perf_counter()
+        try:
+            return self.parser.parse_and_extract_function(text)
+        finally:
+            self.last_seconds = time.perf_counter() - start
+
+
+# ================================
+# Pipeline
+# ================================
+
+def frame_rms(pcm) -> float:
+    if not pcm:
+        return 0.0
+    return (sum(s * s for s in pcm) / len(pcm)) ** 0.5
+
+
+def read_frames(path: str, frame_length: int, sample_rate: int) -> List[bytes]:
+    """Load a recording and split it into wake-word sized raw frames"""
+    with wave.open(path, "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getframerate() != sample_rate:
+            raise ValueError(f"{path}: expected mono 16-bit PCM at {sample_rate} Hz")
+        samples = array.array("h", wav.readframes(wav.getnframes()))
+    return [samples[i:i + frame_length].tobytes() for i in range(0, len(samples) - frame_length + 1, frame_length)]
+
+
+class ReplayPipeline:
+    """Runs one recording through main.py's pipeline stages and records per-stage timings
+
+    Wake detection, command capture and STT go through voice_pipeline's wake_word_fired,
+    STTHandler and capture_command, and routing through LocalFunctionParser, so the
+    numbers measure the code the wake word loop runs; only the microphone, the STT
+    request and the tools are replaced.
+    """
+
+    def __init__(self, wake_engine, stt_backend, classifier, tool_sink: RecordingToolSink,
+                 energy_threshold: float = 300.0):
+        self.wake_engine = wake_engine
+        self.stt_backend = stt_backend
+        self.classifier = TimedClassifier(classifier) if classifier else None
+        self.tool_sink = tool_sink
+        self.function_parser = LocalFunctionParser(self.classifier, None, tool_sink)
+        self.energy_threshold = energy_threshold
+        self.timings: Dict[str, List[float]] = {stage: [] for stage in STAGES + ["end_to_end"]}
+        self.missed_wake = 0
+
+    def _timed(self, transcribe, spent: List[float]):
+        if transcribe is None:
+            return None
+
+        def timed(audio):
+            start = time.perf_counter()
+            try:
+                return transcribe(audio)
+            finally:
+                spent.append(time.perf_counter() - start)
+        return timed
+
+    async def replay(self, path: str):
+        engine = self.wake_engine
+        engine.reset()
+        frames = read_frames(path, engine.frame_length, engine.sample_rate)
+
+        # Wake: process frames until the engine fires
+        start = time.perf_counter()
+        wake_index = None
+        for i, pcm in enumerate(frames):
+            if wake_word_fired(engine, pcm):
+                wake_index = i
+                break
+        wake_done = time.perf_counter()
+        if wake_index is None:
+            self.missed_wake += 1
+            return
+        self.timings["wake"].append(wake_done - start)
+
+        # Capture + STT: the live STTHandler listens to the rest of the recording
+        stt_spent: List[float] = []
+        stt_handler = STTHandler(
+            source=ReplaySource(b"".join(frames[wake_index + 1:]), engine.sample_rate),
+            transcribe=self._timed(self.stt_backend.for_recording(path), stt_spent),
+            energy_threshold=self.energy_threshold,
+        )
+        with deadline_scope() as deadline:
+            transcript = await capture_command(stt_handler, deadline)
+            stt_done = time.perf_counter()
+            stt_seconds = sum(stt_spent)
+            self.timings["capture"].append(stt_done - wake_done - stt_seconds)
+            self.timings["stt"].append(stt_seconds)
+            if not transcript:
+                return
+
+            # Classify + dispatch: LocalFunctionParser routes into the recording sink
+            self.tool_sink.transcript = transcript
+            handled = await self.function_parser.try_parse_tool(transcript)
+            if not handled:
+                self.tool_sink.record_fallback(transcript)
+        dispatch_done = time.perf_counter()
+        classify_seconds = self.classifier.last_seconds if self.classifier else 0.0
+        self.timings["classify"].append(classify_seconds)
+        self.timings["dispatch"].append(dispatch_done - stt_done - classify_seconds)
+        self.timings["end_to_end"].append(dispatch_done - start)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def print_report(pipeline: ReplayPipeline, replays: int, elapsed: float):
+    print(f"\n{'='*60}")
+    print("REPLAY BENCHMARK")
+    print(f"{'='*60}")
+    print(f"{'stage':<12}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print("-" * 60)
+    for stage, values in pipeline.timings.items():
+        print(f"{stage:<12}{len(values):>7}"
+              f"{percentile(values, 50) * 1000:>10.2f}"
+              f"{percentile(values, 90) * 1000:>10.2f}"
+              f"{percentile(values, 99) * 1000:>10.2f}"
+              f"{(max(values) if values else 0.0) * 1000:>10.2f}")
+    print("-" * 60)
+    completed = len(pipeline.timings["end_to_end"])
+    print(f"Replays: {replays}, completed: {completed}, missed wake word: {pipeline.missed_wake}")
+    print(f"Throughput: {completed / elapsed if elapsed else 0.0:.1f} utterances/s over {elapsed:.2f}s")
+
+
+async def run_replay(args) -> ReplayPipeline:
+    wake_engine = PorcupineWakeWord() if args.wake == "porcupine" else EnergyWakeWord(threshold=args.wake_threshold)
+    stt_backend = GoogleSTT() if args.stt == "google" else SidecarTranscriptSTT(latency=args.stt_latency)
+
+    classifier = None
+    if not args.no_classifier:
+        try:
+            from local_intent_parser import LocalIntentParser
+            classifier = LocalIntentParser(model_path=args.model_path)
+        except Exception as e:
+            print(f"Classifier unavailable, skipping classification: {e}")
+
+    sink = RecordingToolSink(latency=args.tool_latency)
+    pipeline = ReplayPipeline(wake_engine, stt_backend, classifier, sink, energy_threshold=args.speech_threshold)
+
+    paths = sorted(glob.glob(os.path.join(args.recordings, "*.wav")))
+    if not paths:
+        print(f"Error: no .wav files found in {args.recordings}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        for _ in range(args.repeat):
+            for path in paths:
+                await pipeline.replay(path)
+    finally:
+        wake_engine.delete()
+    elapsed = time.perf_counter() - start
+
+    print_report(pipeline, len(paths) * args.repeat, elapsed)
+    if args.show_calls:
+        print("\nDispatched calls:")
+        for call in sink.calls[:len(paths)]:
+            print(f" '{call['transcript']}' → {call['function_name']}({call['parameters']})")
+    return pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay WAV files through the voice pipeline")
+    parser.add_argument("recordings", help="Directory of 16 kHz mono WAV files")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of passes over the recordings")
+    parser.add_argument("--wake", choices=["energy", "porcupine"], default="energy")
+    parser.add_argument("--wake-threshold", type=float, default=500.0)
+    parser.add_argument("--speech-threshold", type=float, default=300.0,
+                        help="Energy threshold STTHandler uses to detect the command (skips mic calibration)")
+    parser.add_argument("--stt", choices=["sidecar", "google"], default="sidecar")
+    parser.add_argument("--stt-latency", type=float, default=0.0, help="Simulated STT latency in seconds")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Simulated tool latency in seconds")
+    parser.add_argument("--model-path", default="./intent_model/")
+    parser.add_argument("--no-classifier", action="store_true", help="Skip the intent model")
+    parser.add_argument("--show-calls", action="store_true", help="Print the calls the tool sink recorded")
+    asyncio.run(run_replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
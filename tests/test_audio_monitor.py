@@ -0,0 +1,38 @@
+from audio_monitor import AudioLoopMonitor
+
+
+class FakeStream:
+    """Input stream whose backlog is set by the test; reads never raise"""
+
+    def __init__(self, available: int, latency: float = 0.1):
+        self.available = available
+        self.latency = latency
+        self.reads = []
+
+    def get_read_available(self):
+        return self.available
+
+    def get_input_latency(self):
+        return self.latency
+
+    def read(self, frames, exception_on_overflow=True):
+        self.reads.append(exception_on_overflow)
+        return b"\0\0" * frames
+
+
+def test_full_backlog_counts_overflow_and_keeps_the_audio():
+    monitor = AudioLoopMonitor(sample_rate=16000, frame_length=512)
+    stream = FakeStream(available=1600)
+    pcm = monitor.read_frame(stream)
+    assert monitor.overflows == 1
+    assert len(pcm) == 1024
+    assert stream.reads == [False]
+
+
+def test_normal_backlog_is_not_an_overflow():
+    monitor = AudioLoopMonitor(sample_rate=16000, frame_length=512)
+    stream = FakeStream(available=512)
+    monitor.read_frame(stream)
+    monitor.read_frame(stream)
+    assert monitor.overflows == 0
+    assert monitor.frames_read == 2
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from tools import cache
+from tools.cache import cached_tool, tool_failed
+from tools.executor import blocking_tool
+
+
+class InMemoryCache:
+    """The two JarvisMemory methods cached_tool uses"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get_cached_entry(self, endpoint, params):
+        return self.entries.get((endpoint, str(sorted(params.items()))))
+
+    def cache_api_response(self, endpoint, params, response, expiry_minutes):
+        self.entries[(endpoint, str(sorted(params.items())))] = {
+            "response": response, "timestamp": datetime.now().isoformat(),
+        }
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    store = InMemoryCache()
+    monkeypatch.setattr(cache, "_memory", store)
+    return store
+
+
+def test_result_mentioning_failure_is_cached(memory):
+    calls = []
+
+    @cached_tool()
+    async def search(context, query: str) -> str:
+        calls.append(query)
+        return "Why the Hindenburg failed, and what could not be saved"
+
+    asyncio.run(search(None, "hindenburg"))
+    asyncio.run(search(None, "Hindenburg "))
+    assert calls == ["hindenburg"]
+
+
+def test_reported_failure_is_not_cached(memory):
+    calls = []
+
+    @cached_tool()
+    async def weather(context, city: str) -> str:
+        calls.append(city)
+        tool_failed()
+        return "Sunny"
+
+    asyncio.run(weather(None, "London"))
+    asyncio.run(weather(None, "London"))
+    assert calls == ["London", "London"]
+    assert not memory.entries
+
+
+def test_failure_reported_from_executor_thread(memory):
+    @cached_tool()
+    @blocking_tool(limit=1, timeout=5.0)
+    def screen_size(context) -> str:
+        tool_failed()
+        return "Screen size unavailable"
+
+    asyncio.run(screen_size(None))
+    assert not memory.entries
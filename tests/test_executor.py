@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tools.executor import ToolExecutor
+
+
+def test_timed_out_call_keeps_its_slot_until_it_finishes():
+    executor = ToolExecutor(max_workers=4)
+    running = 0
+    overlapped = False
+    lock = threading.Lock()
+
+    def press_keys(seconds):
+        nonlocal running, overlapped
+        with lock:
+            running += 1
+            overlapped = overlapped or running > 1
+        time.sleep(seconds)
+        with lock:
+            running -= 1
+        return seconds
+
+    async def go():
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run("input", 1, 0.1, press_keys, 0.4)
+        started = time.monotonic()
+        result = await executor.run("input", 1, 5.0, press_keys, 0.0)
+        return result, time.monotonic() - started
+
+    result, waited = asyncio.run(go())
+    assert result == 0.0
+    assert not overlapped
+    assert waited >= 0.2  # Queued behind the timed-out call instead of running beside it
+    stats = executor.stats()["input"]
+    assert stats["timeouts"] == 1 and stats["completed"] == 1 and stats["in_flight"] == 0
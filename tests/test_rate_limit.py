@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from tools import rate_limit
+from tools.rate_limit import RateLimiter
+
+
+def test_acquire_async_keeps_the_event_loop_running_during_redis_calls(monkeypatch):
+    def slow_script(keys, args):
+        time.sleep(0.2)  # A slow Redis round trip
+        return "0"
+
+    monkeypatch.setattr(rate_limit, "_script", slow_script)
+    limiter = RateLimiter("test", rate=1.0, burst=1)
+
+    async def go():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        acquired = await limiter.acquire_async(timeout=1.0)
+        task.cancel()
+        return acquired, ticks
+
+    acquired, ticks = asyncio.run(go())
+    assert acquired
+    assert ticks >= 10
+
+
+def test_local_bucket_rejects_when_empty(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_script", None)
+    limiter = RateLimiter("test", rate=0.1, burst=1)
+    assert limiter.acquire(timeout=0.5)
+    assert not limiter.acquire(timeout=0.5)
+    assert limiter.stats()["queued"] == 0
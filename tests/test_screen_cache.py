@@ -0,0 +1,55 @@
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from tools.screen_cache import ScreenDescriptionCache, screen_fingerprint, changed_pixels
+
+
+@pytest.fixture(scope="module")
+def editor():
+    """A 1080p dark editor with lines of small coloured text"""
+    random.seed(1)
+    image = Image.new("RGB", (1920, 1080), (30, 30, 30))
+    draw = ImageDraw.Draw(image)
+    for y in range(80, 1000, 34):
+        x = 540
+        for _ in range(random.randint(1, 6)):
+            word = "".join(random.choice("abcdefghijklmnopqrstuvwxyz_()") for _ in range(random.randint(2, 12)))
+            draw.text((x, y), word, fill=(212, 212, 212))
+            x += 8 * len(word) + 16
+    return image
+
+
+def edited(image, draw_change):
+    copy = image.copy()
+    draw_change(ImageDraw.Draw(copy))
+    return copy
+
+
+def test_blinking_cursor_is_the_same_screen(editor):
+    cursor = edited(editor, lambda draw: draw.rectangle((900, 500, 901, 516), fill=(255, 255, 255)))
+    assert changed_pixels(screen_fingerprint(editor), screen_fingerprint(cursor)) <= 4
+
+
+def test_new_line_of_text_is_a_different_screen(editor):
+    new_line = edited(editor, lambda draw: draw.text((540, 1030), "return result_value(x)", fill=(212, 212, 212)))
+    assert changed_pixels(screen_fingerprint(editor), screen_fingerprint(new_line)) > 4
+
+
+def test_cache_reuses_description_only_for_unchanged_screen(editor):
+    cache = ScreenDescriptionCache(max_entries=4, ttl=60, max_distance=4)
+    cache.put(screen_fingerprint(editor), "An editor with some code")
+    cursor = edited(editor, lambda draw: draw.rectangle((900, 500, 901, 516), fill=(255, 255, 255)))
+    new_line = edited(editor, lambda draw: draw.text((540, 1030), "return result_value(x)", fill=(212, 212, 212)))
+    assert cache.get(screen_fingerprint(editor)) == "An editor with some code"
+    assert cache.get(screen_fingerprint(cursor)) == "An editor with some code"
+    assert cache.get(screen_fingerprint(new_line)) is None
+    assert cache.get(screen_fingerprint(editor), variant=(0, 0, 800, 600)) is None
+
+
+def test_expired_descriptions_are_dropped(editor):
+    cache = ScreenDescriptionCache(max_entries=4, ttl=0, max_distance=4)
+    cache.put(screen_fingerprint(editor), "An editor with some code")
+    assert cache.get(screen_fingerprint(editor)) is None
+    assert cache.stats()["entries"] == 0
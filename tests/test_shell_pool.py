@@ -0,0 +1,50 @@
+import asyncio
+import os
+
+import pytest
+
+from tools.shell_pool import ShellPool
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="commands below use POSIX shell syntax")
+
+
+def run(commands, pool=None):
+    async def go():
+        shell_pool = pool or ShellPool()
+        try:
+            return [await shell_pool.run(command, key="test", timeout=5.0) for command in commands]
+        finally:
+            await shell_pool.close()
+    return asyncio.run(go())
+
+
+def test_output_and_exit_code():
+    result, = run(["echo out; echo err >&2; exit 0"])
+    assert result.exit_code == 0
+    assert result.stdout == "out"
+    assert result.stderr == "err"
+
+
+def test_output_before_exit_is_kept():
+    result, = run(["echo out; echo err >&2; exit 3"])
+    assert result.exit_code == 3
+    assert result.stdout == "out"
+    assert result.stderr == "err"
+
+
+def test_pool_replaces_shell_after_exit():
+    pool = ShellPool()
+    first, second = run(["exit 1", "echo still here"], pool)
+    assert first.exit_code == 1
+    assert second.ok and second.stdout == "still here"
+    assert pool.started == 2
+
+
+def test_working_directory_is_remembered(tmp_path):
+    _, result = run([f"cd {tmp_path}", "pwd"])
+    assert os.path.realpath(result.stdout) == os.path.realpath(str(tmp_path))
+
+
+def test_timeout_stops_command():
+    result, = run(["sleep 30"])
+    assert result.timed_out
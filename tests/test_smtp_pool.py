@@ -0,0 +1,34 @@
+import smtplib
+
+import pytest
+
+from tools import smtp_pool
+from tools.smtp_pool import SMTPPool
+
+
+class RefusingSMTP:
+    """Connects, then rejects the login"""
+
+    opened = []
+
+    def __init__(self, host, port, timeout=None):
+        self.closed = False
+        self.opened.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_login_closes_the_connection(monkeypatch):
+    monkeypatch.setattr(smtp_pool.smtplib, "SMTP", RefusingSMTP)
+    pool = SMTPPool("smtp.example.com", 587, "me@example.com", "wrong")
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        pool._connect()
+    assert [server.closed for server in RefusingSMTP.opened] == [True]
+    assert pool.handshakes == 0
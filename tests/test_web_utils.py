@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+import pytest
+
+from tools import web_utils
+from tools.http_client import http_get, close_http_client
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers like wttr.in's format=3, plus a path that fails before it succeeds"""
+
+    failures_left = {}
+
+    def do_GET(self):
+        path = unquote(urlparse(self.path).path).lstrip("/")
+        if path.startswith("flaky"):
+            left = self.failures_left.get(path, 1)
+            self.failures_left[path] = left - 1
+            if left > 0:
+                self._reply(503, "busy")
+                return
+        if path == "missing":
+            self._reply(404, "unknown location")
+            return
+        self.server.requests.append(path)
+        self._reply(200, f"{path}: +12°C\n")
+
+    def _reply(self, status, body):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(web_utils, "WTTR_BASE_URL", base_url)
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+
+def run(coro):
+    async def go():
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+    return asyncio.run(go())
+
+
+def test_http_get_returns_body(stand_in):
+    _, base_url = stand_in
+    response = run(http_get(f"{base_url}/London", params={"format": "3"}))
+    assert response.status_code == 200
+    assert response.text.strip() == "London: +12°C"
+
+
+def test_http_get_retries_server_errors(stand_in):
+    _, base_url = stand_in
+    response = run(http_get(f"{base_url}/flaky-once", backoff=0.01))
+    assert response.status_code == 200
+
+
+def test_http_get_returns_client_errors_without_retrying(stand_in):
+    _, base_url = stand_in
+    response = run(http_get(f"{base_url}/missing", backoff=0.01))
+    assert response.status_code == 404
+
+
+def test_get_weather_fetches_every_city(stand_in):
+    server, _ = stand_in
+    report = run(web_utils.get_weather(None, "London, Paris and Trinidad and Tobago"))
+    assert report.splitlines() == ["London: +12°C", "Paris: +12°C", "Trinidad and Tobago: +12°C"]
+    assert sorted(server.requests) == ["London", "Paris", "Trinidad and Tobago"]
+
+
+def test_get_weather_keeps_city_and_region_together(stand_in):
+    server, _ = stand_in
+    report = run(web_utils.get_weather(None, "Portland, Oregon"))
+    assert report == "Portland, Oregon: +12°C"
+    assert server.requests == ["Portland, Oregon"]
+
+
+def test_get_weather_reports_unknown_city(stand_in):
+    report = run(web_utils.get_weather(None, "missing"))
+    assert report == "Could not retrieve weather for missing."
+
+
+@pytest.mark.parametrize("text, cities", [
+    ("London", ["London"]),
+    ("London, Paris and Tokyo", ["London", "Paris", "Tokyo"]),
+    ("Trinidad and Tobago", ["Trinidad and Tobago"]),
+    ("bosnia and herzegovina and Rome", ["Bosnia and Herzegovina", "Rome"]),
+    ("Andorra & Sandown", ["Andorra", "Sandown"]),
+    ("London, Paris, and Tokyo", ["London", "Paris", "Tokyo"]),
+    ("Paris, France", ["Paris, France"]),
+    ("Portland, Oregon", ["Portland, Oregon"]),
+    ("Paris, France and Portland, Oregon", ["Paris, France", "Portland, Oregon"]),
+    ("Paris, France; Rome", ["Paris, France", "Rome"]),
+])
+def test_split_cities(text, cities):
+    assert web_utils.split_cities(text) == cities
@@ -4,7 +4,8 @@ from .mouse_key import (
 )
 from .screen import take_screenshot, get_screen_size, read_screen
 from .os_commands import (
-    open_file, run_command, close_application, open_application, find_app_paths, send_email
+    open_file, run_command, close_application, open_application, find_app_paths, send_email,
+    get_email_status, start_background_job, get_job_status, get_job_output, cancel_job
 )
 from .web_utils import (
     get_weather, search_web, get_current_time, get_current_date, get_current_datetime
@@ -27,6 +28,7 @@ __all__ = [
 
     # os_commands
     "open_file", "run_command", "close_application", "open_application", "find_app_paths", "send_email",
+    "get_email_status", "start_background_job", "get_job_status", "get_job_output", "cancel_job",
 
     # web_utils
     "get_weather", "search_web", "get_current_time", "get_current_date", "get_current_datetime",
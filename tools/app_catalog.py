@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import time
+import logging
+from threading import Lock
+from typing import Dict, List, Optional, Set, Tuple
+
+from .app_index import app_index
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "apps.json")
+EXISTS_TTL = 600.0  # Seconds an os.path.exists result is trusted
+
+# Words around an app name in a spoken command that never belong to the name itself
+FILLER_WORDS = {
+    "open", "launch", "start", "run", "close", "quit", "exit", "stop", "kill", "shut", "down", "up",
+    "the", "my", "a", "app", "application", "program", "please", "for", "me", "can", "could",
+    "would", "you", "jarvis", "hey",
+}
+
+# Coarse sound classes; vowels and h/w/y carry no class
+PHONETIC_CLASSES = {}
+for letters, code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6")):
+    for letter in letters:
+        PHONETIC_CLASSES[letter] = code
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase with spaces and punctuation removed, so "VS Code" and "vscode" are equal"""
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def phonetic_key(text: str) -> str:
+    """Soundex-style key: first letter, then consonant classes with vowels and repeats dropped"""
+    normalized = normalize_name(text).replace("ph", "f")
+    if not normalized:
+        return ""
+    key = [normalized[0]]
+    previous = PHONETIC_CLASSES.get(normalized[0], "")
+    for char in normalized[1:]:
+        code = PHONETIC_CLASSES.get(char, char if char.isdigit() else "")
+        if code and code != previous:
+            key.append(code)
+        previous = code
+    return "".join(key)
+
+
+def deletions(word: str) -> Set[str]:
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class AppEntry:
+    """One launchable application from the catalog"""
+
+    def __init__(self, name: str, config: Dict):
+        self.name = name
+        self.aliases = [name] + [alias.lower() for alias in config.get("aliases", [])]
+        self.paths = [os.path.expandvars(path) for path in config.get("paths", [])]
+        self.args = list(config.get("args", []))
+        self.uri = config.get("uri")
+        self.processes = list(config.get("processes", [f"{name}.exe"]))
+
+
+class AppCatalog:
+    """Application catalog compiled once from apps.json
+
+    Names resolve through precomputed indexes, cheapest first: normalized aliases, then
+    one-edit neighbours (so "team" finds "steam"), then phonetic keys. Fuzzy matches that
+    could mean more than one app are rejected rather than guessed.
+    """
+
+    MIN_FUZZY_LENGTH = 4  # Shorter names are only matched exactly
+    MIN_SUBSTITUTION_LENGTH = 6
+
+    def __init__(self, config_path: Optional[str] = None):
+        self.config_path = config_path or os.getenv("JARVIS_APPS_CONFIG", DEFAULT_CATALOG_PATH)
+        self._lock = Lock()
+        self._exists: Dict[str, Tuple[bool, float]] = {}
+        self.load()
+
+    def load(self):
+        """(Re)compile the catalog and its lookup indexes from the config file"""
+        try:
+            with open(self.config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load app catalog {self.config_path}: {e}")
+            config = {}
+
+        entries = {name.lower(): AppEntry(name.lower(), app) for name, app in config.items()}
+        exact: Dict[str, str] = {}
+        deleted: Dict[str, Set[str]] = {}
+        phonetic: Dict[str, Set[str]] = {}
+        for entry in entries.values():
+            for alias in entry.aliases:
+                normalized = normalize_name(alias)
+                exact[normalized] = entry.name
+                if len(normalized) >= self.MIN_FUZZY_LENGTH:
+                    for variant in deletions(normalized):
+                        deleted.setdefault(variant, set()).add(entry.name)
+                    phonetic.setdefault(phonetic_key(alias), set()).add(entry.name)
+
+        with self._lock:
+            self.entries = entries
+            self._exact = exact
+            self._deleted = deleted
+            self._phonetic = phonetic
+            self._resolved: Dict[Tuple[str, bool], Optional[str]] = {}
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def _fuzzy(self, normalized: str) -> Optional[str]:
+        if len(normalized) < self.MIN_FUZZY_LENGTH:
+            return None
+        # One letter missing from the spoken name ("team" -> "steam")
+        candidates = set(self._deleted.get(normalized, ()))
+        for variant in deletions(normalized):
+            # One letter too many ("chromme"), or one letter wrong for longer names
+            if variant in self._exact:
+                candidates.add(self._exact[variant])
+            if len(normalized) >= self.MIN_SUBSTITUTION_LENGTH:
+                candidates |= self._deleted.get(variant, set())
+        if not candidates:
+            key = phonetic_key(normalized)
+            if len(key) >= 3:
+                candidates = self._phonetic.get(key, set())
+        return next(iter(candidates)) if len(candidates) == 1 else None
+
+    def resolve(self, spoken: str, fuzzy: bool = True) -> Optional[AppEntry]:
+        """Catalog entry for a spoken application name, or None"""
+        normalized = normalize_name(spoken)
+        if not normalized:
+            return None
+        memo_key = (normalized, fuzzy)
+        if memo_key not in self._resolved:
+            name = self._exact.get(normalized)
+            if name is None and fuzzy:
+                name = self._fuzzy(normalized)
+            if len(self._resolved) > 1024:
+                self._resolved.clear()
+            self._resolved[memo_key] = name
+        name = self._resolved[memo_key]
+        return self.entries[name] if name else None
+
+    def resolve_in_text(self, text: str) -> Optional[AppEntry]:
+        """Find an application named anywhere in a command, longest phrase first"""
+        words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in FILLER_WORDS]
+        phrases = [" ".join(words[i:i + n]) for n in range(len(words), 0, -1) for i in range(len(words) - n + 1)]
+        # Exact aliases anywhere beat fuzzy matches, so "open code in chrome" can't fuzz "code in"
+        for fuzzy in (False, True):
+            for phrase in phrases:
+                entry = self.resolve(phrase, fuzzy=fuzzy)
+                if entry:
+                    return entry
+        return None
+
+    def process_names(self, app_name: str) -> List[str]:
+        """Process names an application runs under, falling back to the app name itself"""
+        entry = self.resolve(app_name)
+        if entry:
+            return entry.processes
+        app_name = app_name.lower()
+        return [f"{app_name}.exe", app_name]
+
+    def exists(self, path: str) -> bool:
+        """os.path.exists, remembered for EXISTS_TTL seconds"""
+        now = time.monotonic()
+        cached = self._exists.get(path)
+        if cached is None or now - cached[1] > EXISTS_TTL:
+            cached = (os.path.exists(path), now)
+            self._exists[path] = cached
+        return cached[0]
+
+    def invalidate(self, path: Optional[str] = None):
+        """Forget cached existence checks for one path, or all of them"""
+        if path is None:
+            self._exists.clear()
+        else:
+            self._exists.pop(path, None)
+
+    def launch_paths(self, entry: AppEntry) -> List[str]:
+        """Configured paths that exist, or installed executables found by the app index"""
+        paths = [path for path in entry.paths if self.exists(path)]
+        if not paths and app_index.wait_ready(0):
+            # Configured paths go stale when apps update into versioned folders
+            paths = app_index.find(entry.name, exact=True, kinds=("exe", "bin"))
+        return paths
+
+
+app_catalog = AppCatalog()
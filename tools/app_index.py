@@ -0,0 +1,105 @@
+import os
+import sys
+import stat
+from typing import Dict, List, Optional, Tuple
+
+from .fs_index import FileSystemIndex
+
+# Windows install roots, searched a few levels deep like the old os.walk scan
+WINDOWS_ROOTS = [
+    r"%ProgramFiles%",
+    r"%ProgramFiles(x86)%",
+    r"%LocalAppData%\Programs",
+    r"%AppData%\Local",
+    r"%AppData%\Roaming",
+]
+WINDOWS_DEPTH = 4
+
+# Freedesktop launcher directories
+DESKTOP_ROOTS = [
+    "/usr/share/applications",
+    "/usr/local/share/applications",
+    "~/.local/share/applications",
+    "/var/lib/flatpak/exports/share/applications",
+    "~/.local/share/flatpak/exports/share/applications",
+    "/var/lib/snapd/desktop/applications",
+]
+
+
+def parse_desktop_entry(path: str) -> Optional[Dict[str, str]]:
+    """Name and Exec of a .desktop launcher, or None if it should not be offered"""
+    fields: Dict[str, str] = {}
+    in_entry = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_entry:
+                        break  # Only the main [Desktop Entry] group describes the app
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line:
+                    key, value = line.split("=", 1)
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+    if fields.get("Type", "Application") != "Application" or fields.get("Hidden") == "true":
+        return None
+    return fields
+
+
+class AppIndex(FileSystemIndex):
+    """Executables and launchers: Windows install folders, .desktop files and PATH"""
+
+    def __init__(self, index_path: str = "./app_index.json"):
+        super().__init__("app", index_path)
+        self.is_windows = sys.platform == "win32"
+
+    def roots(self) -> List[Tuple[str, int]]:
+        roots = []
+        if self.is_windows:
+            roots += [(os.path.expandvars(root), WINDOWS_DEPTH) for root in WINDOWS_ROOTS]
+        else:
+            roots += [(os.path.expanduser(root), 1) for root in DESKTOP_ROOTS]
+        roots += [(directory, 0) for directory in os.environ.get("PATH", "").split(os.pathsep) if directory]
+
+        unique = {}
+        for root, depth in roots:
+            # Unexpanded variables mean the folder does not exist on this machine
+            if "%" not in root:
+                unique.setdefault(os.path.normpath(root), depth)
+        return list(unique.items())
+
+    def record(self, entry: os.DirEntry) -> Optional[Dict]:
+        name_lower = entry.name.lower()
+        stem = os.path.splitext(name_lower)[0]
+        parent = os.path.basename(os.path.dirname(entry.path)).lower()
+
+        if name_lower.endswith(".exe"):
+            # Folder names count too: "discord" finds Update.exe under ...\Discord\
+            return {"kind": "exe", "keys": sorted({stem, parent})}
+
+        if name_lower.endswith(".desktop"):
+            fields = parse_desktop_entry(entry.path)
+            if fields is None:
+                return None
+            display_name = fields.get("Name", stem)
+            return {"kind": "desktop", "name": display_name, "exec": fields.get("Exec", ""),
+                    "keys": sorted({stem, display_name.lower()})}
+
+        if not self.is_windows and entry.is_file():
+            if entry.stat().st_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH):
+                return {"kind": "bin", "keys": [name_lower]}
+        return None
+
+    def find(self, app_name: str, limit: int = 10, exact: bool = False,
+             kinds: Tuple[str, ...] = ("desktop", "exe", "bin")) -> List[str]:
+        """Paths for an application name, exact name matches first"""
+        query = app_name.lower().strip()
+        matches = [m for m in self.match(query) if m[2]["kind"] in kinds and (m[0] == query or not exact)]
+        kind_order = {"desktop": 0, "exe": 1, "bin": 2}
+        matches.sort(key=lambda m: (m[0] != query, kind_order.get(m[2]["kind"], 3), len(m[1]), m[1]))
+        return list(dict.fromkeys(path for _, path, _ in matches))[:limit]
+
+
+app_index = AppIndex()
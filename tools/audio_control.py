@@ -1,5 +1,6 @@
 import logging
 from livekit.agents import function_tool, RunContext
+from .executor import blocking_tool
 import pyautogui
 import time
 
@@ -15,7 +16,8 @@ except ImportError:
     AUDIO_AVAILABLE = False
 
 @function_tool()
-async def adjust_volume(
+@blocking_tool(limit=1, timeout=10.0, group="input")
+def adjust_volume(
     context: RunContext,  
     action: str,
     amount: int = 5) -> str:
@@ -0,0 +1,154 @@
+import asyncio
+import inspect
+import logging
+import functools
+import contextvars
+from datetime import datetime
+from typing import Callable, Dict
+
+from .deadline import BUDGET_EXHAUSTED_REPLY
+from .rate_limit import background_context
+
+# Set from main.py once the Redis memory system is up; caching is a no-op until then
+_memory = None
+_refreshing: set = set()
+_background_tasks: set = set()
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def as_dict(self) -> Dict:
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses, "refreshes": self.refreshes}
+
+
+_stats: Dict[str, CacheStats] = {}
+
+
+class _Outcome:
+    """Whether the tool call in progress reported a failure"""
+
+    def __init__(self):
+        self.failed = False
+
+
+# The object (not a flag) is shared, so a failure reported from an executor thread or a
+# gathered sub-task is still seen by the cached_tool wrapper that set it
+_current_outcome: contextvars.ContextVar = contextvars.ContextVar("jarvis_tool_outcome", default=None)
+
+
+def tool_failed():
+    """Mark the current tool call as failed, so the message it returns isn't cached"""
+    outcome = _current_outcome.get()
+    if outcome is not None:
+        outcome.failed = True
+
+
+def configure_tool_cache(memory_system):
+    """Point the tool cache at a JarvisMemory instance"""
+    global _memory
+    _memory = memory_system
+
+
+def cache_stats() -> Dict[str, Dict]:
+    """Hit/miss counters per cached tool"""
+    return {name: stats.as_dict() for name, stats in _stats.items()}
+
+
+def normalize_text(value: str) -> str:
+    """Case- and whitespace-insensitive key for city names and search queries"""
+    return " ".join(value.casefold().split())
+
+
+def normalized_arguments(signature: inspect.Signature, args, kwargs) -> Dict:
+    """Tool arguments (minus the run context) with string values normalized"""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = dict(bound.arguments)
+    params.pop("context", None)
+    return {k: normalize_text(v) if isinstance(v, str) else v for k, v in params.items()}
+
+
+async def _call(fn: Callable, args, kwargs):
+    """Run the tool; returns (result, succeeded)"""
+    outcome = _Outcome()
+    token = _current_outcome.set(outcome)
+    try:
+        result = await fn(*args, **kwargs)
+    finally:
+        _current_outcome.reset(token)
+    succeeded = not outcome.failed and isinstance(result, str) and result != BUDGET_EXHAUSTED_REPLY
+    return result, succeeded
+
+
+def cached_tool(ttl_minutes: int = 15, stale_minutes: int = 60):
+    """Read-through cache for idempotent tools, stored with JarvisMemory.cache_api_response
+
+    Apply below @function_tool(). String arguments are normalized before keying.
+    Entries younger than `ttl_minutes` are served as-is; older ones are still served
+    for up to `stale_minutes` more while a background call refreshes them. Results of
+    calls that reported tool_failed() are never stored.
+    """
+    def decorator(fn: Callable):
+        signature = inspect.signature(fn)
+        endpoint = f"tool:{fn.__name__}"
+        stats = _stats.setdefault(fn.__name__, CacheStats())
+
+        def store(params: Dict, result, succeeded: bool):
+            if succeeded:
+                _memory.cache_api_response(endpoint, params, result, expiry_minutes=ttl_minutes + stale_minutes)
+
+        async def refresh(params: Dict, args, kwargs):
+            key = (endpoint, str(sorted(params.items())))
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+            try:
+                store(params, *await _call(fn, args, kwargs))
+                stats.refreshes += 1
+            except Exception as e:
+                logging.error(f"Background refresh of {fn.__name__} failed: {e}")
+            finally:
+                _refreshing.discard(key)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if _memory is None:
+                return await fn(*args, **kwargs)
+
+            params = normalized_arguments(signature, args, kwargs)
+            try:
+                entry = _memory.get_cached_entry(endpoint, params)
+            except Exception as e:
+                logging.error(f"Tool cache lookup failed for {fn.__name__}: {e}")
+                entry = None
+
+            if entry:
+                age_minutes = (datetime.now() - datetime.fromisoformat(entry["timestamp"])).total_seconds() / 60
+                if age_minutes <= ttl_minutes:
+                    stats.hits += 1
+                else:
+                    stats.stale_hits += 1
+                    # Fresh context: the refresh must not inherit this utterance's deadline,
+                    # and its upstream calls queue behind interactive ones
+                    task = asyncio.get_running_loop().create_task(
+                        refresh(params, args, kwargs), context=background_context()
+                    )
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+                return entry["response"]
+
+            stats.misses += 1
+            result, succeeded = await _call(fn, args, kwargs)
+            try:
+                store(params, result, succeeded)
+            except Exception as e:
+                logging.error(f"Tool cache store failed for {fn.__name__}: {e}")
+            return result
+
+        return wrapper
+    return decorator
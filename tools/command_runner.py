@@ -0,0 +1,208 @@
+import os
+import time
+import asyncio
+import contextlib
+import locale
+import signal
+import logging
+import subprocess
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import psutil
+
+MAX_OUTPUT_BYTES = 64 * 1024  # Kept per stream; the middle of longer output is dropped
+READ_CHUNK = 4096
+MAX_CONCURRENT_COMMANDS = 4
+KILL_GRACE = 2.0  # Seconds a stopped command gets to exit before it is killed
+
+OUTPUT_ENCODING = locale.getpreferredencoding(False)
+
+_command_slots: Optional[asyncio.Semaphore] = None
+
+
+class OutputBuffer:
+    """Keeps the head and tail of a stream within a byte budget, counting what was dropped"""
+
+    def __init__(self, max_bytes: int = MAX_OUTPUT_BYTES):
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail: deque = deque()
+        self.tail_bytes = 0
+        self.total_bytes = 0
+
+    def write(self, chunk: bytes):
+        self.total_bytes += len(chunk)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if not chunk:
+            return
+        self.tail.append(chunk)
+        self.tail_bytes += len(chunk)
+        while self.tail_bytes - len(self.tail[0]) >= self.tail_limit:
+            self.tail_bytes -= len(self.tail.popleft())
+
+    @property
+    def dropped_bytes(self) -> int:
+        return self.total_bytes - len(self.head) - min(self.tail_bytes, self.tail_limit)
+
+    def text(self) -> str:
+        tail = b"".join(self.tail)
+        extra = len(tail) - self.tail_limit
+        if extra > 0:
+            tail = tail[extra:]
+        dropped = self.dropped_bytes
+        head_text = bytes(self.head).decode(OUTPUT_ENCODING, errors="replace")
+        tail_text = tail.decode(OUTPUT_ENCODING, errors="replace")
+        if dropped > 0:
+            return f"{head_text}\n... [{dropped} bytes truncated] ...\n{tail_text}".strip()
+        return (head_text + tail_text).strip()
+
+
+class CommandResult:
+    """Outcome of one command: exit status, captured (possibly truncated) output and timing"""
+
+    def __init__(self, command: str):
+        self.command = command
+        self.exit_code: Optional[int] = None
+        self.stdout = ""
+        self.stderr = ""
+        self.duration = 0.0
+        self.timed_out = False
+        self.cancelled = False
+        self.truncated = False
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0 and not self.timed_out and not self.cancelled
+
+    def as_dict(self) -> Dict:
+        return {
+            "command": self.command,
+            "exit_code": self.exit_code,
+            "ok": self.ok,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "truncated": self.truncated,
+            "duration_ms": round(self.duration * 1000, 1),
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+        }
+
+    def summary(self, timeout: Optional[float] = None) -> str:
+        """What run_command tells the user"""
+        if self.timed_out:
+            message = f"Command timed out after {timeout:.0f} seconds" if timeout else "Command timed out"
+            return f"{message}. Output so far:\n{self.stdout}" if self.stdout else message
+        if self.cancelled:
+            return "Command was cancelled"
+        if self.exit_code == 0:
+            return f"Command executed successfully:\n{self.stdout}" if self.stdout else "Command executed successfully (no output)"
+        failed = f"Command failed with return code {self.exit_code}"
+        return f"{failed}:\n{self.stderr}" if self.stderr else failed
+
+
+def signal_process_tree(pid: int, kill: bool = False):
+    """Terminate (or kill) a shell and everything it started"""
+    try:
+        parent = psutil.Process(pid)
+        # Parent first, so the shell can't move on to its next command when a child dies
+        procs = [parent] + parent.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return
+    if os.name != "nt":
+        # Commands run in their own session, so one signal reaches the whole group at once
+        try:
+            os.killpg(pid, signal.SIGKILL if kill else signal.SIGTERM)
+        except OSError:
+            pass
+    for proc in procs:
+        try:
+            proc.kill() if kill else proc.terminate()
+        except psutil.Error:
+            continue
+
+
+async def _stop(proc: asyncio.subprocess.Process):
+    """Terminate the command's process tree, killing it if it outlives KILL_GRACE"""
+    if proc.returncode is not None:
+        return
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, signal_process_tree, proc.pid)
+    try:
+        await asyncio.wait_for(proc.wait(), KILL_GRACE)
+    except asyncio.TimeoutError:
+        await loop.run_in_executor(None, signal_process_tree, proc.pid, True)
+        await proc.wait()
+
+
+async def _pump(stream: asyncio.StreamReader, buffer: OutputBuffer, name: str,
+                on_output: Optional[Callable[[str, bytes], None]]):
+    while True:
+        chunk = await stream.read(READ_CHUNK)
+        if not chunk:
+            return
+        buffer.write(chunk)
+        if on_output:
+            on_output(name, chunk)
+
+
+async def run_streaming(command: str, timeout: Optional[float] = None,
+                        on_output: Optional[Callable[[str, bytes], None]] = None,
+                        max_output_bytes: int = MAX_OUTPUT_BYTES, cwd: Optional[str] = None,
+                        interactive: bool = True) -> CommandResult:
+    """Run a shell command without blocking the event loop
+
+    stdout and stderr are read incrementally into bounded buffers (and passed to on_output as
+    they arrive). On timeout the process tree is stopped and the partial output returned; if
+    the calling task is cancelled the process tree is stopped before the cancellation
+    propagates. Interactive commands share MAX_CONCURRENT_COMMANDS slots; background jobs
+    are limited by the job manager instead, so they never hold up run_command.
+    """
+    global _command_slots
+    if _command_slots is None:
+        _command_slots = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+
+    result = CommandResult(command)
+    stdout, stderr = OutputBuffer(max_output_bytes), OutputBuffer(max_output_bytes)
+    async with _command_slots if interactive else contextlib.nullcontext():
+        start = time.monotonic()
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            start_new_session=os.name != "nt",
+        )
+        pumps = asyncio.gather(
+            _pump(proc.stdout, stdout, "stdout", on_output),
+            _pump(proc.stderr, stderr, "stderr", on_output),
+            proc.wait(),
+        )
+        try:
+            await asyncio.wait_for(asyncio.shield(pumps), timeout)
+        except asyncio.TimeoutError:
+            result.timed_out = True
+            logging.error(f"Command '{command}' timed out")
+        except asyncio.CancelledError:
+            result.cancelled = True
+            logging.info(f"Command '{command}' cancelled, stopping it")
+            raise
+        finally:
+            if result.timed_out or result.cancelled:
+                await asyncio.shield(_stop(proc))
+                try:
+                    # Reap the shell and collect whatever it wrote before it was stopped
+                    await asyncio.wait_for(asyncio.shield(pumps), KILL_GRACE)
+                except asyncio.TimeoutError:
+                    pumps.cancel()
+            result.duration = time.monotonic() - start
+            result.exit_code = proc.returncode
+            result.stdout = stdout.text()
+            result.stderr = stderr.text()
+            result.truncated = stdout.dropped_bytes > 0 or stderr.dropped_bytes > 0
+    return result
@@ -0,0 +1,66 @@
+import os
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+
+# End-to-end budget for one utterance, from wake word to the spoken answer
+DEFAULT_UTTERANCE_BUDGET = float(os.getenv("JARVIS_UTTERANCE_BUDGET", 8.0))
+
+# Smallest timeout handed to a blocking call (requests rejects a timeout of 0)
+MIN_TIMEOUT = 0.1
+
+BUDGET_EXHAUSTED_REPLY = "My apologies, Sir, that is taking longer than it should. Please try again."
+
+
+class Deadline:
+    """Absolute point in time by which the current utterance must be answered"""
+
+    def __init__(self, budget: float = DEFAULT_UTTERANCE_BUDGET):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Remaining budget, optionally capped by a stage-specific timeout"""
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar("jarvis_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the utterance being handled, or None outside the voice pipeline"""
+    return _current_deadline.get()
+
+
+def remaining_timeout(cap: float) -> float:
+    """Timeout for a blocking call: `cap` limited to what is left of the current budget"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return cap
+    return max(MIN_TIMEOUT, deadline.timeout(cap))
+
+
+def budget_exhausted() -> bool:
+    """True when the current utterance has no budget left"""
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.expired()
+
+
+@contextmanager
+def deadline_scope(budget: float = DEFAULT_UTTERANCE_BUDGET):
+    """Create a deadline at wake time and make it visible to every stage awaited inside"""
+    deadline = Deadline(budget)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
@@ -0,0 +1,127 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from .deadline import remaining_timeout
+
+# Shared pool for every blocking tool body; per-tool limits below keep one tool from starving the rest
+DEFAULT_TOOL_WORKERS = int(os.getenv("JARVIS_TOOL_WORKERS", 8))
+
+
+class ToolStats:
+    """Queue and execution counters for one concurrency group"""
+
+    def __init__(self):
+        self.waiting = 0
+        self.max_waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    def as_dict(self) -> Dict:
+        finished = self.completed + self.timeouts
+        return {
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / finished * 1000, 2) if finished else 0.0,
+            "avg_run_ms": round(self.total_run / finished * 1000, 2) if finished else 0.0,
+        }
+
+
+class ToolExecutor:
+    """Runs blocking tool bodies on a bounded thread pool so the event loop never waits on tool I/O"""
+
+    def __init__(self, max_workers: int = DEFAULT_TOOL_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jarvis-tool")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, ToolStats] = {}
+
+    def _group(self, group: str, limit: int):
+        if group not in self._semaphores:
+            self._semaphores[group] = asyncio.Semaphore(limit)
+            self._stats[group] = ToolStats()
+        return self._semaphores[group], self._stats[group]
+
+    async def run(self, group: str, limit: int, timeout: float, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool, at most `limit` at a time per group"""
+        semaphore, stats = self._group(group, limit)
+
+        queued_at = time.perf_counter()
+        stats.waiting += 1
+        stats.max_waiting = max(stats.max_waiting, stats.waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+
+        started_at = time.perf_counter()
+        stats.total_wait += started_at - queued_at
+        stats.in_flight += 1
+        loop = asyncio.get_running_loop()
+
+        def finished():
+            stats.in_flight -= 1
+            stats.total_run += time.perf_counter() - started_at
+            semaphore.release()
+
+        def on_done(_):
+            # The slot is only freed once the body has really stopped, not when the caller gave up
+            # on it: a timed-out pyautogui call must not overlap the next one in the same group
+            try:
+                loop.call_soon_threadsafe(finished)
+            except RuntimeError:
+                pass  # Loop already closed at shutdown
+
+        try:
+            # Copy the context so the worker thread sees the caller's utterance deadline
+            ctx = contextvars.copy_context()
+            future = self._pool.submit(ctx.run, fn, *args, **kwargs)
+        except BaseException:
+            finished()
+            raise
+        future.add_done_callback(on_done)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=remaining_timeout(timeout))
+            stats.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-group queue depth and latency metrics"""
+        return {group: stats.as_dict() for group, stats in self._stats.items()}
+
+
+tool_executor = ToolExecutor()
+
+
+def blocking_tool(limit: int = 4, timeout: float = 30.0, group: Optional[str] = None):
+    """Turn a synchronous tool body into an async tool that runs on the shared executor
+
+    Apply below @function_tool(): the wrapper keeps the name, docstring and signature
+    LiveKit builds the tool schema from. A timeout is reported as a tool result string.
+    """
+    def decorator(fn: Callable):
+        group_name = group or fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await tool_executor.run(group_name, limit, timeout, fn, *args, **kwargs)
+            except asyncio.TimeoutError:
+                logging.error(f"{fn.__name__} timed out")
+                return f"{fn.__name__.replace('_', ' ').capitalize()} timed out, please try again."
+
+        return wrapper
+    return decorator
@@ -0,0 +1,135 @@
+import os
+import re
+import math
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from .fs_index import FileSystemIndex
+
+DEFAULT_FILE_DIRS = ["~/Documents", "~/Desktop", "~/Downloads", "~/Pictures", "~/Music", "~/Videos"]
+MAX_DEPTH = 6
+
+SKIPPED_DIRS = {"node_modules", "__pycache__", "venv", "site-packages", "appdata", "$recycle.bin"}
+
+# Spoken words that never name a file
+FILLER_WORDS = {
+    "open", "load", "show", "me", "my", "the", "a", "an", "file", "files", "please", "up", "that",
+    "called", "named", "from", "in", "on", "of", "for", "with", "can", "you", "jarvis",
+}
+
+# Spoken words that describe a kind of file rather than its name
+TYPE_WORDS: Dict[str, Set[str]] = {
+    "pdf": {"pdf"},
+    "document": {"doc", "docx", "pdf", "odt", "txt", "rtf"},
+    "doc": {"doc", "docx"},
+    "word": {"doc", "docx"},
+    "spreadsheet": {"xls", "xlsx", "csv", "ods"},
+    "excel": {"xls", "xlsx"},
+    "sheet": {"xls", "xlsx", "csv", "ods"},
+    "presentation": {"ppt", "pptx", "odp", "key"},
+    "slides": {"ppt", "pptx", "odp", "key"},
+    "powerpoint": {"ppt", "pptx"},
+    "picture": {"png", "jpg", "jpeg", "gif", "heic", "webp"},
+    "photo": {"png", "jpg", "jpeg", "heic"},
+    "image": {"png", "jpg", "jpeg", "gif", "webp", "bmp"},
+    "screenshot": {"png", "jpg"},
+    "video": {"mp4", "mkv", "mov", "avi", "webm"},
+    "song": {"mp3", "flac", "wav", "m4a", "ogg"},
+    "notes": {"txt", "md"},
+    "text": {"txt", "md"},
+    "zip": {"zip", "rar", "7z"},
+}
+RECENCY_WORDS = {"latest", "recent", "newest", "last", "new"}
+
+
+def name_tokens(name: str) -> List[str]:
+    """Words in a file name: "JohnDoe_Resume-2024" -> john, doe, resume, 2024"""
+    spaced = re.sub(r"([a-z])([A-Z])", r"\1 \2", name)
+    return [token for token in re.split(r"[^a-z0-9]+|(?<=[a-z])(?=[0-9])|(?<=[0-9])(?=[a-z])", spaced.lower()) if token]
+
+
+class FileIndex(FileSystemIndex):
+    """The user's own files, searchable by spoken description
+
+    Files are indexed under their name tokens and full lowercase stem, with extension and
+    modification time kept for ranking. Configure the folders with JARVIS_FILE_DIRS.
+    """
+
+    def __init__(self, index_path: str = "./file_index.json"):
+        super().__init__("file", index_path)
+
+    def roots(self) -> List[Tuple[str, int]]:
+        configured = os.getenv("JARVIS_FILE_DIRS")
+        directories = configured.split(os.pathsep) if configured else DEFAULT_FILE_DIRS
+        return [(os.path.normpath(os.path.expanduser(directory)), MAX_DEPTH)
+                for directory in directories if directory]
+
+    def skip_dir(self, name: str) -> bool:
+        return name.startswith(".") or name.lower() in SKIPPED_DIRS
+
+    def record(self, entry: os.DirEntry) -> Optional[Dict]:
+        if entry.name.startswith(".") or entry.name.startswith("~$") or not entry.is_file(follow_symlinks=False):
+            return None
+        stem, ext = os.path.splitext(entry.name)
+        keys = set(name_tokens(stem))
+        keys.add(stem.lower())
+        return {"keys": sorted(keys), "ext": ext.lstrip(".").lower(), "mtime": entry.stat().st_mtime}
+
+    def _token_matches(self, token: str) -> Dict[str, float]:
+        """Paths matching one spoken word, with how well they match"""
+        key_scores: Dict[str, float] = {token: 1.0}
+        if len(token) >= 3:
+            for key, _, _ in self.match(token):
+                key_scores.setdefault(key, 0.8)  # "resume" inside "resume_final"
+            if len(token) >= 4:
+                for key, similarity in self.similar_keys(token).items():
+                    key_scores.setdefault(key, 0.7 * similarity)  # Misheard or misspelt
+        paths: Dict[str, float] = {}
+        for key, score in key_scores.items():
+            for path, _ in self.lookup(key):
+                paths[path] = max(paths.get(path, 0.0), score)
+        return paths
+
+    def search(self, description: str, limit: int = 5) -> List[Tuple[float, str]]:
+        """Ranked (score, path) candidates for a spoken description such as 'my latest resume pdf'"""
+        words = [w for w in re.findall(r"[a-z0-9]+", description.lower()) if w not in FILLER_WORDS]
+        extensions: Set[str] = set()
+        wants_recent = False
+        tokens = []
+        for word in words:
+            if word in RECENCY_WORDS:
+                wants_recent = True
+            elif word in TYPE_WORDS:
+                extensions |= TYPE_WORDS[word]
+            else:
+                tokens.append(word)
+
+        now = time.time()
+        scores: Dict[str, float] = {}
+        if tokens:
+            # Every spoken word has to match somewhere in the name
+            matched = [self._token_matches(token) for token in tokens]
+            candidates = set.intersection(*(set(paths) for paths in matched))
+            for path in candidates:
+                scores[path] = sum(paths[path] for paths in matched) / len(tokens)
+        elif extensions:
+            # "open my latest pdf": any file of that type, ranked by recency alone
+            with self._lock:
+                scores = {path: 0.5 for path, record in self._records.items() if record["ext"] in extensions}
+
+        ranked = []
+        for path, score in scores.items():
+            with self._lock:
+                record = self._records.get(path)
+            if record is None:
+                continue
+            if extensions:
+                score += 0.5 if record["ext"] in extensions else -0.5
+            age_days = max(0.0, now - record["mtime"]) / 86400
+            score += (1.0 if wants_recent else 0.2) * math.exp(-age_days / 30)
+            ranked.append((round(score, 3), path))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return ranked[:limit]
+
+
+file_index = FileIndex()
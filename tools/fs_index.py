@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread, Event
+from typing import Dict, List, Optional, Set, Tuple
+
+from .fs_watch import DirectoryWatcher
+
+SAVE_INTERVAL = 30.0  # Seconds between checks for unsaved index changes
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class FileSystemIndex:
+    """Persistent index of selected files under a set of roots, maintained incrementally
+
+    Each directory is stored with the mtime it had when scanned. A refresh only stats known
+    directories and rescans the ones whose mtime changed (an entry was added, removed or
+    renamed); on Linux inotify triggers the same per-directory rescan as soon as something
+    changes. Records are looked up by their lowercase keys through a trigram index.
+
+    Subclasses provide roots() and record(); record() returns None to skip a file or a dict
+    whose "keys" are the names the file should be found under.
+    """
+
+    VERSION = 1
+
+    def __init__(self, name: str, index_path: str, poll_interval: float = 300.0, workers: int = 4):
+        self.name = name
+        self.index_path = index_path
+        self.poll_interval = poll_interval
+        self.workers = workers
+        self._dirs: Dict[str, Dict] = {}
+        self._records: Dict[str, Dict] = {}
+        self._by_key: Dict[str, Set[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._lock = Lock()
+        self._ready = Event()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._dirty = False
+        self._watcher = DirectoryWatcher(self._on_change)
+        self.last_refresh_seconds = 0.0
+
+    def roots(self) -> List[Tuple[str, int]]:
+        """(directory, max depth) pairs to index"""
+        raise NotImplementedError
+
+    def record(self, entry: os.DirEntry) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def skip_dir(self, name: str) -> bool:
+        return name.startswith(".")
+
+    # Record bookkeeping (callers hold self._lock)
+
+    def _add_record(self, path: str, record: Dict):
+        self._remove_record(path)
+        self._records[path] = record
+        for key in record["keys"]:
+            if key not in self._by_key:
+                self._by_key[key] = set()
+                for gram in trigrams(key):
+                    self._trigrams.setdefault(gram, set()).add(key)
+            self._by_key[key].add(path)
+
+    def _remove_record(self, path: str):
+        record = self._records.pop(path, None)
+        if record is None:
+            return
+        for key in record["keys"]:
+            paths = self._by_key.get(key)
+            if paths is None:
+                continue
+            paths.discard(path)
+            if not paths:
+                del self._by_key[key]
+                for gram in trigrams(key):
+                    keys = self._trigrams.get(gram)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del self._trigrams[gram]
+
+    def _drop_tree(self, path: str):
+        state = self._dirs.pop(path, None)
+        if state is None:
+            return
+        for file_path in state["files"]:
+            self._remove_record(file_path)
+        for subdir in state["subdirs"]:
+            self._drop_tree(subdir)
+        self._watcher.unwatch(path)
+        self._dirty = True
+
+    # Scanning
+
+    def _scan(self, path: str, depth: int, max_depth: int):
+        """One os.scandir pass over a directory, without touching the index"""
+        try:
+            mtime = os.stat(path).st_mtime
+            records, subdirs = {}, []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if depth < max_depth and not self.skip_dir(entry.name):
+                                subdirs.append(entry.path)
+                            continue
+                        record = self.record(entry)
+                    except OSError:
+                        continue
+                    if record:
+                        records[entry.path] = record
+        except OSError:
+            return None
+        return {"mtime": mtime, "depth": depth, "max_depth": max_depth, "subdirs": subdirs}, records
+
+    def _apply(self, path: str, state: Dict, records: Dict[str, Dict]) -> List[str]:
+        """Replace a directory's contents in the index; returns subdirectories not indexed yet"""
+        old = self._dirs.get(path)
+        if old is not None:
+            for file_path in old["files"]:
+                if file_path not in records:
+                    self._remove_record(file_path)
+            for subdir in old["subdirs"]:
+                if subdir not in state["subdirs"]:
+                    self._drop_tree(subdir)
+        for file_path, record in records.items():
+            self._add_record(file_path, record)
+        state["files"] = list(records)
+        self._dirs[path] = state
+        self._dirty = True
+        return [subdir for subdir in state["subdirs"] if subdir not in self._dirs]
+
+    def _walk(self, path: str, depth: int, max_depth: int):
+        """Rescan a directory and index any new subdirectories below it"""
+        stack = [(path, depth)]
+        while stack:
+            current, level = stack.pop()
+            scanned = self._scan(current, level, max_depth)
+            with self._lock:
+                if scanned is None:
+                    self._drop_tree(current)
+                    continue
+                new_subdirs = self._apply(current, *scanned)
+            self._watcher.watch(current)
+            stack.extend((subdir, level + 1) for subdir in new_subdirs)
+
+    def refresh(self):
+        """Rescan only directories whose mtime changed, plus roots not indexed yet, in parallel"""
+        start = time.perf_counter()
+        with self._lock:
+            known = [(path, s["mtime"], s["depth"], s["max_depth"]) for path, s in self._dirs.items()]
+            indexed = set(self._dirs)
+        stale = []
+        for path, mtime, depth, max_depth in known:
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    stale.append((path, depth, max_depth))
+            except OSError:
+                stale.append((path, depth, max_depth))  # _walk drops directories that vanished
+        stale += [(root, 0, max_depth) for root, max_depth in self.roots()
+                  if root not in indexed and os.path.isdir(root)]
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(lambda args: self._walk(*args), stale))
+        self.last_refresh_seconds = time.perf_counter() - start
+
+    def _on_change(self, path: Optional[str]):
+        if path is None:
+            self.refresh()
+            return
+        with self._lock:
+            state = self._dirs.get(path)
+        if state is not None:
+            self._walk(path, state["depth"], state["max_depth"])
+
+    # Persistence
+
+    def load(self) -> bool:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != self.VERSION:
+            return False
+        roots = [root for root, _ in self.roots()]
+        with self._lock:
+            for path, state in data["dirs"].items():
+                # Forget directories whose root is no longer configured
+                if any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in roots):
+                    self._dirs[path] = state
+            for path, record in data["records"].items():
+                if os.path.dirname(path) in self._dirs:
+                    self._add_record(path, record)
+        return True
+
+    def save(self):
+        with self._lock:
+            payload = json.dumps({"version": self.VERSION, "dirs": self._dirs, "records": self._records})
+            self._dirty = False
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.index_path)
+
+    # Lifecycle
+
+    def start(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name=f"jarvis-{self.name}-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._watcher.stop()
+
+    def _run(self):
+        watching = self._watcher.start()
+        if self.load():
+            # A saved index answers immediately; the refresh below only catches up on changes
+            self._ready.set()
+            with self._lock:
+                known = list(self._dirs)
+            for path in known:
+                self._watcher.watch(path)
+        try:
+            self.refresh()
+            self.save()
+        except Exception as e:
+            logging.error(f"Building the {self.name} index failed: {e}")
+        self._ready.set()
+        logging.info(f"{self.name} index ready: {len(self._records)} entries in {len(self._dirs)} directories "
+                     f"({self.last_refresh_seconds:.2f}s)")
+
+        # inotify keeps the index current, so mtime polling is only a safety net
+        interval = self.poll_interval * (4 if watching else 1)
+        last_poll = time.monotonic()
+        while not self._stop.wait(SAVE_INTERVAL):
+            try:
+                if time.monotonic() - last_poll >= interval:
+                    self.refresh()
+                    last_poll = time.monotonic()
+                if self._dirty:
+                    self.save()
+            except Exception as e:
+                logging.error(f"Refreshing the {self.name} index failed: {e}")
+
+    def wait_ready(self, timeout: float) -> bool:
+        self.start()
+        return self._ready.wait(timeout)
+
+    # Queries
+
+    def match(self, query: str) -> List[Tuple[str, str, Dict]]:
+        """(key, path, record) for every key equal to or containing the query"""
+        query = query.lower().strip()
+        if not query:
+            return []
+        with self._lock:
+            if len(query) < 3:
+                keys = [key for key in self._by_key if query in key]
+            else:
+                postings = [self._trigrams.get(gram) for gram in trigrams(query)]
+                if not all(postings):
+                    return []
+                candidates = set.intersection(*sorted(postings, key=len))
+                keys = [key for key in candidates if query in key]
+            return [(key, path, self._records[path]) for key in keys for path in self._by_key[key]]
+
+    def lookup(self, key: str) -> List[Tuple[str, Dict]]:
+        """(path, record) for every record with exactly this key"""
+        with self._lock:
+            return [(path, self._records[path]) for path in self._by_key.get(key, ())]
+
+    def similar_keys(self, word: str, min_similarity: float = 0.5) -> Dict[str, float]:
+        """Keys sharing enough trigrams with the word (Jaccard similarity), for misspelt or misheard names"""
+        grams = trigrams(word)
+        if not grams:
+            return {}
+        shared: Dict[str, int] = {}
+        with self._lock:
+            for gram in grams:
+                for key in self._trigrams.get(gram, ()):
+                    shared[key] = shared.get(key, 0) + 1
+        similar = {}
+        for key, count in shared.items():
+            similarity = count / (len(grams) + len(trigrams(key)) - count)
+            if similarity >= min_similarity:
+                similar[key] = similarity
+        return similar
+
+    def stats(self) -> Dict:
+        return {
+            "ready": self._ready.is_set(),
+            "entries": len(self._records),
+            "directories": len(self._dirs),
+            "last_refresh_ms": round(self.last_refresh_seconds * 1000, 1),
+        }
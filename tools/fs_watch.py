@@ -0,0 +1,139 @@
+import os
+import sys
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+from threading import Lock, Thread, Event
+from typing import Callable, Dict, Optional
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ATTRIB | IN_CLOSE_WRITE
+              | IN_DELETE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1  # Raises AttributeError on libcs without inotify
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+class DirectoryWatcher:
+    """Linux inotify watcher calling on_change(directory) when a watched directory's entries change
+
+    on_change(None) means events were dropped (queue overflow) and callers should fall back to
+    a full mtime rescan. Only directories are watched, not recursively, so indexes add a watch
+    for each directory they scan.
+    """
+
+    def __init__(self, on_change: Callable[[Optional[str]], None]):
+        self.on_change = on_change
+        self._fd: Optional[int] = None
+        self._watches: Dict[int, str] = {}
+        self._paths: Dict[str, int] = {}
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._exhausted = False
+
+    @staticmethod
+    def available() -> bool:
+        return _libc is not None
+
+    def start(self) -> bool:
+        if self._thread is not None:
+            return True
+        if _libc is None:
+            return False
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logging.warning(f"inotify unavailable: {os.strerror(ctypes.get_errno())}")
+            return False
+        self._fd = fd
+        self._thread = Thread(target=self._run, name="jarvis-fs-watch", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def watch(self, path: str) -> bool:
+        if self._fd is None:
+            return False
+        with self._lock:
+            if path in self._paths:
+                return True
+            wd = _libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC and not self._exhausted:
+                    self._exhausted = True
+                    logging.warning("inotify watch limit reached; remaining directories fall back to mtime polling")
+                return False
+            self._watches[wd] = path
+            self._paths[path] = wd
+            return True
+
+    def unwatch(self, path: str):
+        with self._lock:
+            wd = self._paths.pop(path, None)
+            if wd is not None:
+                self._watches.pop(wd, None)
+                _libc.inotify_rm_watch(self._fd, wd)
+
+    def _run(self):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 1.0)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            changed = set()
+            overflow = False
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                with self._lock:
+                    path = self._watches.get(wd)
+                    if mask & IN_IGNORED and path is not None:
+                        self._watches.pop(wd, None)
+                        self._paths.pop(path, None)
+                if path is not None:
+                    changed.add(path)
+            # Coalesce a burst of events into one callback per directory
+            try:
+                if overflow:
+                    self.on_change(None)
+                for path in changed:
+                    self.on_change(path)
+            except Exception as e:
+                logging.error(f"Directory change handler failed: {e}")
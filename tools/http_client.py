@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from .deadline import remaining_timeout, current_deadline
+from .rate_limit import get_limiter, RateLimitExceeded
+
+# Keep-alive pool shared by every web-facing tool, so repeat calls skip DNS/TCP/TLS setup
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+DEFAULT_HEADERS = {"User-Agent": "curl/8.0"}  # wttr.in returns plain text for curl-like clients
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared AsyncClient for the running event loop (created on first use)"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(limits=POOL_LIMITS, headers=DEFAULT_HEADERS, follow_redirects=True)
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def http_get(url: str, params: Optional[Dict] = None, timeout: float = 10.0,
+                   retries: int = 2, backoff: float = 0.25, upstream: Optional[str] = None) -> httpx.Response:
+    """GET with a pooled connection, a deadline-aware timeout and bounded retries
+
+    Retries transport errors and 429/5xx responses with exponential backoff while the
+    utterance budget allows. The last response is returned as-is; if every attempt
+    failed at the transport level, the last error is raised. With `upstream` set, every
+    attempt first takes a token from that upstream's rate limiter.
+    """
+    client = get_http_client()
+    response = None
+    for attempt in range(retries + 1):
+        if upstream and not await get_limiter(upstream).acquire_async(timeout=remaining_timeout(timeout)):
+            raise RateLimitExceeded(upstream)
+        try:
+            response = await client.get(url, params=params, timeout=remaining_timeout(timeout))
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            logging.warning(f"GET {url} returned {response.status_code} (attempt {attempt + 1}/{retries + 1})")
+        except httpx.TransportError as e:
+            logging.warning(f"GET {url} failed: {e} (attempt {attempt + 1}/{retries + 1})")
+            if attempt == retries:
+                raise
+
+        delay = backoff * (2 ** attempt)
+        deadline = current_deadline()
+        if attempt == retries or (deadline is not None and deadline.remaining() <= delay):
+            break
+        await asyncio.sleep(delay)
+
+    if response is None:
+        raise httpx.TimeoutException(f"GET {url} ran out of time budget")
+    return response
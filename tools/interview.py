@@ -6,7 +6,11 @@ from datetime import datetime
 import os
 import uuid
 from livekit.agents import function_tool, RunContext
-import base64
+from .executor import blocking_tool
+from .deadline import remaining_timeout
+from .rate_limit import get_limiter, busy_message
+from .screen_capture import grab_screen
+from .vision import build_vision_payload, payload_from_base64, active_window_box
 
 try:
     import openai
@@ -77,7 +81,8 @@ For example: "Google technical interview" or "Amazon behavioral and technical in
 """
 
 @function_tool()
-async def setup_interview(context: RunContext, company: str, interview_type: str) -> str:
+@blocking_tool(limit=1, timeout=60.0)
+def setup_interview(context: RunContext, company: str, interview_type: str) -> str:
     """Set up interview with company and type"""
     interview_state.company = company
     interview_state.interview_type = interview_type.lower()
@@ -145,11 +150,23 @@ async def submit_answer(context: RunContext, answer: str) -> str:
         return f"{feedback}\n\nReady for the next question? Use get_next_question() when you're ready."
 
 @function_tool()
-async def check_code_solution(context: RunContext, screenshot_base64: str, code_description: str) -> str:
-    """Check code solution from screenshot using GPT-4V"""
+@blocking_tool(limit=2, timeout=30.0)
+def check_code_solution(context: RunContext, screenshot_base64: str = "", code_description: str = "") -> str:
+    """Check code solution from screenshot using GPT-4V (the focused window is captured if no screenshot is given)"""
     if not OPENAI_AVAILABLE:
         return "OpenAI not available. Please describe your solution and I'll provide feedback."
     
+    try:
+        if screenshot_base64:
+            payload = payload_from_base64(screenshot_base64)
+        else:
+            payload = build_vision_payload(grab_screen(), crop=active_window_box())
+    except Exception as e:
+        return f"Could not read the code screenshot: {str(e)}. Please describe your solution verbally."
+    
+    if not get_limiter("openai").acquire():
+        return busy_message("code review")
+    
     try:
         response = openai.chat.completions.create(
             model="gpt-4o",
@@ -159,18 +176,14 @@ async def check_code_solution(context: RunContext, screenshot_base64: str, code_
                     "content": [
                         {
                             "type": "text",
-                            "text": f"Please analyze this code solution and provide feedback. The user described it as: {code_description}\n\nCheck for:\n1. Correctness\n2. Efficiency\n3. Code quality\n4. Edge cases\n5. Provide a score out of 10"
+                            "text": f"Please analyze this code solution and provide feedback. The user described it as: {code_description or 'no description given'}\n\nCheck for:\n1. Correctness\n2. Efficiency\n3. Code quality\n4. Edge cases\n5. Provide a score out of 10"
                         },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{screenshot_base64}"
-                            }
-                        }
+                        *payload.content()
                     ]
                 }
             ],
-            max_tokens=500
+            max_tokens=500,
+            timeout=remaining_timeout(20.0)
         )
         
         return f"Code Review:\n{response.choices[0].message.content}"
@@ -250,6 +263,10 @@ def _generate_questions(company: str, question_type: str, num_questions: int) ->
             
             Return as JSON array: [{{"question": "text", "type": "technical", "category": "coding/system-design/etc", "difficulty": "easy/medium/hard"}}]"""
         
+        # Generic questions beat waiting on a throttled API
+        if not get_limiter("openai").acquire():
+            return _get_fallback_questions(company, question_type, num_questions)
+        
         response = openai.chat.completions.create(
             model="gpt-4o",
             messages=[
@@ -257,7 +274,8 @@ def _generate_questions(company: str, question_type: str, num_questions: int) ->
                 {"role": "user", "content": prompt}
             ],
             max_tokens=1000,
-            temperature=0.7
+            temperature=0.7,
+            timeout=remaining_timeout(15.0)
         )
         
         questions = json.loads(response.choices[0].message.content)
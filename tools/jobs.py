@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .command_runner import run_streaming, OUTPUT_ENCODING
+from .rate_limit import background_context
+
+MAX_CONCURRENT_JOBS = int(os.getenv("JARVIS_MAX_JOBS", 2))
+JOB_TIMEOUT = 2 * 3600  # Seconds before a background job is stopped
+MAX_LOG_LINES = 2000  # Per job, oldest lines dropped first
+MAX_LOG_BYTES = 512 * 1024  # Disk log cap when Redis is unavailable
+FLUSH_LINES = 100
+FLUSH_INTERVAL = 1.0
+STATUS_TTL = 7 * 86400
+
+JOB_KEY = "job:{}"
+JOB_LOG_KEY = "job:{}:log"
+RECENT_JOBS_KEY = "jobs:recent"
+LOG_DIR = "./job_logs"
+
+
+class JobStore:
+    """Job metadata and capped output logs, in Redis when available and on disk otherwise"""
+
+    def __init__(self, redis_client=None, log_dir: str = LOG_DIR):
+        self.redis = redis_client
+        self.log_dir = log_dir
+        self._jobs: Dict[str, Dict] = {}
+        self._recent: deque = deque(maxlen=50)
+
+    def save(self, job: Dict):
+        job["updated"] = datetime.now().isoformat()
+        if self.redis:
+            self.redis.setex(JOB_KEY.format(job["id"]), STATUS_TTL, json.dumps(job))
+        else:
+            self._jobs[job["id"]] = dict(job)
+
+    def add(self, job: Dict):
+        self.save(job)
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.lpush(RECENT_JOBS_KEY, job["id"])
+            pipe.ltrim(RECENT_JOBS_KEY, 0, 49)
+            pipe.execute()
+        else:
+            self._recent.appendleft(job["id"])
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        if self.redis:
+            raw = self.redis.get(JOB_KEY.format(job_id))
+            return json.loads(raw) if raw else None
+        return self._jobs.get(job_id)
+
+    def recent(self, limit: int = 5) -> List[Dict]:
+        ids = self.redis.lrange(RECENT_JOBS_KEY, 0, limit - 1) if self.redis else list(self._recent)[:limit]
+        return [job for job in (self.get(i) for i in ids) if job]
+
+    def _log_path(self, job_id: str) -> str:
+        return os.path.join(self.log_dir, f"{job_id}.log")
+
+    def append_log(self, job_id: str, lines: List[str]):
+        if not lines:
+            return
+        if self.redis:
+            key = JOB_LOG_KEY.format(job_id)
+            pipe = self.redis.pipeline()
+            pipe.rpush(key, *lines)
+            pipe.ltrim(key, -MAX_LOG_LINES, -1)
+            pipe.expire(key, STATUS_TTL)
+            pipe.execute()
+            return
+        os.makedirs(self.log_dir, exist_ok=True)
+        path = self._log_path(job_id)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        if os.path.getsize(path) > MAX_LOG_BYTES:
+            # Keep the newest half so the file stays bounded
+            with open(path, "rb") as f:
+                f.seek(-MAX_LOG_BYTES // 2, os.SEEK_END)
+                tail = f.read()
+            with open(path, "wb") as f:
+                f.write(tail[tail.find(b"\n") + 1:])
+
+    def tail(self, job_id: str, lines: int = 20) -> List[str]:
+        if self.redis:
+            return self.redis.lrange(JOB_LOG_KEY.format(job_id), -lines, -1)
+        try:
+            with open(self._log_path(job_id), "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 64 * 1024))
+                data = f.read().decode("utf-8", errors="replace")
+        except OSError:
+            return []
+        return data.splitlines()[-lines:]
+
+
+class LineCollector:
+    """Turns output chunks into log lines and flushes them in batches"""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self.partial = {"stdout": b"", "stderr": b""}
+        self.pending: List[str] = []
+        self.last_flush = time.monotonic()
+
+    def __call__(self, stream: str, chunk: bytes):
+        data = self.partial[stream] + chunk
+        *complete, self.partial[stream] = data.split(b"\n")
+        prefix = "[stderr] " if stream == "stderr" else ""
+        self.pending += [prefix + line.decode(OUTPUT_ENCODING, errors="replace").rstrip("\r") for line in complete]
+        if len(self.pending) >= FLUSH_LINES or time.monotonic() - self.last_flush > FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self, final: bool = False):
+        if final:
+            for stream, rest in self.partial.items():
+                if rest:
+                    prefix = "[stderr] " if stream == "stderr" else ""
+                    self.pending.append(prefix + rest.decode(OUTPUT_ENCODING, errors="replace"))
+                    self.partial[stream] = b""
+        try:
+            self.store.append_log(self.job_id, self.pending)
+        except Exception as e:
+            logging.error(f"Could not write log for job {self.job_id}: {e}")
+        self.pending = []
+        self.last_flush = time.monotonic()
+
+
+class JobManager:
+    """Runs long shell commands in the background, at most MAX_CONCURRENT_JOBS at a time
+
+    Jobs run outside the utterance deadline, stream their output into a capped log, and are
+    announced when they finish so the voice loop never waits on them.
+    """
+
+    def __init__(self, store: JobStore, max_concurrent: int = MAX_CONCURRENT_JOBS):
+        self.store = store
+        self.max_concurrent = max_concurrent
+        self.announce: Optional[Callable[[str], Awaitable[None]]] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, command: str) -> Dict:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        job = {
+            "id": uuid.uuid4().hex[:6],
+            "command": command,
+            "status": "queued",
+            "exit_code": None,
+            "created": datetime.now().isoformat(),
+            "started": None,
+            "finished": None,
+            "duration": None,
+        }
+        self.store.add(job)
+        # A fresh context: the job must not inherit the utterance deadline of the request that started it
+        task = asyncio.get_running_loop().create_task(self._run(job), context=background_context())
+        self._tasks[job["id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["id"], None))
+        return job
+
+    async def _run(self, job: Dict):
+        collector = LineCollector(self.store, job["id"])
+        try:
+            async with self._slots:
+                job["status"] = "running"
+                job["started"] = datetime.now().isoformat()
+                self.store.save(job)
+                result = await run_streaming(job["command"], timeout=JOB_TIMEOUT,
+                                             on_output=collector, interactive=False)
+            job["exit_code"] = result.exit_code
+            job["duration"] = round(result.duration, 1)
+            if result.timed_out:
+                job["status"] = "timed out"
+            else:
+                job["status"] = "succeeded" if result.exit_code == 0 else "failed"
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logging.error(f"Background job {job['id']} failed to run: {e}")
+        finally:
+            collector.flush(final=True)
+            job["finished"] = datetime.now().isoformat()
+            self.store.save(job)
+        logging.info(f"Background job {job['id']} ({job['command']}) {job['status']}")
+        await self._announce(job)
+
+    async def _announce(self, job: Dict):
+        if job["status"] == "cancelled" or self.announce is None:
+            return
+        outcome = job["status"]
+        if job["status"] == "failed" and job["exit_code"] is not None:
+            outcome = f"failed with exit code {job['exit_code']}"
+        try:
+            await self.announce(f"Background job {job['id']}, {describe_command(job['command'])}, {outcome}.")
+        except Exception as e:
+            logging.error(f"Could not announce background job {job['id']}: {e}")
+
+    def cancel(self, job_id: str) -> bool:
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def running(self) -> int:
+        return len(self._tasks)
+
+
+def describe_command(command: str, limit: int = 40) -> str:
+    return command if len(command) <= limit else command[:limit - 3] + "..."
+
+
+_manager = JobManager(JobStore())
+
+
+def configure_jobs(memory_system, announce: Optional[Callable[[str], Awaitable[None]]] = None):
+    """Keep job state in Redis when available and speak job results through announce"""
+    if memory_system and memory_system.redis_client:
+        _manager.store = JobStore(memory_system.redis_client)
+    _manager.announce = announce
+
+
+def get_job_manager() -> JobManager:
+    return _manager
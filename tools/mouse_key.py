@@ -1,5 +1,6 @@
 import logging
 from livekit.agents import function_tool, RunContext
+from .executor import blocking_tool
 import pyautogui
 import time
 
@@ -8,7 +9,8 @@ pyautogui.FAILSAFE = True  # Move mouse to top-left corner to abort
 pyautogui.PAUSE = 0.1  # Small pause between actions
 
 @function_tool()
-async def move_cursor(
+@blocking_tool(limit=1, timeout=30.0, group="input")
+def move_cursor(
     context: RunContext,  # type: ignore
     direction: str,
     distance: int = 100) -> str:
@@ -45,7 +47,8 @@ async def move_cursor(
         return f"An error occurred while moving cursor {direction}: {str(e)}"
 
 @function_tool()
-async def click_mouse(
+@blocking_tool(limit=1, timeout=30.0, group="input")
+def click_mouse(
     context: RunContext,  # type: ignore
     button: str = "left",
     clicks: int = 1) -> str:
@@ -77,7 +80,8 @@ async def click_mouse(
         return f"An error occurred while clicking {button} mouse button: {str(e)}"
 
 @function_tool()
-async def scroll_mouse(
+@blocking_tool(limit=1, timeout=30.0, group="input")
+def scroll_mouse(
     context: RunContext,  # type: ignore
     direction: str,
     amount: int = 3) -> str:
@@ -104,7 +108,8 @@ async def scroll_mouse(
         return f"An error occurred while scrolling {direction}: {str(e)}"
 
 @function_tool()
-async def type_text(
+@blocking_tool(limit=1, timeout=30.0, group="input")
+def type_text(
     context: RunContext,  # type: ignore
     text: str,
     interval: float = 0.05) -> str:
@@ -125,7 +130,8 @@ async def type_text(
         return f"An error occurred while typing text: {str(e)}"
 
 @function_tool()
-async def press_key(
+@blocking_tool(limit=1, timeout=30.0, group="input")
+def press_key(
     context: RunContext,  # type: ignore
     key: str,
     presses: int = 1) -> str:
@@ -158,7 +164,8 @@ async def press_key(
         return f"An error occurred while pressing key '{key}': {str(e)}"
 
 @function_tool()
-async def get_cursor_position(
+@blocking_tool(limit=1, timeout=30.0, group="input")
+def get_cursor_position(
     context: RunContext  # type: ignore
 ) -> str:
     """
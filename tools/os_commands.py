@@ -2,14 +2,26 @@ import logging
 from livekit.agents import function_tool, RunContext
 import os
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from typing import Optional
 import subprocess
-import psutil
+from .deadline import remaining_timeout
+from .executor import blocking_tool
+from .smtp_pool import get_smtp_pool
+from .outbox import compose_email, get_email_outbox
+from .process_index import process_index, terminate_pids
+from .app_index import app_index
+from .app_catalog import app_catalog
+from .file_index import file_index
+from .command_runner import run_streaming
+from .jobs import get_job_manager, describe_command
+from .shell_pool import shell_pool
+
+# Run commands in persistent shell sessions (set JARVIS_SHELL_POOL=0 to spawn a fresh shell each time)
+USE_SHELL_POOL = os.getenv("JARVIS_SHELL_POOL", "1") == "1"
 
 @function_tool()
-async def send_email(
+@blocking_tool(limit=2, timeout=30.0)
+def send_email(
     context: RunContext,  # type: ignore
     to_email: str,
     subject: str,
@@ -26,10 +38,6 @@ async def send_email(
         cc_email: Optional CC email address
     """
     try:
-        # Gmail SMTP configuration
-        smtp_server = "smtp.gmail.com"
-        smtp_port = 587
-        
         # Get credentials from environment variables
         gmail_user = os.getenv("GMAIL_USER")
         gmail_password = os.getenv("GMAIL_APP_PASSWORD")  # Use App Password, not regular password
@@ -38,30 +46,16 @@ async def send_email(
             logging.error("Gmail credentials not found in environment variables")
             return "Email sending failed: Gmail credentials not configured."
         
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = gmail_user
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        # Add CC if provided
-        recipients = [to_email]
-        if cc_email:
-            msg['Cc'] = cc_email
-            recipients.append(cc_email)
+        # Hand the message to the background outbox so the voice turn doesn't wait on SMTP
+        outbox = get_email_outbox()
+        if outbox:
+            email_id = outbox.enqueue(to_email, subject, message, cc_email)
+            logging.info(f"Email {email_id} to {to_email} queued for delivery")
+            return f"Email to {to_email} queued for delivery (id {email_id})"
         
-        # Attach message body
-        msg.attach(MIMEText(message, 'plain'))
-        
-        # Connect to Gmail SMTP server
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()  # Enable TLS encryption
-        server.login(gmail_user, gmail_password)
-        
-        # Send email
-        text = msg.as_string()
-        server.sendmail(gmail_user, recipients, text)
-        server.quit()
+        # No outbox (Redis unavailable): send over a pooled, already authenticated Gmail SMTP session
+        msg, recipients = compose_email(gmail_user, to_email, subject, message, cc_email)
+        get_smtp_pool().send(msg, gmail_user, recipients)
         
         logging.info(f"Email sent successfully to {to_email}")
         return f"Email sent successfully to {to_email}"
@@ -77,37 +71,85 @@ async def send_email(
         return f"An error occurred while sending email: {str(e)}"
 
 @function_tool()
-async def open_file(
+@blocking_tool(limit=2, timeout=5.0)
+def get_email_status(
+    context: RunContext,  # type: ignore
+    email_id: Optional[str] = None
+) -> str:
+    """
+    Check the delivery status of queued emails.
+    
+    Args:
+        email_id: Optional id returned by send_email (default: the most recent emails)
+    """
+    try:
+        outbox = get_email_outbox()
+        if not outbox:
+            return "Emails are sent immediately, there is no outbox to check."
+        
+        entries = [outbox.status(email_id)] if email_id else outbox.recent(5)
+        entries = [e for e in entries if e]
+        if not entries:
+            return f"No email found with id {email_id}." if email_id else "No emails have been sent recently."
+        
+        lines = []
+        for entry in entries:
+            line = f"{entry['id']} to {entry['to_email']} ('{entry['subject']}'): {entry['status']}"
+            if entry["status"] in ("retrying", "failed") and entry.get("last_error"):
+                line += f" after {entry['attempts']} attempts - {entry['last_error']}"
+            lines.append(line)
+        return "\n".join(lines)
+        
+    except Exception as e:
+        logging.error(f"Error checking email status: {e}")
+        return f"An error occurred while checking email status: {str(e)}"
+
+@function_tool()
+@blocking_tool(limit=2, timeout=10.0)
+def open_file(
     context: RunContext,  # type: ignore
     file_path: str) -> str:
     """
     Open a file or folder using the default Windows application.
     
     Args:
-        file_path: Full path to the file or folder to open
+        file_path: Full path to the file or folder, or a spoken description such as "my resume" or "latest tax pdf"
     """
     try:
         # Normalize the path and handle Windows path formats
         file_path = os.path.normpath(file_path)
+        others = []
         
-        # Check if path exists
+        # Anything that isn't an existing path is looked up in the personal file index
         if not os.path.exists(file_path):
-            logging.error(f"File or folder not found: {file_path}")
-            return f"File or folder not found: {file_path}"
+            description = os.path.basename(file_path)
+            if not file_index.wait_ready(remaining_timeout(5.0)):
+                return "Still indexing your files, please ask again in a moment."
+            matches = file_index.search(description, limit=3)
+            if not matches:
+                logging.error(f"File or folder not found: {file_path}")
+                return f"File or folder not found: {file_path}"
+            file_path = matches[0][1]
+            others = [os.path.basename(path) for _, path in matches[1:]]
+            logging.info(f"Resolved '{description}' to {file_path} (score {matches[0][0]})")
         
         # Open file/folder with default Windows application
         os.startfile(file_path)
         
         file_type = "folder" if os.path.isdir(file_path) else "file"
         logging.info(f"Successfully opened {file_type}: {file_path}")
-        return f"Successfully opened {file_type}: {os.path.basename(file_path)}"
+        result = f"Successfully opened {file_type}: {os.path.basename(file_path)}"
+        if others:
+            result += f". Other matches: {', '.join(others)}"
+        return result
         
     except Exception as e:
         logging.error(f"Error opening file {file_path}: {e}")
         return f"An error occurred while opening {file_path}: {str(e)}"
 
 @function_tool()
-async def open_application(
+@blocking_tool(limit=2, timeout=10.0)
+def open_application(
     context: RunContext,  # type: ignore
     app_name: str) -> str:
     """
@@ -117,106 +159,38 @@ async def open_application(
         app_name: Name of the application to open
     """
     
-    # Direct path mappings 
-    app_mappings = {
-        # Browsers 
-        "chrome": [r"C:\Program Files\Google\Chrome\Application\chrome.exe"],
-        "google chrome": [r"C:\Program Files\Google\Chrome\Application\chrome.exe"],
-        
-        # Communication 
-        "discord": [r"C:\Users\Chris\AppData\Local\Discord\app-1.0.9198\Discord.exe"],
-        
-        # Gaming - Update these paths
-        "steam": [r"C:\Program Files (x86)\Steam\Steam.exe"],
-        "valorant": [r"C:\ProgramData\Microsoft\Windows\Start Menu\Programs\Riot Games\VALORANT.lnk"],
-        
-        # Media - Update these paths
-        "spotify": [r"C:\Users\Chris\AppData\Roaming\Spotify\Spotify.exe"],
-        "medal": [r"C:\Users\Chris\AppData\Local\Medal\app-4.2746.0\Medal.exe"],
-        
-        # Development - Update with your VS Code path
-        "vscode": [r"C:\Users\Chris\AppData\Roaming\Microsoft\Windows\Start Menu\Programs\Visual Studio Code\Visual Studio Code.lnk"],
-        "visual studio code": [r"C:\Users\Chris\AppData\Roaming\Microsoft\Windows\Start Menu\Programs\Visual Studio Code\Visual Studio Code.lnk"],
-        
-        # System apps 
-        "powershell": [r"C:\Windows\System32\WindowsPowerShell\v1.0\powershell.exe"],
-        "cmd": [r"C:\Windows\System32\cmd.exe"],
-        "command prompt": [r"C:\Windows\System32\cmd.exe"],
-        "task manager": [r"C:\Windows\System32\taskmgr.exe"],
-        "settings": ["ms-settings:"],  # This one uses protocol handler
-        "notepad": [r"C:\Windows\System32\notepad.exe"],
-        "paint": [r"C:\Windows\System32\mspaint.exe"],
-        "explorer": [r"C:\Windows\explorer.exe"],
-        "file explorer": [r"C:\Windows\explorer.exe"],
-        
-        # Special cases
-        "google meet": [r"C:\Program Files\Google\Chrome\Application\chrome.exe", "https://meet.google.com"],
-    }
-    
-    app_name_lower = app_name.lower()
+    # Resolves catalog names and aliases, including misheard ones ("team", "vs code")
+    entry = app_catalog.resolve(app_name)
     
-    if app_name_lower not in app_mappings:
+    if entry is None:
         logging.warning(f"Application '{app_name}' is not in the allowed list")
-        return f"Sorry, I can only open these applications: {', '.join(app_mappings.keys())}"
+        return f"Sorry, I can only open these applications: {', '.join(app_catalog.names())}"
+    app_name = entry.name
     
     try:
         # Check if application is already running
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                if app_name_lower in proc.info['name'].lower():
-                    logging.info(f"{app_name} is already running (PID: {proc.info['pid']})")
-                    return f"{app_name} is already running."
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        
-        # Get the path(s) for the application
-        paths = app_mappings[app_name_lower]
+        running = process_index.pids(entry.processes)
+        if running:
+            logging.info(f"{app_name} is already running (PID: {running[0]})")
+            return f"{app_name} is already running."
         
-        # Special handling for Google Meet
-        if app_name_lower == "google meet":
-            chrome_path = paths[0]
-            url = paths[1]
-            if os.path.exists(chrome_path):
-                subprocess.Popen([chrome_path, url])
-                logging.info(f"Successfully opened Google Meet in Chrome")
-                return f"Successfully opened Google Meet in Chrome"
-            else:
-                return f"Chrome not found at {chrome_path}"
+        # Protocol handlers such as ms-settings: are opened by the shell
+        if entry.uri:
+            subprocess.run(["start", entry.uri], shell=True, check=True)
+            logging.info(f"Successfully opened {app_name}")
+            return f"Successfully opened {app_name}"
         
         # Try each path until one works
-        for path in paths:
+        for exe_path in app_catalog.launch_paths(entry):
             try:
-                logging.debug(f"Trying path: {path}")
-
-                if path.startswith("ms-settings:"):
-                    subprocess.run(["start", path], shell=True, check=True)
-                    logging.info(f"Successfully opened {app_name}")
-                    return f"Successfully opened {app_name}"
-
-                if "--" in path:
-                    exe_path, args_str = path.split(" --", 1)
-                    exe_path = exe_path.strip()
-                    args = ["--" + arg.strip() for arg in args_str.split("--") if arg.strip()]
-                else:
-                    exe_path = path
-                    args = []
-
-                logging.debug(f"Checking if executable exists: {exe_path}")
-                if os.path.exists(exe_path):
-                    logging.debug(f"Executable found: {exe_path}")
-                    if args:
-                        subprocess.Popen([exe_path] + args)
-                    else:
-                        subprocess.Popen([exe_path])
-
-                    logging.info(f"Successfully opened {app_name}")
-                    return f"Successfully opened {app_name}"
-                else:
-                    logging.warning(f"Path does not exist or is invalid: {exe_path}")
-                    continue
-
+                logging.debug(f"Launching: {exe_path} {entry.args}")
+                subprocess.Popen([exe_path] + entry.args)
+                logging.info(f"Successfully opened {app_name}")
+                return f"Successfully opened {app_name}"
             except Exception as e:
-                logging.error(f"Failed to open {path}: {e}")
+                # The cached existence check was wrong; look again next time
+                app_catalog.invalidate(exe_path)
+                logging.error(f"Failed to open {exe_path}: {e}")
                 continue
 
         return f"Could not find or open {app_name}"
@@ -226,7 +200,8 @@ async def open_application(
         return f"An error occurred while trying to open {app_name}: {str(e)}"
 
 @function_tool()
-async def find_app_paths(
+@blocking_tool(limit=4, timeout=35.0)
+def find_app_paths(
     context: RunContext,  # type: ignore
     app_name: str) -> str:
     """
@@ -234,49 +209,13 @@ async def find_app_paths(
     Use this to discover the correct paths for your system.
     """
     try:
-        found_paths = []
-        
-        # Common installation directories
-        search_paths = [
-            os.path.expandvars(r"%ProgramFiles%"),
-            os.path.expandvars(r"%ProgramFiles(x86)%"),
-            os.path.expandvars(r"%LocalAppData%\Programs"),
-            os.path.expandvars(r"%AppData%\Local"),
-            os.path.expandvars(r"%AppData%\Roaming"),
-        ]
-        
-        app_name_lower = app_name.lower()
-        
-        for base_path in search_paths:
-            if os.path.exists(base_path):
-                for root, dirs, files in os.walk(base_path):
-                    # Look for executable files
-                    for file in files:
-                        if file.lower().endswith('.exe') and app_name_lower in file.lower():
-                            full_path = os.path.join(root, file)
-                            found_paths.append(full_path)
-                    
-                    # Also look for folders with the app name
-                    for dir_name in dirs:
-                        if app_name_lower in dir_name.lower():
-                            # Look for exe files in this directory
-                            app_dir = os.path.join(root, dir_name)
-                            try:
-                                for file in os.listdir(app_dir):
-                                    if file.lower().endswith('.exe'):
-                                        full_path = os.path.join(app_dir, file)
-                                        found_paths.append(full_path)
-                            except (PermissionError, OSError):
-                                continue
-                    
-                    # Limit search depth to avoid taking too long
-                    if len(root.split(os.sep)) - len(base_path.split(os.sep)) > 3:
-                        dirs[:] = []
+        # The index is built in the background at startup; only the first lookup can wait for it
+        if not app_index.wait_ready(remaining_timeout(30.0)):
+            return "Still indexing installed applications, please ask again in a moment."
         
+        found_paths = app_index.find(app_name)
         if found_paths:
-            # Remove duplicates and limit results
-            unique_paths = list(dict.fromkeys(found_paths))[:10]
-            return f"Found {app_name} at these locations:\n" + "\n".join(unique_paths)
+            return f"Found {app_name} at these locations:\n" + "\n".join(found_paths)
         else:
             return f"Could not find {app_name} in common installation directories."
             
@@ -285,7 +224,8 @@ async def find_app_paths(
         return f"An error occurred while searching for {app_name}: {str(e)}"
 
 @function_tool()
-async def close_application(
+@blocking_tool(limit=2, timeout=10.0)
+def close_application(
     context: RunContext,  # type: ignore
     application_name: str
 ) -> str:
@@ -296,47 +236,16 @@ async def close_application(
         application_name: Name of the application to close (e.g., "steam", "chrome", "notepad")
     """
     app_name_lower = application_name.lower()
-    closed_processes = []
-    
-    # More specific process name mappings for better targeting
-    process_mappings = {
-        "chrome": ["chrome.exe"],
-        "google chrome": ["chrome.exe"],
-        "discord": ["Discord.exe"],
-        "steam": ["steam.exe"],
-        "valorant": ["VALORANT.exe", "RiotClientServices.exe"],
-        "spotify": ["Spotify.exe"],
-        "medal": ["Medal.exe"],
-        "vscode": ["Code.exe"],
-        "visual studio code": ["Code.exe"],
-        "powershell": ["powershell.exe"],
-        "cmd": ["cmd.exe"],
-        "command prompt": ["cmd.exe"],
-        "task manager": ["taskmgr.exe"],
-        "calculator": ["calc.exe"],
-        "notepad": ["notepad.exe"],
-        "explorer": ["explorer.exe"],
-        "file explorer": ["explorer.exe"],
-    }
     
     try:
         # Get the specific process names to look for
-        if app_name_lower in process_mappings:
-            target_processes = process_mappings[app_name_lower]
-        else:
-            # Fallback to generic matching
-            target_processes = [f"{app_name_lower}.exe"]
+        target_processes = app_catalog.process_names(app_name_lower)
         
-        # Find and terminate processes matching the specific process names
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                proc_name = proc.info['name'].lower()
-                if any(target.lower() == proc_name for target in target_processes):
-                    proc.terminate()
-                    closed_processes.append(f"{proc.info['name']} (PID: {proc.info['pid']})")
-                    logging.info(f"Terminated {proc.info['name']} (PID: {proc.info['pid']})")
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        # Terminate every matching process at once, killing any that ignore the request
+        pids = process_index.pids(target_processes)
+        closed_processes = terminate_pids(pids, target_processes)
+        for closed in closed_processes:
+            logging.info(f"Terminated {closed}")
         
         if closed_processes:
             return f"Successfully closed {application_name}: {', '.join(closed_processes)}"
@@ -358,29 +267,132 @@ async def run_command(
     Args:
         command: The command to execute
     """
+    # 30 second timeout, shortened to whatever is left of the utterance budget
+    timeout = remaining_timeout(30.0)
     try:
-        # Run the command and capture output
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30  # 30 second timeout
-        )
-        
-        output = result.stdout.strip()
-        error = result.stderr.strip()
-        
-        if result.returncode == 0:
-            logging.info(f"Command '{command}' executed successfully")
-            return f"Command executed successfully:\n{output}" if output else "Command executed successfully (no output)"
+        # Output is streamed into bounded buffers; cancelling this call stops the process tree
+        if USE_SHELL_POOL:
+            # Reuses a warm shell for this session, so "cd" carries over to the next command
+            session = getattr(context, "session", None)
+            result = await shell_pool.run(command, key=f"session-{id(session)}" if session else "local",
+                                          timeout=timeout)
         else:
-            logging.error(f"Command '{command}' failed with return code {result.returncode}")
-            return f"Command failed with return code {result.returncode}:\n{error}" if error else f"Command failed with return code {result.returncode}"
+            result = await run_streaming(command, timeout=timeout)
+        logging.info(f"Command '{command}' finished: exit code {result.exit_code}, "
+                     f"{result.duration:.2f}s{', output truncated' if result.truncated else ''}")
+        if not result.ok and not result.timed_out:
+            logging.error(f"Command '{command}' failed with return code {result.exit_code}")
+        if result.timed_out:
+            return result.summary(timeout) + "\nIt can be started as a background job instead."
+        return result.summary(timeout)
             
-    except subprocess.TimeoutExpired:
-        logging.error(f"Command '{command}' timed out")
-        return f"Command timed out after 30 seconds"
     except Exception as e:
         logging.error(f"Error running command '{command}': {e}")
-        return f"An error occurred while running the command: {str(e)}"
\ No newline at end of file
+        return f"An error occurred while running the command: {str(e)}"
+
+
+@function_tool()
+async def start_background_job(
+    context: RunContext,  # type: ignore
+    command: str) -> str:
+    """
+    Start a long-running command line command in the background. Use this for builds, downloads
+    or anything that may take longer than 30 seconds; the result is announced when it finishes.
+    
+    Args:
+        command: The command to execute
+    """
+    try:
+        manager = get_job_manager()
+        job = manager.start(command)
+        queued = manager.running() > manager.max_concurrent
+        logging.info(f"Started background job {job['id']}: {command}")
+        return f"Started background job {job['id']}" + (" (queued behind other jobs)." if queued else ".")
+        
+    except Exception as e:
+        logging.error(f"Error starting background job '{command}': {e}")
+        return f"An error occurred while starting the background job: {str(e)}"
+
+@function_tool()
+async def get_job_status(
+    context: RunContext,  # type: ignore
+    job_id: Optional[str] = None
+) -> str:
+    """
+    Check the status of background jobs.
+    
+    Args:
+        job_id: Optional id returned by start_background_job (default: the most recent jobs)
+    """
+    try:
+        store = get_job_manager().store
+        jobs = [store.get(job_id)] if job_id else store.recent(5)
+        jobs = [job for job in jobs if job]
+        if not jobs:
+            return f"No background job found with id {job_id}." if job_id else "No background jobs have been started."
+        
+        lines = []
+        for job in jobs:
+            line = f"{job['id']} ({describe_command(job['command'])}): {job['status']}"
+            if job.get("exit_code") is not None:
+                line += f", exit code {job['exit_code']}"
+            if job.get("duration") is not None:
+                line += f", took {job['duration']:.0f}s"
+            lines.append(line)
+        return "\n".join(lines)
+        
+    except Exception as e:
+        logging.error(f"Error checking job status: {e}")
+        return f"An error occurred while checking job status: {str(e)}"
+
+@function_tool()
+async def get_job_output(
+    context: RunContext,  # type: ignore
+    job_id: str,
+    lines: int = 20
+) -> str:
+    """
+    Show the most recent output of a background job.
+    
+    Args:
+        job_id: Id returned by start_background_job
+        lines: Number of output lines to show (default: 20)
+    """
+    try:
+        store = get_job_manager().store
+        job = store.get(job_id)
+        if not job:
+            return f"No background job found with id {job_id}."
+        
+        output = store.tail(job_id, max(1, min(lines, 200)))
+        if not output:
+            return f"Job {job_id} is {job['status']} and has not produced any output."
+        return f"Job {job_id} is {job['status']}. Last output:\n" + "\n".join(output)
+        
+    except Exception as e:
+        logging.error(f"Error reading output of job {job_id}: {e}")
+        return f"An error occurred while reading the job output: {str(e)}"
+
+@function_tool()
+async def cancel_job(
+    context: RunContext,  # type: ignore
+    job_id: str
+) -> str:
+    """
+    Cancel a queued or running background job.
+    
+    Args:
+        job_id: Id returned by start_background_job
+    """
+    try:
+        if get_job_manager().cancel(job_id):
+            logging.info(f"Cancelled background job {job_id}")
+            return f"Cancelling background job {job_id}."
+        job = get_job_manager().store.get(job_id)
+        if job:
+            return f"Job {job_id} has already finished ({job['status']})."
+        return f"No background job found with id {job_id}."
+        
+    except Exception as e:
+        logging.error(f"Error cancelling job {job_id}: {e}")
+        return f"An error occurred while cancelling the job: {str(e)}"
\ No newline at end of file
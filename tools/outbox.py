@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import uuid
+import socket
+import smtplib
+import logging
+from datetime import datetime
+from threading import Thread, Event
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List, Optional
+
+from .smtp_pool import get_smtp_pool
+
+PENDING_KEY = "outbox:pending"
+PROCESSING_KEY = "outbox:processing:{}"  # One list per consumer, so recovery never touches a live sender's messages
+CONSUMERS_KEY = "outbox:consumers"
+HEARTBEAT_KEY = "outbox:consumer:{}"
+RETRY_KEY = "outbox:retry"
+RECENT_KEY = "outbox:recent"
+EMAIL_KEY = "outbox:email:{}"
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 5.0  # Seconds before the first retry, doubled on each further attempt
+STATUS_TTL = 7 * 86400
+HEARTBEAT_TTL = 300  # Seconds without a heartbeat before a sender counts as dead; far longer than one delivery
+RECOVER_INTERVAL = 30.0
+
+
+def compose_email(sender: str, to_email: str, subject: str, message: str, cc_email: Optional[str] = None):
+    """Build the MIME message and recipient list for an email"""
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = to_email
+    msg['Subject'] = subject
+
+    # Add CC if provided
+    recipients = [to_email]
+    if cc_email:
+        msg['Cc'] = cc_email
+        recipients.append(cc_email)
+
+    # Attach message body
+    msg.attach(MIMEText(message, 'plain'))
+    return msg, recipients
+
+
+def _is_transient(error: Exception) -> bool:
+    """Connection problems and 4xx replies are worth retrying; auth and 5xx errors are not"""
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+class EmailOutbox:
+    """Persistent Redis outbox: send_email enqueues, a background thread delivers with retries
+
+    Each sender moves messages from pending into its own processing list while sending them
+    and keeps a heartbeat key alive. Messages in the processing list of a sender whose
+    heartbeat has expired (it crashed mid-delivery) are put back on pending by whichever
+    sender notices first.
+    """
+
+    def __init__(self, redis_client, sender: str):
+        self.redis = redis_client
+        self.sender = sender
+        self.consumer_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.processing_key = PROCESSING_KEY.format(self.consumer_id)
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._last_recovery = 0.0
+
+    def enqueue(self, to_email: str, subject: str, message: str, cc_email: Optional[str] = None) -> str:
+        email_id = uuid.uuid4().hex[:8]
+        entry = {
+            "id": email_id,
+            "to_email": to_email,
+            "cc_email": cc_email,
+            "subject": subject,
+            "message": message,
+            "status": "queued",
+            "attempts": 0,
+            "last_error": None,
+            "created": datetime.now().isoformat(),
+        }
+        pipe = self.redis.pipeline()
+        pipe.setex(EMAIL_KEY.format(email_id), STATUS_TTL, json.dumps(entry))
+        pipe.lpush(PENDING_KEY, email_id)
+        pipe.lpush(RECENT_KEY, email_id)
+        pipe.ltrim(RECENT_KEY, 0, 49)
+        pipe.execute()
+        return email_id
+
+    def status(self, email_id: str) -> Optional[Dict]:
+        raw = self.redis.get(EMAIL_KEY.format(email_id))
+        return json.loads(raw) if raw else None
+
+    def recent(self, limit: int = 5) -> List[Dict]:
+        ids = self.redis.lrange(RECENT_KEY, 0, limit - 1)
+        return [entry for entry in (self.status(i) for i in ids) if entry]
+
+    def _save(self, entry: Dict):
+        entry["updated"] = datetime.now().isoformat()
+        self.redis.setex(EMAIL_KEY.format(entry["id"]), STATUS_TTL, json.dumps(entry))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._heartbeat()
+        self.redis.sadd(CONSUMERS_KEY, self.consumer_id)
+        self._recover_dead_consumers()
+        self._thread = Thread(target=self._run, name="jarvis-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat(self):
+        self.redis.setex(HEARTBEAT_KEY.format(self.consumer_id), HEARTBEAT_TTL, "1")
+
+    def _recover_dead_consumers(self):
+        """Put back messages that a sender which stopped heartbeating was in the middle of"""
+        self._last_recovery = time.monotonic()
+        for consumer_id in self.redis.smembers(CONSUMERS_KEY):
+            if consumer_id == self.consumer_id or self.redis.exists(HEARTBEAT_KEY.format(consumer_id)):
+                continue
+            # RPOPLPUSH is atomic, so two senders recovering the same consumer never duplicate a message
+            recovered = 0
+            while self.redis.rpoplpush(PROCESSING_KEY.format(consumer_id), PENDING_KEY):
+                recovered += 1
+            self.redis.srem(CONSUMERS_KEY, consumer_id)
+            if recovered:
+                logging.warning(f"Requeued {recovered} email(s) left in flight by stopped sender {consumer_id}")
+
+    def _promote_due_retries(self):
+        due = self.redis.zrangebyscore(RETRY_KEY, 0, time.time())
+        for email_id in due:
+            if self.redis.zrem(RETRY_KEY, email_id):
+                self.redis.lpush(PENDING_KEY, email_id)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._heartbeat()
+                if time.monotonic() - self._last_recovery > RECOVER_INTERVAL:
+                    self._recover_dead_consumers()
+                self._promote_due_retries()
+                email_id = self.redis.brpoplpush(PENDING_KEY, self.processing_key, timeout=1)
+                if email_id:
+                    self._deliver(email_id)
+                    self.redis.lrem(self.processing_key, 1, email_id)
+            except Exception as e:
+                logging.error(f"Email outbox error: {e}")
+                self._stop.wait(1.0)
+
+    def _deliver(self, email_id: str):
+        entry = self.status(email_id)
+        if entry is None or entry["status"] == "sent":
+            return
+
+        entry["attempts"] += 1
+        try:
+            msg, recipients = compose_email(
+                self.sender, entry["to_email"], entry["subject"], entry["message"], entry.get("cc_email")
+            )
+            get_smtp_pool().send(msg, self.sender, recipients)
+            entry["status"] = "sent"
+            entry["last_error"] = None
+            logging.info(f"Email {email_id} sent successfully to {entry['to_email']}")
+        except Exception as e:
+            entry["last_error"] = str(e)
+            if _is_transient(e) and entry["attempts"] < MAX_ATTEMPTS:
+                delay = BACKOFF_BASE * (2 ** (entry["attempts"] - 1))
+                entry["status"] = "retrying"
+                self.redis.zadd(RETRY_KEY, {email_id: time.time() + delay})
+                logging.warning(f"Email {email_id} attempt {entry['attempts']} failed ({e}), retrying in {delay:.0f}s")
+            else:
+                entry["status"] = "failed"
+                logging.error(f"Email {email_id} to {entry['to_email']} failed permanently: {e}")
+        self._save(entry)
+
+
+_outbox: Optional[EmailOutbox] = None
+
+
+def configure_email_outbox(memory_system, sender: Optional[str]):
+    """Queue email in Redis when available; otherwise send_email stays synchronous"""
+    global _outbox
+    if not memory_system or not memory_system.redis_client or not sender:
+        return
+    _outbox = EmailOutbox(memory_system.redis_client, sender)
+
+
+def start_email_outbox():
+    """Start the background sender; call once per process from the agent entrypoint, not at import"""
+    if _outbox is not None:
+        _outbox.start()
+
+
+def get_email_outbox() -> Optional[EmailOutbox]:
+    return _outbox
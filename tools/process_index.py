@@ -0,0 +1,136 @@
+import time
+import logging
+from threading import Lock, Thread, Event
+from typing import Dict, Iterable, List, Set
+
+import psutil
+
+
+class ProcessIndex:
+    """Lowercased process name -> PIDs, kept current by a background sampler
+
+    Each refresh only diffs the PID set: new PIDs are looked up once, vanished PIDs are
+    dropped. Name queries are dictionary lookups instead of a full process_iter walk.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._by_name: Dict[str, Set[int]] = {}
+        self._names: Dict[int, str] = {}
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+        self._last_refresh = 0.0
+
+    def refresh(self):
+        current = set(psutil.pids())
+        with self._lock:
+            known = set(self._names)
+        started = current - known
+        exited = known - current
+
+        new_names = {}
+        for pid in started:
+            try:
+                new_names[pid] = psutil.Process(pid).name().lower()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+        with self._lock:
+            for pid in exited:
+                self._forget(pid)
+            for pid, name in new_names.items():
+                self._names[pid] = name
+                self._by_name.setdefault(name, set()).add(pid)
+            self._last_refresh = time.monotonic()
+
+    def _forget(self, pid: int):
+        name = self._names.pop(pid, None)
+        if name is None:
+            return
+        pids = self._by_name.get(name)
+        if pids:
+            pids.discard(pid)
+            if not pids:
+                del self._by_name[name]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"Process index refresh failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self.refresh()
+            self._thread = Thread(target=self._run, name="jarvis-process-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _ensure_fresh(self):
+        if self._thread is None:
+            self.start()
+        elif time.monotonic() - self._last_refresh > self.interval * 5:
+            # Sampler fell behind (e.g. machine under load); don't answer from stale data
+            self.refresh()
+
+    def pids(self, names: Iterable[str]) -> List[int]:
+        """PIDs whose process name matches any of the given names (case-insensitive)"""
+        self._ensure_fresh()
+        with self._lock:
+            found: Set[int] = set()
+            for name in names:
+                found |= self._by_name.get(name.lower(), set())
+        return sorted(found)
+
+    def discard(self, pids: Iterable[int]):
+        """Drop PIDs we just terminated without waiting for the next sample"""
+        with self._lock:
+            for pid in pids:
+                self._forget(pid)
+
+
+process_index = ProcessIndex()
+
+
+def terminate_pids(pids: List[int], expected_names: Iterable[str], timeout: float = 3.0) -> List[str]:
+    """Terminate all PIDs in parallel, escalating to kill for any that outlive the timeout
+
+    Returns a description of every process that was stopped. A PID is only signalled if it
+    still carries one of the expected names, so a recycled PID is never touched.
+    """
+    expected = {name.lower() for name in expected_names}
+    procs = []
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            if proc.name().lower() in expected:
+                proc.terminate()
+                procs.append(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+
+    gone, alive = psutil.wait_procs(procs, timeout=timeout)
+    for proc in alive:
+        try:
+            proc.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    if alive:
+        killed, still_alive = psutil.wait_procs(alive, timeout=timeout)
+        gone += killed
+        for proc in still_alive:
+            logging.warning(f"Process {proc.pid} did not exit after kill")
+
+    process_index.discard(proc.pid for proc in gone)
+    stopped = []
+    for proc in gone:
+        try:
+            name = proc.name()
+        except psutil.Error:
+            name = "process"
+        stopped.append(f"{name} (PID: {proc.pid})")
+    return stopped
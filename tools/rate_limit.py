@@ -0,0 +1,203 @@
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import contextvars
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from .deadline import remaining_timeout
+
+# Requests per second and burst size for each external API
+UPSTREAM_LIMITS: Dict[str, Tuple[float, int]] = {
+    "wttr": (1.0, 5),
+    "duckduckgo": (0.5, 3),
+    "google_stt": (2.0, 5),
+    "openai": (3.0, 10),
+}
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+POLL_INTERVAL = 0.02  # How often queued callers behind the head re-check their position
+
+# Atomic token bucket shared by every process using the same Redis.
+# Returns the seconds to wait before a token is available ("0" when one was taken).
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a token could not be obtained within the time budget"""
+
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("jarvis_priority", default=PRIORITY_INTERACTIVE)
+_redis_client = None
+_script = None
+
+
+def configure_rate_limits(memory_system):
+    """Share buckets across processes through the JarvisMemory Redis connection"""
+    global _redis_client, _script
+    _redis_client = memory_system.redis_client if memory_system else None
+    _script = _redis_client.register_script(TOKEN_BUCKET_SCRIPT) if _redis_client else None
+
+
+def background_context() -> contextvars.Context:
+    """Fresh context whose upstream calls queue behind interactive ones"""
+    ctx = contextvars.Context()
+    ctx.run(_priority.set, PRIORITY_BACKGROUND)
+    return ctx
+
+
+class RateLimiter:
+    """Token bucket for one upstream, with a local priority queue in front of it"""
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._lock = Lock()  # Guards the queue only; never held across a Redis call
+        self._bucket_lock = Lock()
+        self._queue: list = []
+        self._counter = itertools.count()
+        # Local bucket, used when Redis is unavailable
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _take(self) -> float:
+        """Try to take a token; returns 0 on success or the seconds until one is available"""
+        if _script is not None:
+            try:
+                return float(_script(keys=[f"ratelimit:{self.name}"], args=[self.rate, self.burst, time.time()]))
+            except Exception as e:
+                logging.error(f"Redis rate limiter for {self.name} failed, using local bucket: {e}")
+        with self._bucket_lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def _enqueue(self):
+        ticket = (_priority.get(), next(self._counter))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _is_head(self, ticket) -> bool:
+        with self._lock:
+            return self._queue[0] == ticket
+
+    def _poll(self, ticket) -> float:
+        """0 when the ticket got its token, otherwise how long to sleep before asking again"""
+        if not self._is_head(ticket):
+            return POLL_INTERVAL
+        return self._take()
+
+    async def _poll_async(self, ticket) -> float:
+        """_poll with the Redis round trip on a worker thread, so the event loop never waits on the network"""
+        if not self._is_head(ticket):
+            return POLL_INTERVAL
+        if _script is None:
+            return self._take()
+        return await asyncio.get_running_loop().run_in_executor(None, self._take)
+
+    def _leave(self, ticket):
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+
+    def _record(self, start: float, ok: bool) -> bool:
+        waited = time.monotonic() - start
+        if ok:
+            self.acquired += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        else:
+            self.rejected += 1
+            logging.warning(f"Rate limit wait for {self.name} exceeded the time budget")
+        return ok
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available; False if that would take longer than timeout"""
+        timeout = remaining_timeout(10.0) if timeout is None else timeout
+        start = time.monotonic()
+        ticket = self._enqueue()
+        try:
+            while True:
+                wait = self._poll(ticket)
+                if wait == 0:
+                    return self._record(start, True)
+                if time.monotonic() - start + wait > timeout:
+                    return self._record(start, False)
+                time.sleep(wait)
+        finally:
+            self._leave(ticket)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """Event-loop friendly acquire()"""
+        timeout = remaining_timeout(10.0) if timeout is None else timeout
+        start = time.monotonic()
+        ticket = self._enqueue()
+        try:
+            while True:
+                wait = await self._poll_async(ticket)
+                if wait == 0:
+                    return self._record(start, True)
+                if time.monotonic() - start + wait > timeout:
+                    return self._record(start, False)
+                await asyncio.sleep(wait)
+        finally:
+            self._leave(ticket)
+
+    def stats(self) -> Dict:
+        return {
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "queued": len(self._queue),
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {
+    name: RateLimiter(name, rate, burst) for name, (rate, burst) in UPSTREAM_LIMITS.items()
+}
+
+
+def get_limiter(upstream: str) -> RateLimiter:
+    return _limiters[upstream]
+
+
+def rate_limit_stats() -> Dict[str, Dict]:
+    """Per-upstream wait-time and rejection metrics"""
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
+
+
+def busy_message(service: str) -> str:
+    return f"The {service} service is busy right now, please try again in a moment."
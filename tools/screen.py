@@ -1,109 +1,68 @@
+import time
 import logging
-from livekit.agents import function_tool, RunContext
-import pyautogui
-import os
 from datetime import datetime
-import base64
-from io import BytesIO
+from livekit.agents import function_tool, RunContext
+from .deadline import remaining_timeout
+from .executor import blocking_tool
+from .cache import cached_tool, tool_failed
+from .single_flight import single_flight
+from .rate_limit import get_limiter, busy_message
+from .screen_capture import grab_screen, screen_size, save_screenshot
+from .vision import build_vision_payload, active_window_box
+from .screen_cache import screen_cache, screen_fingerprint
+from .screen_history import screen_history, SCREEN_HISTORY_ENABLED
 
 @function_tool()
-async def take_screenshot(
+@blocking_tool(limit=1, timeout=15.0)
+def take_screenshot(
     context: RunContext,  # type: ignore
-    filename: str = None) -> str:
+    filename: str = None,
+    image_format: str = None,
+    quality: int = None) -> str:
     """
     Take a screenshot of the current screen and save it to the Screenshots folder.
     
     Args:
         filename: Optional filename to save the screenshot (default: timestamp-based name)
+        image_format: Optional format, png, jpeg or webp (default: JARVIS_SCREENSHOT_FORMAT)
+        quality: Optional JPEG/WebP quality (1-100) or PNG compression level (0-9)
     """
     try:
-        logging.info("Screenshot function called")
-        
-        # Set the fixed directory
-        screenshots_dir = r"C:\Users\Chris\OneDrive\Pictures\Screenshots"
-        logging.info(f"Target directory: {screenshots_dir}")
-        
-        # Check if directory exists first
-        if os.path.exists(screenshots_dir):
-            logging.info("Directory exists")
-        else:
-            logging.info("Directory does not exist, creating...")
-        
-        # Create directory if it doesn't exist
-        os.makedirs(screenshots_dir, exist_ok=True)
-        logging.info("Directory created/verified")
-        
-        # Check directory permissions
-        if os.access(screenshots_dir, os.W_OK):
-            logging.info("Directory is writable")
-        else:
-            logging.error("Directory is not writable!")
-            return f"Error: Cannot write to directory {screenshots_dir}"
-        
-        # Generate filename if not provided
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
-        
-        # Ensure filename has .png extension
-        if not filename.lower().endswith('.png'):
-            filename += '.png'
-        
-        # Create full path
-        full_path = os.path.join(screenshots_dir, filename)
-        logging.info(f"Full path: {full_path}")
-        
-        # Check current working directory
-        current_dir = os.getcwd()
-        logging.info(f"Current working directory: {current_dir}")
-        
-        # Take screenshot
-        logging.info("Taking screenshot...")
-        screenshot = pyautogui.screenshot()
-        logging.info(f"Screenshot captured - Size: {screenshot.size}")
-        
-        # Try saving to alternative location first for testing
-        temp_path = os.path.join(current_dir, filename)
-        logging.info(f"Saving test screenshot to: {temp_path}")
-        screenshot.save(temp_path)
-        
-        if os.path.exists(temp_path):
-            logging.info("Test screenshot saved successfully in current directory")
-            
-            # Now try the target location
-            screenshot.save(full_path)
-            logging.info(f"Screenshot saved to target location: {full_path}")
-            
-            # Verify file exists in target location
-            if os.path.exists(full_path):
-                file_size = os.path.getsize(full_path)
-                logging.info(f"File verified in target location - Size: {file_size} bytes")
-                # Clean up test file
-                try:
-                    os.remove(temp_path)
-                    logging.info("Test file cleaned up")
-                except:
-                    pass
-                return f"Screenshot successfully saved to: {full_path} (Size: {file_size} bytes)"
-            else:
-                logging.error("File was not created in target location")
-                return f"Error: Screenshot saved to {temp_path} but failed to save to target location {full_path}"
-        else:
-            logging.error("Test screenshot failed")
-            return "Error: Could not save screenshot anywhere"
-    
+        saved = save_screenshot(filename, image_format, quality)
+        return f"Screenshot successfully saved to: {saved['path']} (Size: {saved['bytes']} bytes)"
+    except ValueError as e:
+        return f"Error: {e}"
+    except OSError as e:
+        logging.error(f"Error saving screenshot: {e}")
+        return f"Error: Could not save screenshot: {e}"
     except Exception as e:
         logging.error(f"Error taking screenshot: {e}")
-        import traceback
-        logging.error(f"Full traceback: {traceback.format_exc()}")
         return f"An error occurred while taking screenshot: {str(e)}"
 
+def _history_unavailable(seconds_ago: int) -> str:
+    if not SCREEN_HISTORY_ENABLED:
+        return "Screen history is turned off, so I can only see what's on screen now. Set JARVIS_SCREEN_HISTORY=1 to enable it."
+    oldest = screen_history.oldest()
+    if oldest is None:
+        return "I haven't recorded any screen history yet."
+    return f"I can only look back {int(time.time() - oldest)} seconds, not {seconds_ago}."
+
 @function_tool()
-async def read_screen(
+@single_flight
+@blocking_tool(limit=2, timeout=30.0)
+def read_screen(
     context: RunContext,  # type: ignore
+    focused_window_only: bool = False,
+    seconds_ago: int = 0,
+    refresh: bool = False,
 ) -> str:
     """
     Take a screenshot and describe what's currently on the screen.
+    
+    Args:
+        focused_window_only: Only look at the window in the foreground (default: the whole screen)
+        seconds_ago: Describe what was on the screen this many seconds ago instead (needs screen history)
+        refresh: Look again instead of reusing the last description of an unchanged screen (when the user asks again)
     """
     try:
         logging.info("Screen reading function called")
@@ -114,18 +73,34 @@ async def read_screen(
         load_dotenv()  # loads .env if needed
         if not openai.api_key:
             openai.api_key = os.getenv("OPENAI_API_KEY")
-        # Take screenshot
-        logging.info("Taking screenshot for screen reading...")
-        screenshot = pyautogui.screenshot()
-        logging.info(f"Screenshot captured - Size: {screenshot.size}")
+        if seconds_ago > 0:
+            recalled = screen_history.frame_at(seconds_ago)
+            if recalled is None:
+                return _history_unavailable(seconds_ago)
+            captured_at, screenshot = recalled
+            crop, variant = None, "history"
+            prefix = f"At {datetime.fromtimestamp(captured_at).strftime('%H:%M:%S')} your screen showed:"
+        else:
+            # Take screenshot
+            logging.info("Taking screenshot for screen reading...")
+            screenshot = grab_screen()
+            logging.info(f"Screenshot captured - Size: {screenshot.size}")
+            crop = variant = active_window_box() if focused_window_only else None
+            prefix = "Here's what I can see on your screen:"
+        
+        # An unchanged screen gets the description it got last time, without another vision call
+        fingerprint = screen_fingerprint(screenshot.crop(crop) if crop else screenshot)
+        cached = None if refresh else screen_cache.get(fingerprint, variant=variant)
+        if cached:
+            return f"{prefix} {cached}"
         
-        # Convert screenshot to base64 for AI analysis
-        buffer = BytesIO()
-        screenshot.save(buffer, format='PNG')
-        img_base64 = base64.b64encode(buffer.getvalue()).decode()
+        # Downscale to what the model actually looks at before uploading
+        payload = build_vision_payload(screenshot, crop=crop)
         
         # Try using OpenAI GPT-4 Vision
         try:
+            if not get_limiter("openai").acquire():
+                return busy_message("screen reading")
             
             response = openai.chat.completions.create(
                 model="gpt-4o",
@@ -137,21 +112,19 @@ async def read_screen(
                                 "type": "text",
                                 "text": "Describe what you see on this screen. Include details about any applications, documents, videos, websites, or other content that's visible. Be specific about what's displayed and what the user might be working on."
                             },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{img_base64}"
-                                }
-                            }
+                            *payload.content()
                         ]
                     }
                 ],
-                max_tokens=500
+                max_tokens=500,
+                timeout=remaining_timeout(20.0)
             )
             
             description = response.choices[0].message.content
             logging.info(f"Screen reading completed successfully")
-            return f"Here's what I can see on your screen: {description}"
+            if description:
+                screen_cache.put(fingerprint, description, variant=variant)
+            return f"{prefix} {description}"
             
         except ImportError:
             logging.error("OpenAI library not installed")
@@ -182,13 +155,13 @@ async def read_screen(
                         return "Could not detect active window"
                 
                 # Get basic screen info
-                screen_width, screen_height = pyautogui.size()
+                screen_width, screen_height = screen_size()
                 active_window = get_active_window()
                 
                 return f"Screen resolution: {screen_width}x{screen_height}. {active_window}. Note: For detailed screen content description, please configure OpenAI API key for GPT-4 Vision."
                 
             except ImportError:
-                screen_width, screen_height = pyautogui.size()
+                screen_width, screen_height = screen_size()
                 return f"Screen resolution: {screen_width}x{screen_height}. For detailed screen reading, please install required libraries: pip install openai pywin32 psutil"
     
     except Exception as e:
@@ -198,17 +171,21 @@ async def read_screen(
         return f"An error occurred while reading screen: {str(e)}"
     
 @function_tool()
-async def get_screen_size(
+@single_flight
+@cached_tool(ttl_minutes=60, stale_minutes=1440)
+@blocking_tool(limit=4, timeout=5.0)
+def get_screen_size(
     context: RunContext  # type: ignore
 ) -> str:
     """
     Get the screen size.
     """
     try:
-        width, height = pyautogui.size()
+        width, height = screen_size()
         logging.info(f"Screen size: {width}x{height}")
         return f"Screen size: {width}x{height}"
         
     except Exception as e:
         logging.error(f"Error getting screen size: {e}")
+        tool_failed()
         return f"An error occurred while getting screen size: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,104 @@
+import os
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+FINGERPRINT_SHORT_SIDE = 192  # Grayscale thumbnail compared pixel by pixel; at 1080p one pixel covers ~6x6 screen pixels
+PIXEL_TOLERANCE = 16  # Grey levels a fingerprint pixel may move before it counts as changed
+MAX_DISTANCE = int(os.getenv("JARVIS_SCREEN_CACHE_DISTANCE", 4))  # Changed fingerprint pixels still counted as the same screen
+TTL = float(os.getenv("JARVIS_SCREEN_CACHE_TTL", 120))  # Seconds a description is reused
+MAX_ENTRIES = int(os.getenv("JARVIS_SCREEN_CACHE_SIZE", 32))  # 0 disables the cache
+
+
+def screen_fingerprint(image: Image.Image, short_side: int = FINGERPRINT_SHORT_SIDE) -> Image.Image:
+    """Small grayscale copy of the screen, box-averaged so every screen pixel contributes
+
+    A blinking cursor or a ticking clock changes a handful of its pixels; a new line of
+    text changes dozens, and a different window or page changes most of them.
+    """
+    scale = short_side / min(image.size)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.BOX, reducing_gap=2.0).convert("L")
+
+
+def changed_pixels(a: Image.Image, b: Image.Image, tolerance: int = PIXEL_TOLERANCE) -> int:
+    """Number of fingerprint pixels that differ by more than tolerance; fingerprints of different shapes never match"""
+    if a.size != b.size:
+        return a.width * a.height
+    return ImageChops.difference(a, b).point(lambda p: 255 if p > tolerance else 0).histogram()[255]
+
+
+def _digest(fingerprint: Image.Image) -> bytes:
+    return hashlib.blake2b(fingerprint.tobytes(), digest_size=16).digest()
+
+
+class ScreenDescriptionCache:
+    """Recent screen descriptions keyed by screen fingerprint, with TTL and LRU eviction
+
+    An identical fingerprint is found by its digest; otherwise a lookup matches the entry
+    with the fewest changed pixels, up to max_distance, whose variant (e.g. whole screen
+    vs focused window) is the same. Asking twice about an unchanged screen therefore
+    skips the vision call, while new text on it does not.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL, max_distance: int = MAX_DISTANCE):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._entries: "OrderedDict[Tuple[Hashable, bytes], Tuple[Image.Image, str, float]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: Image.Image, variant: Hashable = None) -> Optional[str]:
+        if self.max_entries <= 0:
+            return None
+        now = time.monotonic()
+        exact_key = (variant, _digest(fingerprint))
+        with self._lock:
+            best_key, best_distance = None, self.max_distance + 1
+            for key, (_, _, stored) in list(self._entries.items()):
+                if now - stored > self.ttl:
+                    del self._entries[key]
+            if exact_key in self._entries:
+                best_key, best_distance = exact_key, 0
+            else:
+                for key, (stored_fingerprint, _, _) in self._entries.items():
+                    if key[0] != variant:
+                        continue
+                    distance = changed_pixels(stored_fingerprint, fingerprint)
+                    if distance < best_distance:
+                        best_key, best_distance = key, distance
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            description = self._entries[best_key][1]
+        logging.info(f"Screen description cache hit ({best_distance} pixels changed)")
+        return description
+
+    def put(self, fingerprint: Image.Image, description: str, variant: Hashable = None):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            key = (variant, _digest(fingerprint))
+            self._entries[key] = (fingerprint, description, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+screen_cache = ScreenDescriptionCache()
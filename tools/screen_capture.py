@@ -0,0 +1,188 @@
+import os
+import time
+import logging
+import tempfile
+from io import BytesIO
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image
+
+SCREENSHOT_DIR = os.getenv("JARVIS_SCREENSHOT_DIR", r"C:\Users\Chris\OneDrive\Pictures\Screenshots")
+SCREENSHOT_FORMAT = os.getenv("JARVIS_SCREENSHOT_FORMAT", "png").lower()
+# PNG: zlib level 0-9 (lower is faster); JPEG/WebP: quality 1-100
+SCREENSHOT_QUALITY = os.getenv("JARVIS_SCREENSHOT_QUALITY")
+
+EXTENSIONS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+FORMAT_ALIASES = {"jpg": "jpeg", "jpeg": "jpeg", "png": "png", "webp": "webp"}
+
+
+# CAPTURE BACKENDS
+
+class PyAutoGUICapture:
+    """The real screen, through pyautogui"""
+
+    def grab(self) -> Image.Image:
+        import pyautogui
+        return pyautogui.screenshot()
+
+    def size(self) -> Tuple[int, int]:
+        import pyautogui
+        return tuple(pyautogui.size())
+
+
+class ImageFileCapture:
+    """Replays an image file as the screen, for headless testing"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def grab(self) -> Image.Image:
+        with Image.open(self.path) as image:
+            return image.convert("RGB")
+
+    def size(self) -> Tuple[int, int]:
+        with Image.open(self.path) as image:
+            return image.size
+
+
+class SyntheticCapture:
+    """A generated test pattern, for headless testing without any image files"""
+
+    def __init__(self, size: Tuple[int, int] = (1920, 1080)):
+        self._size = size
+
+    def grab(self) -> Image.Image:
+        width, height = self._size
+        image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+        image.paste((30, 30, 30), (0, 0, width, height // 20))  # A title bar
+        return image
+
+    def size(self) -> Tuple[int, int]:
+        return self._size
+
+
+def _backend_from_env():
+    spec = os.getenv("JARVIS_CAPTURE_BACKEND", "pyautogui")
+    if spec.startswith("file:"):
+        return ImageFileCapture(spec[len("file:"):])
+    if spec == "synthetic":
+        return SyntheticCapture()
+    return PyAutoGUICapture()
+
+
+_backend = _backend_from_env()
+
+
+def set_capture_backend(backend):
+    """Swap the screen source (anything with grab() and size())"""
+    global _backend
+    _backend = backend
+
+
+def get_capture_backend():
+    return _backend
+
+
+def grab_screen() -> Image.Image:
+    return _backend.grab()
+
+
+def screen_size() -> Tuple[int, int]:
+    return _backend.size()
+
+
+# ENCODERS
+
+def _encode_png(image: Image.Image, quality: Optional[int], buffer: BytesIO):
+    image.save(buffer, format="PNG", compress_level=1 if quality is None else quality)
+
+
+def _encode_jpeg(image: Image.Image, quality: Optional[int], buffer: BytesIO):
+    image.convert("RGB").save(buffer, format="JPEG", quality=85 if quality is None else quality, optimize=False)
+
+
+def _encode_webp(image: Image.Image, quality: Optional[int], buffer: BytesIO):
+    image.save(buffer, format="WEBP", quality=80 if quality is None else quality, method=4)
+
+
+ENCODERS: Dict[str, Callable[[Image.Image, Optional[int], BytesIO], None]] = {
+    "png": _encode_png,
+    "jpeg": _encode_jpeg,
+    "webp": _encode_webp,
+}
+
+
+def normalize_format(image_format: str) -> str:
+    fmt = FORMAT_ALIASES.get(image_format.lower().lstrip("."))
+    if fmt is None:
+        raise ValueError(f"Unsupported image format: {image_format} (use png, jpeg or webp)")
+    return fmt
+
+
+def encode_image(image: Image.Image, image_format: str = "png", quality: Optional[int] = None) -> bytes:
+    buffer = BytesIO()
+    ENCODERS[normalize_format(image_format)](image, quality, buffer)
+    return buffer.getvalue()
+
+
+# SAVING
+
+_created_dirs = set()
+_dirs_lock = Lock()
+
+
+def write_atomic(path: str, data: bytes):
+    """Write to a temp file next to the target and rename it into place"""
+    directory = os.path.dirname(path) or "."
+    with _dirs_lock:
+        if directory not in _created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            _created_dirs.add(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".screenshot-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def screenshot_path(filename: Optional[str] = None, image_format: Optional[str] = None,
+                    directory: str = SCREENSHOT_DIR) -> Tuple[str, str]:
+    """Target path and format; an extension in the filename picks the format"""
+    fmt = normalize_format(image_format or SCREENSHOT_FORMAT)
+    if filename is None:
+        filename = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    stem, ext = os.path.splitext(filename)
+    if ext.lower().lstrip(".") in FORMAT_ALIASES:
+        fmt = normalize_format(ext)
+    else:
+        filename = filename + EXTENSIONS[fmt]
+    return os.path.join(directory, filename), fmt
+
+
+def save_screenshot(filename: Optional[str] = None, image_format: Optional[str] = None,
+                    quality: Optional[int] = None) -> Dict:
+    """Grab, encode and write one screenshot; call from a worker thread"""
+    path, fmt = screenshot_path(filename, image_format)
+    if quality is None and SCREENSHOT_QUALITY:
+        quality = int(SCREENSHOT_QUALITY)
+
+    start = time.perf_counter()
+    image = grab_screen()
+    captured = time.perf_counter()
+    data = encode_image(image, fmt, quality)
+    encoded = time.perf_counter()
+    write_atomic(path, data)
+    written = time.perf_counter()
+
+    logging.info(f"Screenshot {image.size[0]}x{image.size[1]} saved to {path} ({len(data)} bytes; "
+                 f"capture {(captured - start) * 1000:.0f}ms, encode {(encoded - captured) * 1000:.0f}ms, "
+                 f"write {(written - encoded) * 1000:.0f}ms)")
+    return {"path": path, "format": fmt, "bytes": len(data), "size": image.size}
@@ -0,0 +1,155 @@
+import os
+import time
+import zlib
+import logging
+from collections import deque
+from threading import Lock, Thread, Event
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .screen_capture import grab_screen
+from .vision import downscale
+
+SCREEN_HISTORY_ENABLED = os.getenv("JARVIS_SCREEN_HISTORY", "0") == "1"
+SAMPLE_INTERVAL = float(os.getenv("JARVIS_SCREEN_HISTORY_INTERVAL", 5))  # Seconds between captures
+MAX_HISTORY_BYTES = int(float(os.getenv("JARVIS_SCREEN_HISTORY_MB", 32)) * 1024 * 1024)
+FRAME_SHORT_SIDE = 360  # Stored resolution; enough to tell which app, page or document was up
+KEYFRAME_EVERY = 60  # Deltas stored against one keyframe before a new one is taken
+MAX_DELTA_RATIO = 0.5  # A delta bigger than this share of its keyframe starts a new keyframe instead
+PIXEL_THRESHOLD = 12  # Per-channel change ignored as noise
+MIN_CHANGED_FRACTION = 0.001  # Frames with fewer changed pixels than this are skipped
+
+
+class _FrameGroup:
+    """One zlib-compressed keyframe and the deltas (frame - keyframe, mod 256) stored against it"""
+
+    def __init__(self, timestamp: float, frame: np.ndarray):
+        self.shape = frame.shape
+        self.keyframe = zlib.compress(frame.tobytes(), 1)
+        self.frames: List[Tuple[float, Optional[bytes]]] = [(timestamp, None)]  # None: the keyframe itself
+        self.nbytes = len(self.keyframe)
+
+    def add_delta(self, timestamp: float, delta: bytes):
+        self.frames.append((timestamp, delta))
+        self.nbytes += len(delta)
+
+    def decode_keyframe(self) -> np.ndarray:
+        return np.frombuffer(zlib.decompress(self.keyframe), dtype=np.uint8).reshape(self.shape)
+
+    def decode(self, index: int) -> np.ndarray:
+        keyframe = self.decode_keyframe()
+        delta = self.frames[index][1]
+        if delta is None:
+            return keyframe
+        return keyframe + np.frombuffer(zlib.decompress(delta), dtype=np.uint8).reshape(self.shape)
+
+
+class ScreenHistory:
+    """Low-resolution screen frames from the last few minutes, in a memory-bounded ring buffer
+
+    A background sampler captures the screen every `interval` seconds and skips frames that
+    barely differ from the last one stored. Frames are kept as deltas against a periodic
+    keyframe, which compress to a few KB while the screen mostly stays the same; once the
+    buffer passes max_bytes the oldest keyframe is dropped along with its deltas.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, max_bytes: int = MAX_HISTORY_BYTES,
+                 short_side: int = FRAME_SHORT_SIDE):
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.short_side = short_side
+        self._groups: deque = deque()
+        self._bytes = 0
+        self._keyframe: Optional[np.ndarray] = None
+        self._last: Optional[np.ndarray] = None
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+        self.sampled = 0
+        self.skipped = 0
+
+    def _changed(self, frame: np.ndarray) -> bool:
+        if self._last is None or self._last.shape != frame.shape:
+            return True
+        difference = np.abs(frame.astype(np.int16) - self._last).max(axis=2)
+        return np.count_nonzero(difference > PIXEL_THRESHOLD) > MIN_CHANGED_FRACTION * difference.size
+
+    def add(self, image: Image.Image, timestamp: Optional[float] = None) -> bool:
+        """Store a frame unless it matches the previous one; returns whether it was stored"""
+        timestamp = time.time() if timestamp is None else timestamp
+        frame = np.asarray(downscale(image.convert("RGB"), self.short_side), dtype=np.uint8)
+        self.sampled += 1
+        if not self._changed(frame):
+            self.skipped += 1
+            return False
+
+        with self._lock:
+            group = self._groups[-1] if self._groups else None
+            delta = None
+            if group is not None and group.shape == frame.shape and len(group.frames) < KEYFRAME_EVERY:
+                delta = zlib.compress((frame - self._keyframe).tobytes(), 1)
+                if len(delta) > MAX_DELTA_RATIO * len(group.keyframe):
+                    delta = None  # The screen moved on; a fresh keyframe is cheaper from here
+            if delta is not None:
+                group.add_delta(timestamp, delta)
+                self._bytes += len(delta)
+            else:
+                group = _FrameGroup(timestamp, frame)
+                self._groups.append(group)
+                self._keyframe = frame
+                self._bytes += group.nbytes
+            while self._bytes > self.max_bytes and len(self._groups) > 1:
+                self._bytes -= self._groups.popleft().nbytes
+            self._last = frame
+        return True
+
+    def sample(self):
+        self.add(grab_screen())
+
+    def frame_at(self, seconds_ago: float = 0) -> Optional[Tuple[float, Image.Image]]:
+        """The frame that was on screen seconds_ago, with its capture time; None if too old"""
+        target = time.time() - seconds_ago
+        with self._lock:
+            for group in reversed(self._groups):
+                if group.frames[0][0] > target:
+                    continue
+                index = max(i for i, (timestamp, _) in enumerate(group.frames) if timestamp <= target)
+                return group.frames[index][0], Image.fromarray(group.decode(index))
+        return None
+
+    def oldest(self) -> Optional[float]:
+        with self._lock:
+            return self._groups[0].frames[0][0] if self._groups else None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logging.error(f"Screen history sample failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="jarvis-screen-history", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            frames = sum(len(group.frames) for group in self._groups)
+            oldest = self._groups[0].frames[0][0] if self._groups else None
+            return {
+                "frames": frames,
+                "keyframes": len(self._groups),
+                "bytes": self._bytes,
+                "sampled": self.sampled,
+                "skipped": self.skipped,
+                "span_seconds": round(time.time() - oldest) if oldest else 0,
+            }
+
+
+screen_history = ScreenHistory()
@@ -0,0 +1,107 @@
+import os
+import re
+import time
+import sqlite3
+import logging
+from threading import Lock
+from typing import Dict, List, Optional
+
+STOPWORDS = {
+    "a", "an", "the", "of", "for", "to", "in", "on", "at", "and", "or", "is", "are", "was",
+    "what", "whats", "who", "how", "why", "when", "where", "me", "about", "tell", "please", "search",
+}
+
+
+class SearchIndex:
+    """Embedded SQLite FTS5 index of fetched web search snippets
+
+    Every snippet returned by the search backend is stored with the query that produced
+    it and a timestamp, so repeated and related queries can be answered locally while
+    the stored results are fresh enough.
+    """
+
+    def __init__(self, db_path: str = "./search_index.db", max_age_minutes: int = 120,
+                 retention_days: int = 7, min_results: int = 2):
+        self.db_path = db_path
+        self.max_age_minutes = max_age_minutes
+        self.retention_days = retention_days
+        self.min_results = min_results
+        self._lock = Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._inserts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS snippets USING fts5("
+                "query, title, snippet, link UNINDEXED, fetched_at UNINDEXED, tokenize='porter unicode61')"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _match_expression(query: str) -> Optional[str]:
+        """All significant words of the query, quoted so FTS syntax in user text is inert"""
+        words = [w for w in re.findall(r"\w+", query.lower()) if w not in STOPWORDS]
+        if not words:
+            return None
+        return " AND ".join(f'"{w}"' for w in words)
+
+    def lookup(self, query: str, limit: int = 5) -> List[Dict]:
+        """Fresh indexed snippets matching the query, best first (empty if too few)"""
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        cutoff = time.time() - self.max_age_minutes * 60
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT title, snippet, link FROM snippets "
+                "WHERE snippets MATCH ? AND CAST(fetched_at AS REAL) >= ? "
+                "ORDER BY bm25(snippets) LIMIT ?",
+                (expression, cutoff, limit),
+            ).fetchall()
+        if len(rows) < self.min_results:
+            return []
+        return [{"title": title, "snippet": snippet, "link": link} for title, snippet, link in rows]
+
+    def add_results(self, query: str, results: List[Dict]):
+        """Store snippets returned for a query"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT INTO snippets (query, title, snippet, link, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                [(query, r.get("title", ""), r.get("snippet", ""), r.get("link", ""), now) for r in results],
+            )
+            self._inserts += 1
+            if self._inserts % 50 == 0:
+                conn.execute(
+                    "DELETE FROM snippets WHERE CAST(fetched_at AS REAL) < ?",
+                    (now - self.retention_days * 86400,),
+                )
+            conn.commit()
+
+
+search_index = SearchIndex(db_path=os.getenv("JARVIS_SEARCH_INDEX", "./search_index.db"))
+
+
+def format_results(results: List[Dict]) -> str:
+    """Join snippets the way DuckDuckGoSearchRun does"""
+    return " ".join(r["snippet"] for r in results if r.get("snippet"))
+
+
+def safe_lookup(query: str) -> List[Dict]:
+    try:
+        return search_index.lookup(query)
+    except sqlite3.Error as e:
+        logging.error(f"Search index lookup failed: {e}")
+        return []
+
+
+def safe_add(query: str, results: List[Dict]):
+    try:
+        search_index.add_results(query, results)
+    except sqlite3.Error as e:
+        logging.error(f"Search index update failed: {e}")
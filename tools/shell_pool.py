@@ -0,0 +1,236 @@
+import os
+import time
+import uuid
+import shlex
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from .command_runner import (
+    CommandResult, OutputBuffer, MAX_OUTPUT_BYTES, READ_CHUNK, OUTPUT_ENCODING, signal_process_tree,
+)
+
+SESSIONS_PER_KEY = 2  # Shells kept for each user session
+MAX_COMMANDS_PER_SESSION = 200
+MAX_SESSION_AGE = 30 * 60.0  # Seconds before a shell is replaced
+IDLE_TIMEOUT = 10 * 60.0  # Idle shells are closed after this long
+HEALTH_CHECK_AFTER = 30.0  # Idle seconds after which a shell is checked before reuse
+HEALTH_CHECK_TIMEOUT = 2.0
+
+IS_WINDOWS = os.name == "nt"
+
+
+class ShellDied(Exception):
+    """The shell exited or stopped responding in the middle of a command"""
+
+
+class ShellSession:
+    """One long-lived shell; each command is framed by a unique sentinel
+
+    After the command, the shell prints the sentinel followed by the exit code and working
+    directory on stdout, and the sentinel alone on stderr, so both streams can be read up to
+    exactly where the command's output ends.
+    """
+
+    def __init__(self, cwd: Optional[str] = None):
+        self.cwd = cwd or os.getcwd()
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.started = time.monotonic()
+        self.last_used = self.started
+        self.commands = 0
+
+    async def start(self):
+        if IS_WINDOWS:
+            args = ["cmd.exe", "/Q"]  # Echo off: no prompt or command echo in the output
+        else:
+            args = ["/bin/bash" if os.path.exists("/bin/bash") else "/bin/sh"]
+        self.proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            start_new_session=not IS_WINDOWS,
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    def expired(self) -> bool:
+        now = time.monotonic()
+        return (not self.alive or self.commands >= MAX_COMMANDS_PER_SESSION
+                or now - self.started > MAX_SESSION_AGE or now - self.last_used > IDLE_TIMEOUT)
+
+    def _frame(self, command: str, cwd: str, sentinel: str) -> str:
+        if IS_WINDOWS:
+            command = command.replace("\r", "").replace("\n", " & ")
+            return (f'cd /d "{cwd}"\r\n'
+                    f"{command} < NUL\r\n"
+                    f"echo.&echo {sentinel} %errorlevel% %cd%\r\n"
+                    f"(echo.&echo {sentinel}) 1>&2\r\n")
+        # eval keeps a malformed command (e.g. an unclosed quote) from swallowing the framing
+        return (f"cd -- {shlex.quote(cwd)} 2>/dev/null\n"
+                f"eval {shlex.quote(command)} < /dev/null\n"
+                f"__jarvis_rc=$?\n"
+                f"printf '\\n%s %s %s\\n' {sentinel} \"$__jarvis_rc\" \"$PWD\"\n"
+                f"printf '\\n%s\\n' {sentinel} >&2\n")
+
+    @staticmethod
+    async def _read_until(stream: asyncio.StreamReader, marker: bytes, buffer: OutputBuffer) -> bytes:
+        """Copy output into buffer up to the marker line; returns the rest of that line"""
+        pending = b""
+        while True:
+            chunk = await stream.read(READ_CHUNK)
+            if not chunk:
+                # e.g. the command ran "exit": keep what it printed before the shell went away
+                buffer.write(pending)
+                raise ShellDied("shell exited")
+            pending += chunk
+            index = pending.find(marker)
+            if index >= 0:
+                # The framing puts a newline before the marker; it isn't part of the output
+                buffer.write(pending[:max(0, index - 1)] if pending[:index].endswith(b"\n") else pending[:index])
+                rest = pending[index + len(marker):]
+                while b"\n" not in rest:
+                    chunk = await stream.read(READ_CHUNK)
+                    if not chunk:
+                        raise ShellDied("shell exited")
+                    rest += chunk
+                return rest.split(b"\n", 1)[0]
+            # Hold back just enough bytes to recognise a marker split across reads
+            keep = len(marker) + 1
+            if len(pending) > keep:
+                buffer.write(pending[:-keep])
+                pending = pending[-keep:]
+
+    async def run(self, command: str, cwd: str, timeout: Optional[float],
+                  max_output_bytes: int = MAX_OUTPUT_BYTES) -> CommandResult:
+        result = CommandResult(command)
+        stdout, stderr = OutputBuffer(max_output_bytes), OutputBuffer(max_output_bytes)
+        sentinel = f"__JARVIS_{uuid.uuid4().hex}__"
+        marker = sentinel.encode()
+        start = time.monotonic()
+        self.commands += 1
+        try:
+            self.proc.stdin.write(self._frame(command, cwd, sentinel).encode(OUTPUT_ENCODING))
+            await self.proc.stdin.drain()
+            # return_exceptions: if the shell exits, both streams are still read to the end
+            status, stderr_status = await asyncio.wait_for(
+                asyncio.gather(
+                    self._read_until(self.proc.stdout, marker, stdout),
+                    self._read_until(self.proc.stderr, marker, stderr),
+                    return_exceptions=True,
+                ),
+                timeout,
+            )
+            for outcome in (status, stderr_status):
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            fields = status.decode(OUTPUT_ENCODING, errors="replace").strip().split(" ", 1)
+            result.exit_code = int(fields[0])
+            if len(fields) > 1 and fields[1]:
+                self.cwd = fields[1].strip()
+        except asyncio.TimeoutError:
+            result.timed_out = True
+            await self.close()
+        except asyncio.CancelledError:
+            result.cancelled = True
+            await asyncio.shield(self.close())
+            raise
+        except (ShellDied, ConnectionError, ValueError) as e:
+            # e.g. the command was "exit"; report what the shell said and let the pool replace it
+            logging.info(f"Shell session ended during '{command}': {e}")
+            await self.close()
+            result.exit_code = self.proc.returncode
+        finally:
+            self.last_used = time.monotonic()
+            result.duration = self.last_used - start
+            result.stdout = stdout.text()
+            result.stderr = stderr.text()
+            result.truncated = stdout.dropped_bytes > 0 or stderr.dropped_bytes > 0
+        return result
+
+    async def healthy(self) -> bool:
+        if not self.alive:
+            return False
+        result = await self.run("rem" if IS_WINDOWS else ":", self.cwd, HEALTH_CHECK_TIMEOUT)
+        return result.exit_code == 0
+
+    async def close(self):
+        if self.proc is None or self.proc.returncode is not None:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, signal_process_tree, self.proc.pid, True)
+        try:
+            await asyncio.wait_for(self.proc.wait(), HEALTH_CHECK_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.warning(f"Shell session {self.proc.pid} did not exit")
+
+
+class ShellPool:
+    """Long-lived shells per user session, so short commands skip process start-up
+
+    The working directory a command leaves behind is remembered per user session and
+    restored in whichever of that session's shells runs the next command.
+    """
+
+    def __init__(self, sessions_per_key: int = SESSIONS_PER_KEY):
+        self.sessions_per_key = sessions_per_key
+        self._idle: Dict[Tuple[int, str], list] = {}
+        self._slots: Dict[Tuple[int, str], asyncio.Semaphore] = {}
+        self._cwd: Dict[str, str] = {}
+        self.started = 0
+        self.recycled = 0
+        self.reused = 0
+
+    async def _checkout(self, pool_key) -> ShellSession:
+        idle = self._idle.setdefault(pool_key, [])
+        while idle:
+            session = idle.pop()
+            if session.expired():
+                self.recycled += 1
+                await session.close()
+                continue
+            if time.monotonic() - session.last_used > HEALTH_CHECK_AFTER and not await session.healthy():
+                self.recycled += 1
+                await session.close()
+                continue
+            self.reused += 1
+            return session
+        session = ShellSession(self._cwd.get(pool_key[1]))
+        await session.start()
+        self.started += 1
+        return session
+
+    async def run(self, command: str, key: str = "local", timeout: Optional[float] = None) -> CommandResult:
+        # Subprocess pipes belong to one event loop, so shells are pooled per loop as well
+        pool_key = (id(asyncio.get_running_loop()), key)
+        slots = self._slots.setdefault(pool_key, asyncio.Semaphore(self.sessions_per_key))
+        async with slots:
+            session = await self._checkout(pool_key)
+            cwd = self._cwd.get(key, session.cwd)
+            try:
+                result = await session.run(command, cwd, timeout)
+            finally:
+                if session.alive:
+                    self._idle[pool_key].append(session)
+            if session.alive:
+                self._cwd[key] = session.cwd
+            return result
+
+    async def close(self):
+        for sessions in self._idle.values():
+            for session in sessions:
+                await session.close()
+        self._idle.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "idle": sum(len(sessions) for sessions in self._idle.values()),
+            "started": self.started,
+            "reused": self.reused,
+            "recycled": self.recycled,
+        }
+
+
+shell_pool = ShellPool()
@@ -0,0 +1,60 @@
+import asyncio
+import inspect
+import logging
+import functools
+from typing import Callable, Dict
+
+from .cache import normalized_arguments
+
+# Tools whose identical concurrent calls may share one execution: read-only, no side effects.
+# Anything that acts on the machine (typing, clicking, sending, launching) must stay False.
+COALESCE_POLICY: Dict[str, bool] = {
+    "get_weather": True,
+    "search_web": True,
+    "get_screen_size": True,
+    "read_screen": True,
+}
+
+_in_flight: Dict[tuple, asyncio.Task] = {}
+_coalesced: Dict[str, int] = {}
+
+
+def set_coalesce_policy(tool_name: str, enabled: bool):
+    """Allow or forbid coalescing for one tool at runtime"""
+    COALESCE_POLICY[tool_name] = enabled
+
+
+def coalesce_stats() -> Dict[str, int]:
+    """Number of calls per tool that were served by another caller's execution"""
+    return dict(_coalesced)
+
+
+def single_flight(fn: Callable):
+    """Share one execution between identical in-flight calls of a tool
+
+    Calls match on tool name plus normalized arguments. The first caller starts the
+    execution; later identical callers await the same task and get the same result.
+    Apply below @function_tool(); the per-tool switch is COALESCE_POLICY.
+    """
+    signature = inspect.signature(fn)
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if not COALESCE_POLICY.get(name, False):
+            return await fn(*args, **kwargs)
+
+        params = normalized_arguments(signature, args, kwargs)
+        key = (name, repr(sorted(params.items())))
+        task = _in_flight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(fn(*args, **kwargs))
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+        else:
+            _coalesced[name] = _coalesced.get(name, 0) + 1
+            logging.info(f"Coalesced {name} call with an identical one in flight")
+        # Shielded so one waiter giving up doesn't cancel the execution for the others
+        return await asyncio.shield(task)
+
+    return wrapper
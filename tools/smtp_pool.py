@@ -0,0 +1,147 @@
+import os
+import time
+import queue
+import smtplib
+import logging
+from threading import Lock, BoundedSemaphore
+from contextlib import contextmanager
+from email.message import Message
+from typing import List, Optional, Tuple
+
+from .deadline import remaining_timeout
+
+
+class PooledSMTPConnection:
+    """One authenticated SMTP session plus the time it was last known to be healthy"""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+
+
+class SMTPPool:
+    """Keeps authenticated SMTP sessions alive between emails
+
+    Idle sessions are checked with NOOP before reuse (after `health_check_after` seconds)
+    and dropped after `idle_timeout`. A session the server closed underneath us is
+    reconnected transparently and the send retried once.
+    """
+
+    def __init__(self, host: str, port: int, user: Optional[str], password: Optional[str],
+                 starttls: bool = True, max_connections: int = 2,
+                 idle_timeout: float = 240.0, health_check_after: float = 10.0, timeout: float = 20.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[PooledSMTPConnection]" = queue.LifoQueue()
+        self._slots = BoundedSemaphore(max_connections)
+        self._lock = Lock()
+        self.handshakes = 0
+
+    def _connect(self) -> PooledSMTPConnection:
+        # A fixed socket timeout: the connection outlives the utterance that opened it, so it must not
+        # inherit that utterance's deadline. Callers are bounded by the slot wait and their own timeout.
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()  # Enable TLS encryption
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()  # Don't leak the socket on a failed handshake or login
+            raise
+        with self._lock:
+            self.handshakes += 1
+        return PooledSMTPConnection(server)
+
+    @staticmethod
+    def _healthy(conn: PooledSMTPConnection) -> bool:
+        try:
+            status, _ = conn.server.noop()
+            return status == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _take_idle(self) -> Optional[PooledSMTPConnection]:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            idle_for = time.monotonic() - conn.last_used
+            if idle_for > self.idle_timeout:
+                conn.close()
+                continue
+            if idle_for > self.health_check_after and not self._healthy(conn):
+                conn.close()
+                continue
+            return conn
+
+    @contextmanager
+    def connection(self):
+        """Check out a healthy authenticated session, returning it to the pool afterwards"""
+        if not self._slots.acquire(timeout=remaining_timeout(self.timeout)):
+            raise smtplib.SMTPException("No SMTP connection available")
+        conn = None
+        try:
+            conn = self._take_idle() or self._connect()
+            yield conn
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+            conn = None
+        finally:
+            if conn is not None:
+                conn.close()
+            self._slots.release()
+
+    def send(self, msg: Message, sender: str, recipients: List[str]):
+        self.send_many([(msg, sender, recipients)])
+
+    def send_many(self, messages: List[Tuple[Message, str, List[str]]]):
+        """Send several messages over one session"""
+        with self.connection() as conn:
+            for msg, sender, recipients in messages:
+                try:
+                    conn.server.sendmail(sender, recipients, msg.as_string())
+                except smtplib.SMTPServerDisconnected:
+                    # The server dropped an idle session; reconnect once and retry
+                    logging.info("SMTP session was closed by the server, reconnecting")
+                    conn.server = self._connect().server
+                    conn.server.sendmail(sender, recipients, msg.as_string())
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pool: Optional[SMTPPool] = None
+_pool_lock = Lock()
+
+
+def get_smtp_pool() -> SMTPPool:
+    """Shared pool built from the Gmail settings (host/port overridable for a local stand-in server)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPPool(
+                host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+                port=int(os.getenv("SMTP_PORT", 587)),
+                user=os.getenv("GMAIL_USER"),
+                password=os.getenv("GMAIL_APP_PASSWORD"),
+                starttls=os.getenv("SMTP_STARTTLS", "1") == "1",
+            )
+        return _pool
@@ -0,0 +1,167 @@
+import os
+import time
+import base64
+import logging
+from io import BytesIO
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .screen_capture import encode_image
+
+# GPT-4o scales images to fit 2048x2048 and then to 768px on the short side,
+# so anything sent beyond that is uploaded only to be thrown away
+MAX_SHORT_SIDE = int(os.getenv("JARVIS_VISION_SHORT_SIDE", 768))
+MAX_LONG_SIDE = 2048
+JPEG_QUALITY = int(os.getenv("JARVIS_VISION_JPEG_QUALITY", 80))
+MAX_PNG_BYTES = 400 * 1024  # Above this a PNG is re-encoded as JPEG
+UI_MAX_COLORS = 512  # Distinct colours in the sample below which an image is treated as text/UI
+SAMPLE_SIZE = (96, 96)
+TILE_OVERLAP = 32  # Pixels shared by neighbouring tiles so text on a seam is readable in one of them
+
+_totals = {"requests": 0, "images": 0, "bytes_sent": 0, "encode_ms": 0.0}
+_totals_lock = Lock()
+
+
+class VisionPayload:
+    """Encoded images ready for a vision request, with what they cost to build and send"""
+
+    def __init__(self, source_size: Tuple[int, int]):
+        self.source_size = source_size
+        self.images: List[Tuple[str, bytes, Tuple[int, int]]] = []  # (mime type, data, size)
+        self.encode_ms = 0.0
+
+    @property
+    def bytes_sent(self) -> int:
+        return sum(len(data) for _, data, _ in self.images)
+
+    def content(self, detail: str = "auto") -> List[Dict]:
+        """image_url parts for a chat completion message"""
+        return [
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:{mime};base64,{base64.b64encode(data).decode()}",
+                    "detail": detail,
+                },
+            }
+            for mime, data, _ in self.images
+        ]
+
+    def describe(self) -> str:
+        sizes = ", ".join(f"{w}x{h} {mime.split('/')[1]}" for mime, _, (w, h) in self.images)
+        return (f"{self.source_size[0]}x{self.source_size[1]} -> {sizes}: "
+                f"{self.bytes_sent} bytes, encoded in {self.encode_ms:.0f}ms")
+
+
+def fit_size(size: Tuple[int, int], max_short_side: int = MAX_SHORT_SIDE,
+             max_long_side: int = MAX_LONG_SIDE) -> Tuple[int, int]:
+    width, height = size
+    scale = min(1.0, max_short_side / min(width, height), max_long_side / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def downscale(image: Image.Image, max_short_side: int = MAX_SHORT_SIDE) -> Image.Image:
+    target = fit_size(image.size, max_short_side)
+    if target == image.size:
+        return image
+    # reducing_gap does most of the shrink with a cheap box filter before the final resample
+    return image.resize(target, Image.LANCZOS, reducing_gap=2.0)
+
+
+def looks_like_ui(image: Image.Image) -> bool:
+    """Text, code and flat UI have few distinct colours; photos and video frames have many"""
+    sample = image.convert("RGB").resize(SAMPLE_SIZE, Image.NEAREST)
+    return sample.getcolors(maxcolors=UI_MAX_COLORS) is not None
+
+
+def encode_for_vision(image: Image.Image, image_format: str = "auto",
+                      quality: int = JPEG_QUALITY) -> Tuple[str, bytes]:
+    """PNG keeps text crisp, JPEG keeps photos small; returns (mime type, data)"""
+    if image_format == "auto":
+        image_format = "png" if looks_like_ui(image) else "jpeg"
+    if image_format == "png":
+        data = encode_image(image, "png", 6)
+        if len(data) <= MAX_PNG_BYTES:
+            return "image/png", data
+        image_format = "jpeg"
+    return f"image/{image_format}", encode_image(image, image_format, quality)
+
+
+def tile_boxes(size: Tuple[int, int], grid: Tuple[int, int],
+               overlap: int = TILE_OVERLAP) -> List[Tuple[int, int, int, int]]:
+    width, height = size
+    columns, rows = grid
+    boxes = []
+    for row in range(rows):
+        for column in range(columns):
+            left = max(0, width * column // columns - overlap)
+            top = max(0, height * row // rows - overlap)
+            right = min(width, width * (column + 1) // columns + overlap)
+            bottom = min(height, height * (row + 1) // rows + overlap)
+            boxes.append((left, top, right, bottom))
+    return boxes
+
+
+def active_window_box() -> Optional[Tuple[int, int, int, int]]:
+    """Screen rectangle of the foreground window, where the platform exposes it"""
+    try:
+        import win32gui
+        left, top, right, bottom = win32gui.GetWindowRect(win32gui.GetForegroundWindow())
+    except Exception:
+        return None
+    if right - left < 50 or bottom - top < 50:
+        return None
+    return left, top, right, bottom
+
+
+def build_vision_payload(image: Image.Image, max_short_side: int = MAX_SHORT_SIDE,
+                         image_format: str = "auto", crop: Optional[Tuple[int, int, int, int]] = None,
+                         tiles: Optional[Tuple[int, int]] = None) -> VisionPayload:
+    """Downscale (and optionally crop or tile) a screenshot into what a vision model needs
+
+    crop is a (left, top, right, bottom) box in screen pixels, e.g. from active_window_box().
+    tiles splits the image into a (columns, rows) grid, each tile getting the full resolution
+    budget, for small text that would be unreadable in a single downscaled image.
+    """
+    payload = VisionPayload(image.size)
+    start = time.perf_counter()
+    if crop:
+        left, top, right, bottom = crop
+        crop = (max(0, left), max(0, top), min(image.width, right), min(image.height, bottom))
+        if crop[2] > crop[0] and crop[3] > crop[1]:
+            image = image.crop(crop)
+    parts = [image.crop(box) for box in tile_boxes(image.size, tiles)] if tiles else [image]
+    if image_format == "auto":
+        # Decide once for the whole frame so tiles are consistent
+        image_format = "png" if looks_like_ui(image) else "jpeg"
+    for part in parts:
+        part = downscale(part, max_short_side)
+        mime, data = encode_for_vision(part, image_format)
+        payload.images.append((mime, data, part.size))
+    payload.encode_ms = (time.perf_counter() - start) * 1000
+
+    with _totals_lock:
+        _totals["requests"] += 1
+        _totals["images"] += len(payload.images)
+        _totals["bytes_sent"] += payload.bytes_sent
+        _totals["encode_ms"] += payload.encode_ms
+    logging.info(f"Vision payload {payload.describe()}")
+    return payload
+
+
+def payload_from_base64(encoded: str, **options) -> VisionPayload:
+    """Rebuild a client-supplied base64 image (optionally a data URL) as a vision payload"""
+    if encoded.startswith("data:"):
+        encoded = encoded.split(",", 1)[1]
+    with Image.open(BytesIO(base64.b64decode(encoded))) as image:
+        return build_vision_payload(image.convert("RGB"), **options)
+
+
+def vision_stats() -> Dict:
+    with _totals_lock:
+        stats = dict(_totals)
+    stats["avg_bytes"] = stats["bytes_sent"] // stats["requests"] if stats["requests"] else 0
+    stats["encode_ms"] = round(stats["encode_ms"], 1)
+    return stats
@@ -1,47 +1,143 @@
 import logging
+import os
+import re
+import asyncio
+import math
 from datetime import datetime
 from livekit.agents import function_tool, RunContext
-import requests
-from langchain_community.tools import DuckDuckGoSearchRun
+from duckduckgo_search import DDGS
+from .deadline import budget_exhausted, remaining_timeout, BUDGET_EXHAUSTED_REPLY
+from .executor import blocking_tool
+from .http_client import http_get
+from .cache import cached_tool, tool_failed
+from .single_flight import single_flight
+from .search_index import format_results, safe_lookup, safe_add
+from .rate_limit import get_limiter, busy_message, RateLimitExceeded
+
+# Overridable so a local stand-in server can replace wttr.in
+WTTR_BASE_URL = os.getenv("WTTR_BASE_URL", "https://wttr.in")
+
+# Search is the one web tool not on the shared client: DuckDuckGo rejects plain HTTP clients, so
+# the duckduckgo_search library keeps its own browser-impersonating session
+SEARCH_TIMEOUT = 10.0
+
+# Places whose names contain "and", which must not be split into two cities
+PLACES_WITH_AND = (
+    "trinidad and tobago", "antigua and barbuda", "bosnia and herzegovina", "saint kitts and nevis",
+    "saint vincent and the grenadines", "sao tome and principe", "turks and caicos", "wallis and futuna",
+    "heard island and mcdonald islands", "saint pierre and miquelon",
+)
+LIST_SEPARATOR = re.compile(r"\s*(?:;|&|\band\b)\s*", re.IGNORECASE)
+
+
+def split_cities(text: str) -> list:
+    """Cities from "London, Paris and Tokyo", keeping "Paris, France" and "Trinidad and Tobago" whole
+
+    Only "and", "&" and ";" separate places. A comma does too, but only in a list like
+    "London, Paris and Tokyo" whose last item has no comma of its own; otherwise it
+    qualifies a city ("Portland, Oregon").
+    """
+    protected = {}
+    for index, place in enumerate(PLACES_WITH_AND):
+        placeholder = f"\x00{index}\x00"
+        text, count = re.subn(re.escape(place), placeholder, text, flags=re.IGNORECASE)
+        if count:
+            protected[placeholder] = place.title().replace(" And ", " and ").replace(" The ", " the ")
+    parts = [part for part in LIST_SEPARATOR.split(text) if part.strip()]
+    if len(parts) > 1 and ";" not in text and "," not in parts[-1]:
+        parts = [city for part in parts[:-1] for city in part.split(",")] + parts[-1:]
+    cities = []
+    for part in parts:
+        for placeholder, place in protected.items():
+            part = part.replace(placeholder, place)
+        if part.strip(" ,"):
+            cities.append(part.strip(" ,"))
+    return cities
 
 
 @function_tool()
+@single_flight
+@cached_tool(ttl_minutes=15, stale_minutes=60)
 async def get_weather(
     context: RunContext,  # type: ignore
     city: str) -> str:
     """
-    Get the current weather for a given city.
+    Get the current weather for one or more cities.
+    
+    Args:
+        city: City name, or several separated by "and" or ";" (e.g. "London, Paris and Tokyo", "Paris, France; Portland, Oregon")
     """
+    if budget_exhausted():
+        return BUDGET_EXHAUSTED_REPLY
+    cities = split_cities(city) or [city]
+    # All cities are fetched concurrently over the shared connection pool
+    reports = await asyncio.gather(*(_fetch_weather(c) for c in cities))
+    return "\n".join(reports)
+
+
+async def _fetch_weather(city: str) -> str:
     try:
-        response = requests.get(
-            f"https://wttr.in/{city}?format=3")
+        response = await http_get(f"{WTTR_BASE_URL}/{city}", params={"format": "3"}, timeout=5.0, upstream="wttr")
         if response.status_code == 200:
             logging.info(f"Weather for {city}: {response.text.strip()}")
             return response.text.strip()
         else:
             logging.error(f"Failed to get weather for {city}: {response.status_code}")
+            tool_failed()
             return f"Could not retrieve weather for {city}."
+    except RateLimitExceeded:
+        tool_failed()
+        return busy_message("weather")
     except Exception as e:
         logging.error(f"Error retrieving weather for {city}: {e}")
+        tool_failed()
         return f"An error occurred while retrieving weather for {city}."
 
 
 @function_tool()
-async def search_web(
+@single_flight
+@cached_tool(ttl_minutes=60, stale_minutes=240)
+@blocking_tool(limit=2, timeout=15.0)
+def search_web(
     context: RunContext,  # type: ignore
     query: str) -> str:
     """
     Search the web using DuckDuckGo.
     """
     try:
-        results = DuckDuckGoSearchRun().run(tool_input=query)
+        # Near-duplicate and follow-up queries are answered from the local index
+        indexed = safe_lookup(query)
+        if indexed:
+            logging.info(f"Search results for '{query}' served from local index ({len(indexed)} snippets)")
+            return format_results(indexed)
+        
+        if budget_exhausted():
+            return BUDGET_EXHAUSTED_REPLY
+        if not get_limiter("duckduckgo").acquire():
+            tool_failed()
+            return busy_message("search")
+        results = _ddg_results(query, max_results=5)
+        if not results:
+            tool_failed()
+            return "No good DuckDuckGo Search Result was found"
+        safe_add(query, results)
+        results = format_results(results)
         logging.info(f"Search results for '{query}': {results}")
         return results
     except Exception as e:
         logging.error(f"Error searching the web for '{query}': {e}")
+        tool_failed()
         return f"An error occurred while searching the web for '{query}'."
 
 
+def _ddg_results(query: str, max_results: int) -> list:
+    """DuckDuckGo text results, with the request bounded by the remaining utterance budget"""
+    # DDGS takes whole seconds
+    with DDGS(timeout=max(1, math.ceil(remaining_timeout(SEARCH_TIMEOUT)))) as ddgs:
+        results = ddgs.text(query, max_results=max_results) or []
+    return [{"snippet": r["body"], "title": r["title"], "link": r["href"]} for r in results]
+
+
 @function_tool()
 async def get_current_time(
     context: RunContext,  # type: ignore
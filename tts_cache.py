@@ -0,0 +1,106 @@
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+
+class TTSPhraseCache:
+    """Content-addressed cache of synthesized PCM, on disk with an in-memory tier
+
+    Entries are keyed by model, voice, speed and text. The disk tier is bounded by
+    total bytes and evicts least recently used files; the memory tier keeps the most
+    recently played phrases ready to hand to the output stream.
+    """
+
+    def __init__(self, cache_dir: str = "./tts_cache/", max_disk_bytes: int = 50 * 1024 * 1024,
+                 max_memory_items: int = 32, max_text_length: int = 200):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_items = max_memory_items
+        self.max_text_length = max_text_length  # Longer one-off answers are not worth caching
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self._dir_ready = False  # Created on the first write, not when the cache is built
+
+    @staticmethod
+    def key(text: str, voice: str, speed: float, model: str) -> str:
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{model}|{voice}|{speed:.2f}|{normalized}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def cacheable(self, text: str) -> bool:
+        return len(text) <= self.max_text_length
+
+    def get(self, text: str, voice: str, speed: float, model: str) -> Optional[bytes]:
+        key = self.key(text, voice, speed, model)
+        with self._lock:
+            pcm = self._memory.get(key)
+            if pcm is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return pcm
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pcm = f.read()
+            os.utime(path)  # Mark as recently used for LRU eviction
+        except OSError:
+            self.misses += 1
+            return None
+
+        self._remember(key, pcm)
+        self.hits += 1
+        return pcm
+
+    def put(self, text: str, voice: str, speed: float, model: str, pcm: bytes):
+        if not pcm or not self.cacheable(text):
+            return
+        key = self.key(text, voice, speed, model)
+        self._remember(key, pcm)
+
+        # Write-then-rename so a crash never leaves a truncated entry behind
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            if not self._dir_ready:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._dir_ready = True
+            with open(tmp_path, "wb") as f:
+                f.write(pcm)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Could not write TTS cache entry: {e}")
+            return
+        self._evict()
+
+    def contains(self, text: str, voice: str, speed: float, model: str) -> bool:
+        key = self.key(text, voice, speed, model)
+        return key in self._memory or os.path.exists(self._path(key))
+
+    def _remember(self, key: str, pcm: bytes):
+        with self._lock:
+            self._memory[key] = pcm
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Drop least recently used files until the disk tier fits its budget"""
+        with os.scandir(self.cache_dir) as it:
+            entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in it if e.name.endswith(".pcm")]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from threading import Lock
+from typing import Iterable, Optional
+
+import pyaudio
+
+# OpenAI's "pcm" response format: raw 24 kHz, 16-bit, mono samples (no container to decode)
+TTS_SAMPLE_RATE = 24000
+TTS_SAMPLE_WIDTH = 2
+TTS_CHUNK_BYTES = 4800  # 100 ms of audio per read from the response stream
+
+
+class TTSPlayer:
+    """Streams OpenAI TTS straight into one long-lived output stream
+
+    Playback starts on the first chunk of the response instead of after the whole
+    file is synthesized, and the audio device stays open between utterances.
+    """
+
+    def __init__(self, model: str = "tts-1-hd", voice: str = "onyx", speed: float = 1.0, cache=None):
+        self.model = model
+        self.cache = cache  # Optional TTSPhraseCache for recurring lines
+        self.voice = voice
+        self.speed = speed
+        self._client = None
+        self._pa = None
+        self._stream = None
+        self._lock = Lock()  # One utterance at a time on the shared device
+        self.last_time_to_first_audio: Optional[float] = None
+
+    def _get_client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI()
+        return self._client
+
+    def _get_stream(self):
+        if self._stream is None:
+            self._pa = pyaudio.PyAudio()
+            self._stream = self._pa.open(
+                format=self._pa.get_format_from_width(TTS_SAMPLE_WIDTH),
+                channels=1,
+                rate=TTS_SAMPLE_RATE,
+                output=True,
+            )
+        return self._stream
+
+    async def speak(self, text: str, voice: str = None, speed: float = None):
+        """Synthesize and play text, returning once playback has finished"""
+        voice = voice or self.voice
+        speed = speed or self.speed
+        loop = asyncio.get_event_loop()
+
+        if self.cache:
+            pcm = self.cache.get(text, voice, speed, self.model)
+            if pcm is not None:
+                self.last_time_to_first_audio = 0.0
+                await loop.run_in_executor(None, self._play_pcm_sync, pcm)
+                return
+
+        pcm = await loop.run_in_executor(None, self._speak_sync, text, voice, speed)
+        if self.cache:
+            self.cache.put(text, voice, speed, self.model, pcm)
+
+    def cached(self, text: str, voice: str = None, speed: float = None) -> Optional[bytes]:
+        """Synthesized PCM for text if the phrase cache has it"""
+        if not self.cache:
+            return None
+        return self.cache.get(text, voice or self.voice, speed or self.speed, self.model)
+
+    async def warm_cache(self, phrases: Iterable[str], voice: str = None, speed: float = None):
+        """Pre-synthesize phrases that aren't cached yet, without playing them"""
+        if not self.cache:
+            return
+        voice = voice or self.voice
+        speed = speed or self.speed
+        loop = asyncio.get_event_loop()
+        for text in phrases:
+            if self.cache.contains(text, voice, speed, self.model):
+                continue
+            pcm = await loop.run_in_executor(None, self._synthesize_sync, text, voice, speed)
+            self.cache.put(text, voice, speed, self.model, pcm)
+
+    async def play_pcm(self, pcm: bytes):
+        """Play already synthesized 24 kHz PCM (e.g. from a phrase cache)"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._play_pcm_sync, pcm)
+
+    def _speak_sync(self, text: str, voice: str, speed: float) -> bytes:
+        """Stream synthesis into the device; returns the PCM that was played"""
+        start = time.perf_counter()
+        played = bytearray()
+        with self._lock:
+            stream = self._get_stream()
+            with self._get_client().audio.speech.with_streaming_response.create(
+                model=self.model,
+                voice=voice,
+                input=text,
+                speed=speed,
+                response_format="pcm",
+            ) as response:
+                remainder = b""
+                for chunk in response.iter_bytes(TTS_CHUNK_BYTES):
+                    if not played and not remainder:
+                        self.last_time_to_first_audio = time.perf_counter() - start
+                    # Only hand whole samples to the device
+                    data = remainder + chunk
+                    usable = len(data) - len(data) % TTS_SAMPLE_WIDTH
+                    remainder = data[usable:]
+                    if usable:
+                        stream.write(data[:usable])  # Blocks at playback speed, no polling needed
+                        played.extend(data[:usable])
+        return bytes(played)
+
+    def _synthesize_sync(self, text: str, voice: str, speed: float) -> bytes:
+        response = self._get_client().audio.speech.create(
+            model=self.model,
+            voice=voice,
+            input=text,
+            speed=speed,
+            response_format="pcm",
+        )
+        return response.content
+
+    def _play_pcm_sync(self, pcm: bytes):
+        with self._lock:
+            self._get_stream().write(pcm)
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+                self._pa.terminate()
+                self._stream = None
+                self._pa = None
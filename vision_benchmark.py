@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Vision Payload Benchmark
+Compares the bytes uploaded and the encode time of vision payloads built by
+tools/vision.py against the full-resolution PNG that read_screen used to send.
+
+Without arguments it renders two synthetic 4K screens (a code editor and a photo-like
+video frame); pass screenshot files to measure real screens instead.
+
+Usage:
+    python vision_benchmark.py
+    python vision_benchmark.py shots/*.png --repeat 5
+"""
+
+import sys
+import time
+import random
+import argparse
+import importlib.util
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFilter
+
+
+def load_vision_module():
+    """Import tools/vision.py without tools/__init__, which needs the LiveKit runtime"""
+    import types
+    package = types.ModuleType("tools")
+    tools_dir = Path(__file__).resolve().parent / "tools"
+    package.__path__ = [str(tools_dir)]
+    sys.modules.setdefault("tools", package)
+    spec = importlib.util.spec_from_file_location("tools.vision", tools_dir / "vision.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ================================
+# Sample screens
+# ================================
+
+def code_editor_screen(size: Tuple[int, int] = (3840, 2160)) -> Image.Image:
+    random.seed(1)
+    image = Image.new("RGB", size, (30, 30, 30))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, size[0], 60), fill=(50, 50, 55))
+    draw.rectangle((0, 60, 500, size[1]), fill=(37, 37, 38))
+    colors = [(86, 156, 214), (206, 145, 120), (220, 220, 170), (212, 212, 212), (106, 153, 85)]
+    for y in range(80, size[1] - 20, 34):
+        x = 540 + 40 * random.randint(0, 4)
+        for _ in range(random.randint(1, 6)):
+            word = "".join(random.choice("abcdefghijklmnopqrstuvwxyz_()") for _ in range(random.randint(2, 12)))
+            draw.text((x, y), word, fill=random.choice(colors))
+            x += 8 * len(word) + 16
+    return image
+
+
+def photo_screen(size: Tuple[int, int] = (3840, 2160)) -> Image.Image:
+    noise = Image.effect_noise((size[0] // 4, size[1] // 4), 60).filter(ImageFilter.GaussianBlur(2))
+    gradient = Image.linear_gradient("L").resize(noise.size)
+    image = Image.merge("RGB", (noise, gradient, Image.blend(noise, gradient, 0.5)))
+    return image.resize(size, Image.BICUBIC)
+
+
+# ================================
+# Benchmark
+# ================================
+
+def configurations(vision) -> List[Tuple[str, Callable[[Image.Image], Tuple[int, float]]]]:
+    def baseline(image):
+        start = time.perf_counter()
+        data = vision.encode_image(image, "png", 6)
+        return len(data), (time.perf_counter() - start) * 1000
+
+    def builder(**options):
+        def run(image):
+            payload = vision.build_vision_payload(image, **options)
+            return payload.bytes_sent, payload.encode_ms
+        return run
+
+    return [
+        ("full-res png (old read_screen)", baseline),
+        ("auto 768", builder()),
+        ("auto 1080", builder(max_short_side=1080)),
+        ("jpeg 768", builder(image_format="jpeg")),
+        ("png 768", builder(image_format="png")),
+        ("webp 768", builder(image_format="webp")),
+        ("auto 768, 2x1 tiles", builder(tiles=(2, 1))),
+        ("auto 768, centre crop", lambda image: builder(crop=(image.width // 4, image.height // 4,
+                                                              image.width * 3 // 4, image.height * 3 // 4))(image)),
+    ]
+
+
+def run_benchmark(samples: Dict[str, Image.Image], repeat: int):
+    vision = load_vision_module()
+    for name, image in samples.items():
+        print(f"\n{name} ({image.width}x{image.height})")
+        print(f"  {'configuration':<32} {'bytes':>10} {'vs old':>8} {'encode ms':>10}")
+        baseline_bytes = None
+        for label, run in configurations(vision):
+            results = [run(image) for _ in range(repeat)]
+            size = results[0][0]
+            encode_ms = sorted(ms for _, ms in results)[len(results) // 2]
+            baseline_bytes = baseline_bytes or size
+            print(f"  {label:<32} {size:>10,} {size / baseline_bytes:>7.1%} {encode_ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vision payload size vs encode time")
+    parser.add_argument("images", nargs="*", help="Screenshots to measure (default: synthetic 4K screens)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration; the median time is shown")
+    args = parser.parse_args()
+
+    if args.images:
+        samples = {path: Image.open(path).convert("RGB") for path in args.images}
+    else:
+        samples = {"code editor": code_editor_screen(), "photo / video": photo_screen()}
+    run_benchmark(samples, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
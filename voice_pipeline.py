@@ -0,0 +1,259 @@
+"""
+Voice pipeline stages shared by the wake word loop in main.py and the offline replay harness:
+wake word detection on raw frames, command capture and STT, and local tool routing.
+"""
+
+import array
+import math
+import queue
+import struct
+import asyncio
+from threading import Thread, Lock
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+import speech_recognition as sr
+
+from jarvis_memory import JarvisMemory
+from local_intent_parser import LocalIntentParser
+from tools.rate_limit import get_limiter
+from tools.deadline import Deadline, current_deadline, BUDGET_EXHAUSTED_REPLY
+
+# Polls of the STT queue after the wake word before giving up on hearing a command
+CAPTURE_ATTEMPTS = 10
+CAPTURE_POLL_INTERVAL = 0.1  # 10 x 0.1 s: one second for faster response
+
+
+def wake_word_fired(engine, pcm: bytes) -> bool:
+    """Feed one raw 16-bit frame to a Porcupine-style engine; True when it detected the wake word"""
+    return engine.process(struct.unpack_from("h" * engine.frame_length, pcm)) >= 0
+
+
+async def capture_command(stt_handler: "STTHandler", deadline: Deadline) -> Optional[str]:
+    """Listen after the wake word until a command is transcribed, the polls run out or the budget is spent"""
+    stt_handler.start_listening()
+    try:
+        for _ in range(CAPTURE_ATTEMPTS):
+            if deadline.expired():
+                break
+            transcription = await stt_handler.get_transcription(deadline)
+            if transcription:
+                return transcription
+            await asyncio.sleep(CAPTURE_POLL_INTERVAL)
+        return None
+    finally:
+        stt_handler.stop_listening()
+
+
+# Speech-to-Text Handler
+class STTHandler:
+    CALIBRATION_KEY = "stt_energy_threshold"
+    NOISE_FRAME_SECONDS = 0.05  # Window used to pick non-speech frames out of captured audio
+    SAVE_CHANGE_RATIO = 0.1  # Persist the threshold once it drifts 10% from the saved value
+    
+    def __init__(self, memory_system: JarvisMemory = None, source: Optional[sr.AudioSource] = None,
+                 transcribe: Optional[Callable[[sr.AudioData], str]] = None, energy_threshold: Optional[float] = None):
+        """source and transcribe replace the microphone and Google STT, e.g. with a recording in the replay harness"""
+        self.recognizer = sr.Recognizer()
+        self.microphone = source or sr.Microphone()
+        self.transcribe = transcribe
+        self.audio_queue = queue.Queue()
+        self.is_listening = False
+        self.lock = Lock()
+        self.memory = memory_system
+        
+        # Reuse the last calibrated threshold; only sample the room on first run
+        saved_threshold = self.memory.get_calibration(self.CALIBRATION_KEY) if self.memory else None
+        if energy_threshold is not None:
+            self.recognizer.energy_threshold = self._saved_threshold = float(energy_threshold)
+        elif saved_threshold:
+            self.recognizer.energy_threshold = float(saved_threshold)
+            self._saved_threshold = float(saved_threshold)
+            print(f"Using saved microphone energy threshold: {saved_threshold:.1f}")
+        else:
+            self.recalibrate()
+    
+    def recalibrate(self):
+        """Sample ambient noise from the microphone and persist the resulting threshold"""
+        print("Calibrating microphone for ambient noise...")
+        with self.microphone as source:
+            self.recognizer.adjust_for_ambient_noise(source)
+        print("Microphone calibrated.")
+        self._save_threshold()
+    
+    def _save_threshold(self):
+        self._saved_threshold = self.recognizer.energy_threshold
+        if self.memory:
+            self.memory.set_calibration(self.CALIBRATION_KEY, self._saved_threshold)
+    
+    @staticmethod
+    def _rms(fragment: bytes, sample_width: int) -> float:
+        """Root mean square of signed native-endian PCM samples, the energy measure speech_recognition uses"""
+        samples = array.array({1: "b", 2: "h", 4: "i"}[sample_width], fragment)
+        return math.sqrt(sum(sample * sample for sample in samples) / len(samples)) if samples else 0.0
+    
+    def _adapt_threshold(self, audio: sr.AudioData):
+        """Track room noise using the non-speech frames of a captured phrase"""
+        recognizer = self.recognizer
+        frame_bytes = int(audio.sample_rate * self.NOISE_FRAME_SECONDS) * audio.sample_width
+        raw = audio.get_raw_data()
+        frame_duration = frame_bytes / (audio.sample_rate * audio.sample_width)
+        damping = recognizer.dynamic_energy_adjustment_damping ** frame_duration
+        
+        for i in range(0, len(raw) - frame_bytes + 1, frame_bytes):
+            energy = self._rms(raw[i:i + frame_bytes], audio.sample_width)
+            if energy >= recognizer.energy_threshold:
+                continue  # Speech, leave it out of the noise estimate
+            # Same update rule speech_recognition applies while waiting for a phrase
+            target = energy * recognizer.dynamic_energy_ratio
+            recognizer.energy_threshold = max(
+                recognizer.energy_threshold * damping + target * (1 - damping), 1.0
+            )
+        
+        if abs(recognizer.energy_threshold - self._saved_threshold) > self._saved_threshold * self.SAVE_CHANGE_RATIO:
+            self._save_threshold()
+    
+    def start_listening(self):
+        if self.is_listening:
+            print("Already listening. Ignoring start request.")
+            return
+        self.is_listening = True
+        listen_thread = Thread(target=self._listen_loop, daemon=True)
+        listen_thread.start()
+
+    def stop_listening(self):
+        if not self.is_listening:
+            print("Not listening. Nothing to stop.")
+            return
+        self.is_listening = False
+    
+    def _listen_loop(self):
+        """Continuous listening loop"""
+        while self.is_listening:
+            try:
+                with self.microphone as source:
+                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=2)
+                    self.audio_queue.put(audio)
+                self._adapt_threshold(audio)
+            except sr.WaitTimeoutError:
+                continue
+            except Exception as e:
+                print(f"Error in listening loop: {e}")
+
+    async def get_transcription(self, deadline: Deadline = None):
+        """Get transcription from audio queue"""
+        try:
+            if not self.audio_queue.empty():
+                # 2 second timeout for faster response, less if the utterance budget is nearly spent
+                timeout = deadline.timeout(2.0) if deadline else 2.0
+                if timeout <= 0:
+                    return None
+                if self.transcribe is None and not await get_limiter("google_stt").acquire_async(timeout=timeout):
+                    print("Speech recognition is rate limited, skipping")
+                    return None
+                audio = self.audio_queue.get_nowait()
+                # Bound the HTTP request itself so a stalled upstream doesn't keep the executor thread busy
+                self.recognizer.operation_timeout = timeout
+                # Use Google Speech Recognition (free tier) with timeout
+                text = await asyncio.wait_for(
+                    asyncio.get_event_loop().run_in_executor(
+                        None, self.transcribe or self.recognizer.recognize_google, audio
+                    ),
+                    timeout=timeout
+                )
+                return text.lower()
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            print(f"Speech recognition error: {e}")
+            return None
+        except queue.Empty:
+            return None
+        except asyncio.TimeoutError:
+            print("Speech recognition timed out")
+            return None
+        return None
+
+# Local Function Parser with Memory
+class LocalFunctionParser:
+    def __init__(self, intent_parser: LocalIntentParser, memory_system: JarvisMemory, functions: Mapping[str, Callable],
+                 stock_reply: Optional[Callable[[Any, str], Awaitable]] = None):
+        """functions maps intent names to tools; stock_reply speaks a fixed line through a session"""
+        self.intent_parser = intent_parser
+        self.memory = memory_system
+        self.available_functions = functions
+        self.stock_reply = stock_reply or (lambda session, text: session.generate_reply(instructions=text))
+    
+    async def try_parse_tool(self, text: str) -> bool:
+        """Try to parse as a tool call - returns True if successful, False if should fall back to LLM"""
+        if not self.intent_parser:
+            return False
+        
+        try:
+            function_call = self.intent_parser.parse_and_extract_function(text)
+            
+            if function_call and function_call.get("function_name"):
+                await self._execute_function(function_call, None, None, text)
+                return True
+            else:
+                return False  # No tool detected, use LLM
+                
+        except Exception as e:
+            print(f"Error in local parsing: {e}")
+            return False  # Fall back to LLM on error
+    
+    async def _execute_function(self, function_call: dict, session, room_id: str, original_command: str):
+        """Execute the parsed function and store in memory"""
+        function_name = function_call.get("function_name")
+        parameters = function_call.get("parameters", {})
+        confidence = function_call.get("confidence", 0.0)
+        
+        if function_name in self.available_functions:
+            deadline = current_deadline()
+            try:
+                if deadline and deadline.expired():
+                    await self._reply_budget_exhausted(function_name, session)
+                    return
+                
+                # Create a mock context for the function
+                class MockContext:
+                    pass
+                
+                mock_context = MockContext()
+                
+                print(f"Executing {function_name} with parameters: {parameters} (confidence: {confidence:.3f})")
+                
+                # Execute the function with mock context, using only the remaining utterance budget
+                result = await asyncio.wait_for(
+                    self.available_functions[function_name](mock_context, **parameters),
+                    timeout=deadline.remaining() if deadline else None
+                )
+                
+                print(f"Function {function_name} executed successfully: {result}")
+                
+                # Only log usage metrics (no conversation storage)
+                if self.memory:
+                    self.memory.increment_usage_metric(f"function_{function_name}")
+                
+                print(f"Function executed successfully: {result}")
+                
+            except asyncio.TimeoutError as e:
+                if deadline and deadline.expired():
+                    await self._reply_budget_exhausted(function_name, session)
+                else:
+                    # The tool's own timeout (HTTP, SMTP, subprocess), not the utterance budget
+                    print(f"Error executing {function_name}: timed out ({e or 'no details'})")
+            except Exception as e:
+                error_msg = f"Error executing {function_name}: {str(e)}"
+                print(f"{error_msg}")
+        else:
+            print(f"Unknown function: {function_name}")
+    
+    async def _reply_budget_exhausted(self, function_name: str, session):
+        """Short apology instead of a late answer when the utterance budget is gone"""
+        print(f"Deadline exceeded before {function_name} finished")
+        if self.memory:
+            self.memory.increment_usage_metric(f"deadline_exceeded_{function_name}")
+        if session:
+            await self.stock_reply(session, BUDGET_EXHAUSTED_REPLY)
+        else:
+            print(BUDGET_EXHAUSTED_REPLY)